@@ -1,119 +1,31 @@
 import streamlit as st
+import altair as alt
 import pandas as pd
 import numpy as np
-import numpy_financial as npf
 import math
 
+from pipeline_engine import diagnostics
+from pipeline_engine.cache import simulation_cache
+from pipeline_engine.core import MIXED_GROUP, MJ_PER_M3, USAGE_GROUPS, calculate_simulation, gas_rates
+from pipeline_engine.montecarlo import Distribution, run_monte_carlo
+from pipeline_engine.monthly import MONTHLY_SHARES, SEASONAL_TYPES, SUMMER_MONTHS, FLAT_SHARES, monthly_components, seasonal_group, simulate_monthly
+from pipeline_engine.profiles import Profile, TariffSchedule, linear_ramp, profile_components, s_curve_ramp, simulate_profiles
+from pipeline_engine.sensitivity import AXES as SENSITIVITY_AXES, base_value as sensitivity_base_value, sensitivity_grid, tornado
+from pipeline_engine.solver import IRR_OK, IRR_REASON_MESSAGES
+from pipeline_engine.store import default_store, scenario_hash
+from pipeline_engine.targets import LEVERS, solve_target
+
 # [설정] 페이지 기본
 st.set_page_config(page_title="신규배관 경제성 분석 Simulation ver2", layout="wide")
 
-# [함수] 금융 계산 로직
-def manual_npv(rate, values):
-    return sum(v / ((1 + rate) ** i) for i, v in enumerate(values))
-
-def calculate_simulation(sim_len, sim_inv, sim_contrib, sim_other, sim_vol, sim_rev, sim_cost, 
-                         sim_jeon, sim_basic_rev, rate, tax, dep_period, analysis_period, c_maint, c_adm_jeon, c_adm_m,
-                         sales_price_mj, purchase_price_mj):
-    
-    # 1. 초기 순투자액 (Year 0)
-    net_inv = sim_inv - sim_contrib - sim_other
-    
-    # 2. 고정 수익/비용 항목 계산
-    margin_total = (sim_rev - sim_cost) + sim_basic_rev 
-    unit_margin = (sim_rev - sim_cost) / sim_vol if sim_vol > 0 else (sales_price_mj - purchase_price_mj)
-    
-    cost_sga = (sim_len * c_maint) + (sim_len * c_adm_m) + (sim_jeon * c_adm_jeon)
-    annual_depreciation = sim_inv / dep_period if dep_period > 0 else 0
-    
-    # 3. 세후 현금흐름(OCF) 산출
-    flows = [-net_inv]
-    ocfs = []
-    
-    for year in range(1, int(analysis_period) + 1):
-        current_dep = annual_depreciation if year <= dep_period else 0
-        current_ebit = margin_total - cost_sga - current_dep
-        current_ni = current_ebit * (1 - tax)
-        current_ocf = current_ni + current_dep
-        
-        flows.append(current_ocf)
-        ocfs.append(current_ocf)
-
-    first_ocf = ocfs[0] if len(ocfs) > 0 else 0
-    first_ebit = margin_total - cost_sga - annual_depreciation
-    
-    # 좀비 배관(가짜 흑자) 판별 및 민감도 분석 로직
-    ocf_with_dep = (margin_total - cost_sga - annual_depreciation) * (1 - tax) + annual_depreciation
-    ocf_without_dep = (margin_total - cost_sga) * (1 - tax)
-    is_zombie = (ocf_with_dep > 0) and (ocf_without_dep < 0)
-    
-    if cost_sga > 0:
-        zombie_threshold_pct = (margin_total / cost_sga - 1) * 100
-    else:
-        zombie_threshold_pct = float('inf')
-    
-    # 4. 지표 산출
-    npv_val = manual_npv(rate, flows)
-    
-    npv_30_val = manual_npv(rate, flows[:31]) if len(flows) >= 31 else npv_val
-    
-    irr_val = None
-    irr_reason = ""
-    
-    if net_inv <= 0:
-        irr_reason = "초기 순투자비가 0원 이하(보조금/분담금 과다)로 수익률 산출 의미 없음"
-    elif all(f <= 0 for f in ocfs): 
-        irr_reason = "운영 적자 지속(모든 연도 OCF ≤ 0)으로 투자금 회수 불가"
-    else:
-        try:
-            irr_val = npf.irr(flows)
-        except:
-            irr_reason = "계산 오류 발생 (현금흐름 부호 변동 없음 등)"
-    
-    # 5. 감가상각 종료를 완벽히 반영한 목표 판매량 역산 함수
-    unit_margin_for_req = sales_price_mj - purchase_price_mj
-    
-    def get_req_vol(target_period):
-        pvifa_total = (1 - (1 + rate) ** (-target_period)) / rate if rate != 0 else target_period
-        pvifa_dep = (1 - (1 + rate) ** (-min(target_period, dep_period))) / rate if rate != 0 else min(target_period, dep_period)
-        
-        if pvifa_total > 0 and (1 - tax) > 0:
-            target_margin_minus_sga = (net_inv - annual_depreciation * tax * pvifa_dep) / (pvifa_total * (1 - tax))
-            target_margin = target_margin_minus_sga + cost_sga
-            
-            req_v = (target_margin - sim_basic_rev) / unit_margin_for_req if unit_margin_for_req > 0 else 0
-            return math.ceil(max(0, req_v))
-        return 0
-
-    required_vol_30 = get_req_vol(30)
-    required_vol_50 = get_req_vol(50)
-    
-    return {
-        "npv": npv_val, "npv_30": npv_30_val, "irr": irr_val, "irr_reason": irr_reason, "net_inv": net_inv, 
-        "first_ocf": first_ocf, "first_ebit": first_ebit, "sga": cost_sga, 
-        "dep": annual_depreciation, "margin": margin_total, "flows": flows, 
-        "required_vol_30": required_vol_30, "required_vol_50": required_vol_50,
-        "avg_ocf": np.mean(ocfs), "is_zombie": is_zombie,
-        "zombie_threshold_pct": zombie_threshold_pct
-    }
-
-# --------------------------------------------------------------------------
-# [데이터] 상품별 요금 단가표 (25.8.1 기준)
-# --------------------------------------------------------------------------
-gas_rates = {
-    "취사용": {"sales": 23.6361, "purchase": 20.8495, "is_residential": True},
-    "개별난방용": {"sales": 23.6361, "purchase": 20.8495, "is_residential": True},
-    "중앙난방용(중집용)": {"sales": 23.5981, "purchase": 20.8495, "is_residential": True},
-    "영업용1(영업용)": {"sales": 22.7841, "purchase": 19.0904, "is_residential": False},
-    "영업용2(목욕탕 등)": {"sales": 22.7841, "purchase": 19.0904, "is_residential": False},
-    "업무난방용": {"sales": 23.0759, "purchase": 19.3822, "is_residential": False},
-    "냉난방공조용(하절기외)": {"sales": 21.1556, "purchase": 17.4619, "is_residential": False},
-    "냉난방공조용(하절기)": {"sales": 13.8465, "purchase": 11.5064, "is_residential": False},
-    "산업용": {"sales": 18.4438, "purchase": 17.0729, "is_residential": False},
-    "연료전지": {"sales": 15.7417, "purchase": 14.8272, "is_residential": False},
-    "열병합": {"sales": 19.0972, "purchase": 16.3486, "is_residential": False},
-    "열전용설비(주택용 외)": {"sales": 21.9164, "purchase": 19.1677, "is_residential": False},
-    "수송용": {"sales": 21.3533, "purchase": 16.5919, "is_residential": False}
-}
+# [설정] 성능 진단 계측 (사이드바 '디버그: 성능 진단' 토글, 꺼져 있으면 계측 없음)
+# 이전 재실행이 st.stop·예외로 중단되어 남은 계측이 있으면 먼저 정리
+DIAG_HISTORY = 20  # 진단 패널에 보관하는 최근 재실행 수
+diagnostics.finish()
+if st.session_state.get("diag_on", False):
+    diagnostics.start("app.py", profile=st.session_state.get("diag_profile", False),
+                      trace_memory=st.session_state.get("diag_memory", False))
+    diagnostics.stage("입력")
 
 # --------------------------------------------------------------------------
 # [UI] 메인 화면 최상단 (가스 용도 선택)
@@ -123,16 +35,10 @@ st.title("🏗️ 신규배관 경제성 분석 Simulation ver2")
 st.subheader("📌 가스 용도 및 요금 선택")
 st.markdown("분석할 가스 용도 그룹을 먼저 선택하신 후, 하단에서 세부 용도를 선택해 주세요.")
 
-group_sel = st.radio("■ 용도 그룹", ["가정용", "일반용", "기타", "복합용도"], horizontal=True)
+group_sel = st.radio("■ 용도 그룹", [*USAGE_GROUPS, MIXED_GROUP], horizontal=True)
 
-if group_sel == "가정용":
-    selected_gas_type = st.selectbox("↳ 세부 용도 선택", ["취사용", "개별난방용", "중앙난방용(중집용)"])
-    is_residential = gas_rates[selected_gas_type]["is_residential"]
-elif group_sel == "일반용":
-    selected_gas_type = st.selectbox("↳ 세부 용도 선택", ["영업용1(영업용)", "영업용2(목욕탕 등)", "업무난방용", "냉난방공조용(하절기외)", "냉난방공조용(하절기)"])
-    is_residential = gas_rates[selected_gas_type]["is_residential"]
-elif group_sel == "기타":
-    selected_gas_type = st.selectbox("↳ 세부 용도 선택", ["산업용", "연료전지", "열병합", "열전용설비(주택용 외)", "수송용"])
+if group_sel in USAGE_GROUPS:
+    selected_gas_type = st.selectbox("↳ 세부 용도 선택", USAGE_GROUPS[group_sel])
     is_residential = gas_rates[selected_gas_type]["is_residential"]
 else:
     selected_gas_type = "복합용도 (수기입력)"
@@ -159,6 +65,11 @@ with st.sidebar:
     
     RATE = rate_pct / 100
     TAX = tax_pct / 100
+
+    st.subheader("💾 결과 저장소")
+    use_store = st.toggle("분석 결과 저장·재사용", value=False,
+                          help="같은 입력으로 분석한 적이 있으면 저장된 결과를 불러오고, 처음 분석한 입력만 저장합니다 (앱을 다시 시작해도 유지). "
+                               "저장된 시나리오는 '시나리오 저장소' 페이지에서 조회·비교할 수 있습니다.")
     
     st.markdown("---")
     st.header("📋 상품별 요금 (단가 확인 및 수정)")
@@ -192,11 +103,11 @@ with col2:
     
     if use_m3:
         input_vol = st.number_input("연간 판매량 (㎥) - ⭐️제언된 목표량을 입력해보세요", value=0.0)
-        sim_vol = input_vol * 42.563  # 입력받은 m3를 내부 계산용 MJ로 변환
-        st.caption(f"ℹ️ 환산 열량: **{sim_vol:,.0f} MJ** (적용 열량: 42.563 MJ/㎥)")
+        sim_vol = input_vol * MJ_PER_M3  # 입력받은 m3를 내부 계산용 MJ로 변환
+        st.caption(f"ℹ️ 환산 열량: **{sim_vol:,.0f} MJ** (적용 열량: {MJ_PER_M3} MJ/㎥)")
     else:
         sim_vol = st.number_input("연간 판매량 (MJ) - ⭐️제언된 목표량을 입력해보세요", value=0.0)
-        st.caption(f"ℹ️ 환산 부피: **{sim_vol / 42.563:,.0f} ㎥** (적용 열량: 42.563 MJ/㎥)")
+        st.caption(f"ℹ️ 환산 부피: **{sim_vol / MJ_PER_M3:,.0f} ㎥** (적용 열량: {MJ_PER_M3} MJ/㎥)")
     
     if group_sel == "복합용도":
         st.markdown("👉 **[복합용도] 가스 연간 판매액 및 판매원가 직접 입력**")
@@ -247,10 +158,31 @@ if st.session_state.run_sim:
             
         active_period = 50 if long_term_mode else analysis_period
         
-        res = calculate_simulation(sim_len, sim_inv, sim_contrib, sim_other, sim_vol, sim_rev, sim_cost, 
-                                   sim_jeon, sim_basic_rev, RATE, TAX, dep_period, active_period, c_maint, c_adm_jeon, c_adm_m,
-                                   effective_sales_price, effective_purchase_price)
+        diagnostics.stage("시뮬레이션")
+        sim_args = (sim_len, sim_inv, sim_contrib, sim_other, sim_vol, sim_rev, sim_cost, 
+                    sim_jeon, sim_basic_rev, RATE, TAX, dep_period)
+        cost_args = (c_maint, c_adm_jeon, c_adm_m, effective_sales_price, effective_purchase_price)
+        
+        # 저장소 사용 시 메모리 캐시 미적중분만 저장소(SQLite)에서 찾고, 그래도 없으면 계산 후 저장
+        if use_store:
+            sim_fn, sim_prefix = default_store().simulate, (selected_gas_type,)
+        else:
+            sim_fn, sim_prefix = calculate_simulation, ()
+        # 기본 분석기간과 50년 결과를 함께 계산해 두어 장기분석 토글 전환 시 재계산하지 않음
+        for period in (analysis_period, 50):
+            simulation_cache.get_or_compute(sim_fn, *sim_prefix, *sim_args, period, *cost_args)
+        res = simulation_cache.get_or_compute(sim_fn, *sim_prefix, *sim_args, active_period, *cost_args)
         
+        # 목표 역산·리스크·민감도 분석 공통 기준 시나리오 (캐시 키로 쓰도록 (키, 값) 쌍 튜플)
+        scenario_base = (
+            ("sim_len", sim_len), ("sim_inv", sim_inv), ("sim_contrib", sim_contrib), ("sim_other", sim_other),
+            ("sim_vol", sim_vol), ("sim_rev", sim_rev), ("sim_cost", sim_cost), ("sim_jeon", sim_jeon),
+            ("sim_basic_rev", sim_basic_rev), ("rate", RATE), ("tax", TAX), ("dep_period", dep_period),
+            ("analysis_period", active_period), ("c_maint", c_maint), ("c_adm_jeon", c_adm_jeon), ("c_adm_m", c_adm_m),
+            ("sales_price_mj", effective_sales_price), ("purchase_price_mj", effective_purchase_price),
+        )
+        
+        diagnostics.stage("KPI")
         with result_top_container:
             st.divider()
             
@@ -266,7 +198,7 @@ if st.session_state.run_sim:
             else:
                 m2.metric("내부수익률 (IRR)", f"{res['irr']*100:.2f} %")
             
-            dpp_msg = "회수 가능" if res['npv'] > 0 else "회수 불가 (분석기간 내)"
+            dpp_msg = f"{res['dpp']:.1f} 년" if not math.isnan(res['dpp']) else "회수 불가 (분석기간 내)"
             m3.metric("할인회수기간 (DPP)", dpp_msg)
             
             if long_term_mode and active_period > 30:
@@ -275,6 +207,26 @@ if st.session_state.run_sim:
                 else:
                     st.caption(f"💡 참고: 초기 30년 시점까지 끊어서 본 NPV도 **{res['npv_30']:,.0f} 원**으로 적자 상태입니다.")
 
+            if use_store:
+                # 저장은 계산 시(저장소 미적중)와 '이름 저장' 버튼에서만 (재실행마다 쓰지 않음)
+                scenario_key = scenario_hash(dict(scenario_base))
+                try:
+                    saved_label = default_store().load(scenario_key)[2]["label"] or ""
+                except KeyError:
+                    saved_label = ""
+                s1, s2 = st.columns([3, 1])
+                with s1:
+                    scenario_label = st.text_input("🏷️ 시나리오 이름 (저장소에서 검색용)", value=saved_label,
+                                                   key=f"label_{scenario_key}", placeholder="예: 2025 A단지 1차 검토")
+                with s2:
+                    st.write("")
+                    if st.button("이름 저장", use_container_width=True):
+                        # 메모리 캐시 적중으로 계산 없이 왔다면 저장소에서 지워졌을 수 있으므로 다시 넣어 둔다 (있으면 무시)
+                        default_store().put(dict(scenario_base), res, gas_type=selected_gas_type)
+                        default_store().set_label(scenario_key, scenario_label.strip())
+                        st.toast("시나리오 이름을 저장했습니다.")
+                st.caption(f"저장소 키: `{scenario_key[:12]}`")
+
             st.subheader("🧐 NPV 산출 사유 분석 (사내 엑셀 기준)")
             st.markdown(f"""
             현재 {active_period}년 누적 NPV가 **{res['npv']:,.0f}원**으로 산출된 주요 구조는 다음과 같습니다:
@@ -301,9 +253,9 @@ if st.session_state.run_sim:
             
             st.subheader("💡 경제성 확보를 위한 제언")
             
-            req_vol_m3_30 = res['required_vol_30'] / 42.563
-            req_vol_m3_50 = res['required_vol_50'] / 42.563
-            sim_vol_m3 = sim_vol / 42.563
+            req_vol_m3_30 = res['required_vol_30'] / MJ_PER_M3
+            req_vol_m3_50 = res['required_vol_50'] / MJ_PER_M3
+            sim_vol_m3 = sim_vol / MJ_PER_M3
             
             is_30_ok = sim_vol >= res['required_vol_30']
             is_50_ok = sim_vol >= res['required_vol_50']
@@ -331,68 +283,393 @@ if st.session_state.run_sim:
             with col_m3:
                 st.markdown("👉 **[안정 기준] 50년 경제성 만족**")
                 st.success(f"### **{req_vol_m3_50:,.0f} ㎥**\n\n≙ **{res['required_vol_50']:,.0f} MJ**")
-        
-        with chart_container:
-            chart_data = pd.DataFrame({
-                "Year": range(0, int(active_period) + 1),
-                "Cumulative Cash Flow": np.cumsum(res['flows'])
-            })
-            st.line_chart(chart_data, x="Year", y="Cumulative Cash Flow")
 
-            with st.expander("📊 [세부 분석] 연도별 손익 계산 및 NPV/IRR 상세 내역 보기"):
-                
-                years = [str(i) for i in range(1, int(active_period) + 1)]
-                
-                val_sales = sim_rev
-                val_cogs = sim_cost
-                val_margin = sim_rev - sim_cost
-                val_basic = sim_basic_rev
-                val_maint = sim_len * c_maint
-                val_adm = (sim_len * c_adm_m) + (sim_jeon * c_adm_jeon)
-                val_sga = val_maint + val_adm
+            with st.expander("🎯 [목표 역산] 목표 IRR·NPV·회수기간 달성 조건 계산"):
+                st.caption("목표 지표를 정하면 판매량, MJ당 요금 마진, 보조금, 공사비를 각각 하나씩만 바꿔 달성하는 값을 역산합니다. (나머지 입력은 현재값 고정)")
+                target_labels = {"irr": "목표 IRR (%)", "npv": "목표 NPV (원)", "payback": "목표 할인회수기간 (년)"}
+                tg1, tg2 = st.columns([1, 2])
+                with tg1:
+                    target_kind = st.radio("목표 지표", list(target_labels), format_func=target_labels.get)
+                with tg2:
+                    if target_kind == "irr":
+                        target_value = st.number_input(target_labels["irr"], value=float(rate_pct) + 2.0, step=0.5, format="%.2f") / 100
+                    elif target_kind == "npv":
+                        target_value = float(st.number_input(target_labels["npv"], value=0, step=10_000_000, format="%d"))
+                    else:
+                        target_value = st.number_input(target_labels["payback"], value=float(min(15, active_period)), min_value=0.5, step=1.0, format="%.1f")
                 
-                pnl_dict = {
-                    "구분": [
-                        "가스 판매액", "가스 판매 원가", "수익 (가스판매수익)", "수익 (기본요금수익)", 
-                        "판매관리비 (배관 유지비)", "판매관리비 (일반 관리비)", "판매관리비 (소계)", 
-                        "감가상각비", "세전 수요개발 기대이익", "세후 당기 손익", "세후 수요개발 기대이익"
-                    ]
-                }
+                solved = {lever: solve_target(lever, target_kind, target_value, dict(scenario_base))[0] for lever in LEVERS}
                 
-                npv_dict = {
-                    "구분": [
-                        "세후 수요개발 기대이익", "배관공사 투자금액", "시설 분담금", "기타 이익", 
-                        "Free Cash Flow", "순현재가치(NPV) 환산", "미회수 투자액"
-                    ]
-                }
+                def fmt_solved(value, text):
+                    return text if not math.isnan(value) else "달성 불가"
                 
-                net_inv = sim_inv - sim_contrib - sim_other
-                npv_dict["초기투자"] = [0, -sim_inv, sim_contrib, sim_other, -net_inv, -net_inv, -net_inv]
-                
-                cum_pv = -net_inv
+                t1, t2, t3, t4 = st.columns(4)
+                t1.metric("필요 판매량", fmt_solved(solved['sim_vol'], f"{solved['sim_vol'] / MJ_PER_M3:,.0f} ㎥"),
+                          help=fmt_solved(solved['sim_vol'], f"≙ {solved['sim_vol']:,.0f} MJ"))
+                t2.metric("필요 MJ당 마진", fmt_solved(solved['unit_margin'], f"{solved['unit_margin']:.4f} 원"),
+                          help=f"현재 {effective_sales_price - effective_purchase_price:.4f} 원/MJ")
+                t3.metric("필요 보조금 (기타 이익)", fmt_solved(solved['sim_other'], f"{max(solved['sim_other'], 0):,.0f} 원"),
+                          help=f"현재 {sim_other:,.0f} 원")
+                t4.metric("최대 허용 공사비", fmt_solved(solved['sim_inv'], f"{solved['sim_inv']:,.0f} 원"),
+                          help=f"현재 {sim_inv:,.0f} 원")
+        
+        diagnostics.stage("차트")
+        with chart_container:
+            ledger = res['ledger']
+            st.line_chart(ledger.chart_frame(), x="Year", y="Cumulative Cash Flow")
+
+            diagnostics.stage("세부 표")
+            with st.expander("📊 [세부 분석] 연도별 손익 계산 및 NPV/IRR 상세 내역 보기"):
                 
-                for i, y in enumerate(years):
-                    period = i + 1
-                    current_dep = sim_inv / dep_period if (dep_period > 0 and period <= dep_period) else 0
-                    current_ebit = (val_margin + val_basic) - val_sga - current_dep
-                    current_ni = current_ebit * (1 - TAX)
-                    current_ocf = current_ni + current_dep
-                    
-                    pnl_dict[y] = [val_sales, val_cogs, val_margin, val_basic, val_maint, val_adm, val_sga, current_dep, current_ebit, current_ni, current_ocf]
-                    
-                    discounted_fcf = current_ocf / ((1 + RATE) ** period)
-                    cum_pv += discounted_fcf
-                    npv_dict[y] = [current_ocf, 0, 0, 0, current_ocf, discounted_fcf, cum_pv]
-                    
-                pnl_df = pd.DataFrame(pnl_dict)
-                npv_df = pd.DataFrame(npv_dict)
+                # 원 단위 정수 배열을 그대로 넘기고 천 단위 구분은 컬럼 설정으로 처리 (셀 단위 Styler 미사용)
+                won_format = st.column_config.NumberColumn(format="%,d")
+                pnl_df = ledger.pnl_frame()
+                npv_df = ledger.npv_frame()
                 
                 st.markdown("#### 📝 연도별 손익 계산")
-                st.dataframe(pnl_df.style.format({y: "{:,.0f}" for y in years}), use_container_width=True, hide_index=True)
+                st.dataframe(pnl_df, column_config={c: won_format for c in pnl_df.columns[1:]}, use_container_width=True, hide_index=True)
 
                 st.markdown("<br>", unsafe_allow_html=True)
                 
                 st.markdown("#### 💰 NPV 및 IRR 평가")
-                format_dict = {"초기투자": "{:,.0f}"}
-                format_dict.update({y: "{:,.0f}" for y in years})
-                st.dataframe(npv_df.style.format(format_dict), use_container_width=True, hide_index=True)
+                st.dataframe(npv_df, column_config={c: won_format for c in npv_df.columns[1:]}, use_container_width=True, hide_index=True)
+
+
+        # ------------------------------------------------------------------
+        # [UI] 몬테카를로 리스크 분석 (투자심의용 P10/P50/P90)
+        # ------------------------------------------------------------------
+        diagnostics.stage("몬테카를로")
+        with st.expander("🎲 [리스크 분석] 몬테카를로 시뮬레이션 (판매량·요금·유지관리비 불확실성)"):
+            st.caption("판매량, 요금 수준(판매·사입 단가 공통 충격), MJ당 마진, 유지·관리비 단가를 확률분포에서 추출해 NPV 분포와 좀비 배관 전락 확률을 산출합니다.")
+            mc1, mc2, mc3 = st.columns(3)
+            with mc1:
+                vol_cv = st.number_input("판매량 변동계수 (%)", value=20.0, min_value=0.0, step=1.0)
+                price_sd = st.number_input("요금 수준 표준편차 (%, 판매·사입 공통)", value=3.0, min_value=0.0, step=0.5,
+                                           help="사입 단가 대비 표준편차. 같은 충격이 판매 단가에도 그대로 더해져 마진은 변하지 않습니다.")
+                margin_sd = st.number_input("MJ당 마진 표준편차 (%)", value=5.0, min_value=0.0, step=0.5,
+                                            help=f"현재 마진 {effective_sales_price - effective_purchase_price:.4f} 원/MJ 대비 표준편차")
+            with mc2:
+                cost_low = st.number_input("유지·관리비 단가 하한 (%)", value=-10.0, max_value=0.0, step=1.0)
+                cost_high = st.number_input("유지·관리비 단가 상한 (%)", value=30.0, min_value=0.0, step=1.0)
+            with mc3:
+                mc_draws = st.number_input("표본 수", value=100_000, min_value=1_000, step=10_000, format="%d")
+                mc_seed = st.number_input("난수 시드", value=42, step=1, format="%d")
+                mc_workers = st.number_input("병렬 프로세스 수", value=1, min_value=1, max_value=16, step=1)
+            
+            unit_margin_mj = effective_sales_price - effective_purchase_price
+            
+            def cost_dist(base_value):
+                return Distribution.triangular(base_value * (1 + cost_low / 100), base_value, base_value * (1 + cost_high / 100))
+            
+            mc_spec = (
+                ("sim_vol", Distribution.normal(sim_vol, sim_vol * vol_cv / 100, low=0.0)),
+                ("purchase_price_mj", Distribution.normal(effective_purchase_price, effective_purchase_price * price_sd / 100, low=0.0)),
+                ("margin_per_mj", Distribution.normal(unit_margin_mj, abs(unit_margin_mj) * margin_sd / 100)),
+                ("c_maint", cost_dist(c_maint)),
+                ("c_adm_m", cost_dist(c_adm_m)),
+                ("c_adm_jeon", cost_dist(c_adm_jeon)),
+            )
+            
+            if "run_mc" not in st.session_state:
+                st.session_state.run_mc = False
+            if st.button("🎲 몬테카를로 실행"):
+                st.session_state.run_mc = True
+            
+            if st.session_state.run_mc:
+                mc = simulation_cache.get_or_compute(run_monte_carlo, scenario_base, mc_spec, int(mc_draws), int(mc_seed), 50_000, int(mc_workers))
+                
+                r1, r2, r3, r4 = st.columns(4)
+                r1.metric("NPV P10 (비관)", f"{mc.p10:,.0f} 원")
+                r2.metric("NPV P50 (중앙)", f"{mc.p50:,.0f} 원")
+                r3.metric("NPV P90 (낙관)", f"{mc.p90:,.0f} 원")
+                r4.metric("🧟‍♂️ 좀비 배관 확률", f"{mc.prob_zombie * 100:.2f} %")
+                st.caption(f"표본 {mc.n:,}개 · 평균 {mc.mean:,.0f}원 · 표준편차 {mc.std:,.0f}원 · NPV<0 확률 {mc.prob_negative * 100:.1f}% · 계산 {mc.elapsed:.2f}초 (시드 {int(mc_seed)})")
+                
+                # 표시용 히스토그램: 값이 있는 구간만 약 60개 막대로 묶음
+                nonzero = np.flatnonzero(mc.hist_counts)
+                first, last = nonzero[0], nonzero[-1] + 1
+                group = max(1, (last - first) // 60)
+                starts = np.arange(first, last, group)
+                hist_df = pd.DataFrame({
+                    "NPV (백만원)": np.round(mc.hist_edges[starts] / 1e6, 1),
+                    "표본 수": np.add.reduceat(mc.hist_counts[first:last], starts - first),
+                })
+                st.bar_chart(hist_df, x="NPV (백만원)", y="표본 수")
+
+        # ------------------------------------------------------------------
+        # [UI] 민감도 분석 (2차원 히트맵 + 토네이도)
+        # ------------------------------------------------------------------
+        diagnostics.stage("민감도")
+        with st.expander("📐 [민감도 분석] 2차원 NPV 히트맵 & 토네이도 차트"):
+            st.caption("두 입력을 기준값 대비 ±범위로 동시에 움직인 NPV 격자와, 입력별 NPV 변동폭 순위를 한 번의 배열 연산으로 계산합니다.")
+            axis_names = list(SENSITIVITY_AXES)
+            sx1, sx2, sx3 = st.columns(3)
+            with sx1:
+                x_param = st.selectbox("가로축", axis_names, index=axis_names.index("rate"), format_func=SENSITIVITY_AXES.get)
+                y_param = st.selectbox("세로축", axis_names, index=axis_names.index("sim_vol"), format_func=SENSITIVITY_AXES.get)
+            with sx2:
+                grid_span = st.slider("변동 범위 (기준값 대비 ±%)", min_value=5, max_value=90, value=50, step=5)
+                grid_res = st.slider("격자 해상도 (축당 점 수)", min_value=10, max_value=200, value=60, step=10)
+            with sx3:
+                tornado_change = st.slider("토네이도 변동폭 (±%)", min_value=5, max_value=50, value=20, step=5)
+
+            base_dict = dict(scenario_base)
+            if x_param == y_param:
+                st.warning("⚠️ 가로축과 세로축에 서로 다른 입력을 선택해 주세요.")
+            elif sensitivity_base_value(base_dict, x_param) == 0 or sensitivity_base_value(base_dict, y_param) == 0:
+                st.warning("⚠️ 현재 값이 0인 입력은 ±% 범위를 만들 수 없습니다. 다른 축을 선택해 주세요.")
+            else:
+
+                def axis_values(name):
+                    center = sensitivity_base_value(base_dict, name)
+                    return tuple(np.linspace(center * (1 - grid_span / 100), center * (1 + grid_span / 100), grid_res))
+
+                grid = simulation_cache.get_or_compute(sensitivity_grid, scenario_base, x_param, axis_values(x_param), y_param, axis_values(y_param))
+                heat_df = grid.to_frame()
+                heat_df["NPV (백만원)"] = heat_df["npv"] / 1e6
+                heatmap = alt.Chart(heat_df).mark_rect().encode(
+                    x=alt.X("x0:Q", title=SENSITIVITY_AXES[x_param], scale=alt.Scale(zero=False, nice=False)), x2="x1",
+                    y=alt.Y("y0:Q", title=SENSITIVITY_AXES[y_param], scale=alt.Scale(zero=False, nice=False)), y2="y1",
+                    color=alt.Color("NPV (백만원):Q", scale=alt.Scale(scheme="redblue", domainMid=0)),
+                    tooltip=[alt.Tooltip("x:Q", title=SENSITIVITY_AXES[x_param], format=",.4~f"),
+                             alt.Tooltip("y:Q", title=SENSITIVITY_AXES[y_param], format=",.4~f"),
+                             alt.Tooltip("NPV (백만원):Q", format=",.1f"), alt.Tooltip("is_zombie:N", title="좀비 배관")],
+                )
+                base_point = alt.Chart(pd.DataFrame({
+                    "x": [sensitivity_base_value(base_dict, x_param)], "y": [sensitivity_base_value(base_dict, y_param)],
+                })).mark_point(shape="cross", size=150, color="black").encode(x="x:Q", y="y:Q")
+                st.altair_chart(heatmap + base_point, use_container_width=True)
+                npv_positive = (grid.npv >= 0).mean() * 100
+                zombie_share = grid.is_zombie.mean() * 100
+                st.caption(f"격자 {grid_res}×{grid_res} · NPV ≥ 0 영역 {npv_positive:.1f}% · 좀비 배관 영역 {zombie_share:.1f}% · ✚ 현재 입력값")
+
+            st.markdown("#### 🌪️ 토네이도 차트 (입력별 NPV 변동폭)")
+            tornado_df = simulation_cache.get_or_compute(tornado, scenario_base, tornado_change / 100)
+            tornado_df = tornado_df[tornado_df["swing"] > 0]
+            bars = pd.DataFrame({
+                "입력": np.repeat(tornado_df["label"].to_numpy(), 2),
+                "구분": np.tile([f"-{tornado_change}%", f"+{tornado_change}%"], len(tornado_df)),
+                "NPV (백만원)": np.column_stack([tornado_df["npv_low"], tornado_df["npv_high"]]).ravel() / 1e6,
+                "기준 NPV (백만원)": tornado_df.attrs["base_npv"] / 1e6,
+            })
+            tornado_chart = alt.Chart(bars).mark_bar().encode(
+                y=alt.Y("입력:N", sort=list(tornado_df["label"]), title=None),
+                x=alt.X("NPV (백만원):Q"), x2="기준 NPV (백만원):Q",
+                color=alt.Color("구분:N", scale=alt.Scale(range=["#d62728", "#1f77b4"])),
+                tooltip=["입력", "구분", alt.Tooltip("NPV (백만원):Q", format=",.1f")],
+            )
+            st.altair_chart(tornado_chart, use_container_width=True)
+
+        # ------------------------------------------------------------------
+        # [UI] 연도별 가정 (판매량 램프업 · 요금 개정 · 유지관리비 상승)
+        # ------------------------------------------------------------------
+        diagnostics.stage("연도별 가정")
+        with st.expander("📆 [연도별 가정] 판매량 램프업 · 요금 개정 · 유지관리비 상승 반영"):
+            st.caption("매년 같은 판매량·단가·판관비를 가정하는 기본 분석과 달리, 연차별로 달라지는 값을 반영해 다시 계산합니다.")
+            pf1, pf2, pf3 = st.columns(3)
+            with pf1:
+                ramp_kind = st.radio("판매량 램프업", ["없음", "직선형", "S자형"], horizontal=True)
+                ramp_years = st.number_input("100% 도달 연차 (년)", value=5, min_value=1, max_value=20, step=1)
+                ramp_start = st.number_input("1년차 판매 비율 (%)", value=30.0, min_value=0.0, max_value=100.0, step=5.0)
+            with pf2:
+                tariff_growth = st.number_input("연간 요금 변동률 (%)", value=0.0, step=0.5, format="%.1f")
+                om_growth = st.number_input("연간 유지·관리비 상승률 (%)", value=2.0, step=0.5, format="%.1f")
+            with pf3:
+                use_schedule = st.checkbox("요금 개정 이력 적용", value=False, disabled=group_sel == "복합용도",
+                                           help="복합용도는 판매액을 직접 입력하므로 개정 이력 대신 연간 요금 변동률만 적용됩니다.")
+                supply_start = st.date_input("공급 개시일", value=pd.Timestamp.today().date())
+
+            if ramp_kind == "직선형":
+                volume_ramp = linear_ramp(ramp_years, ramp_start / 100)
+            elif ramp_kind == "S자형":
+                volume_ramp = s_curve_ramp(ramp_years / 2, steepness=8 / ramp_years)
+            else:
+                volume_ramp = None
+
+            profile_base = dict(scenario_base)
+            schedule = ()
+            if use_schedule and group_sel != "복합용도":
+                st.markdown(f"**{selected_gas_type}** 요금 개정 이력 (행을 추가해 향후 개정 단가를 입력)")
+                schedule_df = st.data_editor(
+                    pd.DataFrame({"적용일": [pd.Timestamp("2025-08-01").date()], "MJ당 판매가격": [sales_price_mj], "MJ당 사입가격": [purchase_price_mj]}),
+                    num_rows="dynamic", use_container_width=True, hide_index=True,
+                    column_config={"적용일": st.column_config.DateColumn(required=True)},
+                ).dropna()
+                if len(schedule_df):
+                    schedule = tuple((row["적용일"], selected_gas_type, float(row["MJ당 판매가격"]), float(row["MJ당 사입가격"]), bool(is_residential))
+                                     for _, row in schedule_df.iterrows())
+                    profile_base["gas_type"] = selected_gas_type
+
+            # 캐시 키로 쓰도록 위젯 값(튜플)만 받아 Profile 구성 (바깥 변수를 읽으면 키에 없는 값이 결과에 섞임)
+            def profile_analysis(base, ramp, tariff_escalation, om_escalation, schedule, start_date):
+                profile = Profile(volume_ramp=None if ramp is None else np.asarray(ramp), tariff_escalation=tariff_escalation,
+                                  om_escalation=om_escalation, tariffs=TariffSchedule(list(schedule)) if schedule else None,
+                                  start_date=start_date)
+                return simulate_profiles(dict(base), profile).iloc[0], profile_components(dict(base), profile)["flows"][0]
+
+            prof, profile_flows = simulation_cache.get_or_compute(
+                profile_analysis, tuple(profile_base.items()), None if volume_ramp is None else tuple(volume_ramp.tolist()),
+                tariff_growth / 100, om_growth / 100, schedule, supply_start)
+
+            p1, p2, p3 = st.columns(3)
+            p1.metric(f"NPV - {active_period}년 (연도별 가정)", f"{prof['npv']:,.0f} 원", delta=f"{prof['npv'] - res['npv']:,.0f} 원")
+            p2.metric("IRR (연도별 가정)", f"{prof['irr'] * 100:.2f} %" if prof['irr_code'] == IRR_OK else "계산 불가",
+                      help=IRR_REASON_MESSAGES[prof['irr_code']] or None)
+            p3.metric("할인회수기간 (연도별 가정)", f"{prof['dpp']:.1f} 년" if not math.isnan(prof['dpp']) else "회수 불가 (분석기간 내)")
+            st.caption(f"목표 판매량(기준 판매량 기준, 램프업 적용 전): 30년 **{prof['required_vol_30'] / MJ_PER_M3:,.0f} ㎥** · "
+                       f"50년 **{prof['required_vol_50'] / MJ_PER_M3:,.0f} ㎥**"
+                       + (" · 🧟‍♂️ 감가상각 종료 후 적자 연도 발생" if prof['is_zombie'] else ""))
+
+            profile_flows = profile_flows[:int(active_period) + 1]
+            compare_df = pd.DataFrame({
+                "Year": np.arange(len(profile_flows)),
+                "기본 가정": res['ledger'].cumulative_flows,
+                "연도별 가정": np.cumsum(profile_flows),
+            })
+            st.line_chart(compare_df, x="Year", y=["기본 가정", "연도별 가정"])
+
+        # ------------------------------------------------------------------
+        # [UI] 월별 분석 (하절기/하절기외 요금 · 월별 판매량 분포)
+        # ------------------------------------------------------------------
+        diagnostics.stage("월별 분석")
+        with st.expander("🗓️ [월별 분석] 하절기/하절기외 요금 · 월별 판매량 분포 반영 (600개월)"):
+            season_group = seasonal_group(selected_gas_type) if group_sel != "복합용도" else None
+            st.caption(f"연간 판매량을 월별 비중으로 나누고 달마다 해당 계절 단가를 적용합니다. 하절기: {SUMMER_MONTHS[0]}~{SUMMER_MONTHS[-1]}월. "
+                       "현금흐름은 월 단위로 할인하고 법인세·감가상각은 연 단위로 합산합니다.")
+            mc1, mc2 = st.columns([1, 2])
+            with mc1:
+                start_month = st.selectbox("공급 개시 월", list(range(1, 13)), format_func=lambda m: f"{m}월")
+                if season_group is not None:
+                    summer_key, other_key = SEASONAL_TYPES[season_group]
+                    # 선택한 계절 단가는 화면 입력값, 나머지 계절은 요금표 단가
+                    summer_sales = sales_price_mj if selected_gas_type == summer_key else gas_rates[summer_key]["sales"]
+                    summer_purchase = purchase_price_mj if selected_gas_type == summer_key else gas_rates[summer_key]["purchase"]
+                    other_sales = sales_price_mj if selected_gas_type == other_key else gas_rates[other_key]["sales"]
+                    other_purchase = purchase_price_mj if selected_gas_type == other_key else gas_rates[other_key]["purchase"]
+                    st.markdown(f"**{season_group}** 계절별 단가 (원/MJ)")
+                    st.markdown(f"- 하절기: 판매 {summer_sales:.4f} / 사입 {summer_purchase:.4f}\n"
+                                f"- 하절기외: 판매 {other_sales:.4f} / 사입 {other_purchase:.4f}")
+                else:
+                    st.caption("계절별 요금이 없는 용도는 연중 같은 단가를 적용합니다 (월별 판매량 분포와 월 할인만 반영).")
+            with mc2:
+                default_shares = MONTHLY_SHARES.get(selected_gas_type, FLAT_SHARES)
+                shares_df = st.data_editor(
+                    pd.DataFrame({"월": [f"{m}월" for m in range(1, 13)], "판매 비중 (%)": np.round(default_shares * 100, 2)}),
+                    use_container_width=True, hide_index=True, disabled=["월"], key="monthly_shares",
+                )
+            month_shares = shares_df["판매 비중 (%)"].fillna(0).to_numpy(dtype=float)
+
+            if month_shares.sum() <= 0:
+                st.warning("월별 판매 비중 합계가 0 입니다. 비중을 입력해 주세요.")
+            else:
+                monthly_base = {k: v for k, v in scenario_base if k not in ("sim_rev", "sim_cost")}
+                if season_group is not None:
+                    monthly_base.update(sales_price_mj=other_sales, purchase_price_mj=other_purchase,
+                                        summer_sales_price_mj=summer_sales, summer_purchase_price_mj=summer_purchase)
+
+                # 캐시 키로 쓰도록 튜플로 받음 (600개월 IRR·할인 계산을 같은 입력으로 반복하지 않음)
+                def monthly_analysis(base, shares, start_month):
+                    shares = np.asarray(shares)
+                    return (simulate_monthly(dict(base), shares=shares, start_month=start_month).iloc[0],
+                            monthly_components(dict(base), shares=shares, start_month=start_month)["flows"][0])
+
+                mon, monthly_flows = simulation_cache.get_or_compute(
+                    monthly_analysis, tuple(monthly_base.items()), tuple(month_shares.tolist()), start_month)
+
+                q1, q2, q3 = st.columns(3)
+                q1.metric(f"NPV - {active_period}년 (월별)", f"{mon['npv']:,.0f} 원", delta=f"{mon['npv'] - res['npv']:,.0f} 원")
+                q2.metric("IRR (월별, 연 환산)", f"{mon['irr'] * 100:.2f} %" if mon['irr_code'] == IRR_OK else "계산 불가",
+                          help=IRR_REASON_MESSAGES[mon['irr_code']] or None)
+                q3.metric("할인회수기간 (월별)", f"{mon['dpp']:.1f} 년" if not math.isnan(mon['dpp']) else "회수 불가 (분석기간 내)")
+                st.caption(f"1차년도 가스 판매마진 **{mon['gas_margin_1y']:,.0f} 원** 중 하절기 비중 **{mon['summer_margin_share'] * 100:.1f}%** · "
+                           f"목표 판매량: 30년 **{mon['required_vol_30'] / MJ_PER_M3:,.0f} ㎥** · 50년 **{mon['required_vol_50'] / MJ_PER_M3:,.0f} ㎥**"
+                           + (" · 🧟‍♂️ 감가상각 종료 후 적자 연도 발생" if mon['is_zombie'] else ""))
+
+                months_of_year = [(start_month - 1 + k) % 12 + 1 for k in range(12)]
+                first_year_df = pd.DataFrame({
+                    "월": [f"{m}월" for m in months_of_year],
+                    "순서": np.arange(12),
+                    "판매량 (㎥)": sim_vol * (month_shares / month_shares.sum())[np.array(months_of_year) - 1] / MJ_PER_M3,
+                    "계절": ["하절기" if m in SUMMER_MONTHS else "하절기외" for m in months_of_year],
+                })
+                st.altair_chart(alt.Chart(first_year_df).mark_bar().encode(
+                    x=alt.X("월:N", sort=alt.SortField("순서")), y=alt.Y("판매량 (㎥):Q"),
+                    color=alt.Color("계절:N", scale=alt.Scale(domain=["하절기", "하절기외"], range=["#ff7f0e", "#1f77b4"])),
+                    tooltip=["월", "계절", alt.Tooltip("판매량 (㎥):Q", format=",.0f")],
+                ), use_container_width=True)
+                cumulative_monthly = np.cumsum(monthly_flows[:int(active_period) * 12 + 1])
+                st.line_chart(pd.DataFrame({
+                    "Year": np.arange(len(cumulative_monthly)) / 12,
+                    "월별 누적 현금흐름": cumulative_monthly,
+                }), x="Year", y="월별 누적 현금흐름")
+
+# --------------------------------------------------------------------------
+# [UI] 디버그 패널 (계산 캐시 현황)
+# --------------------------------------------------------------------------
+with st.sidebar:
+    with st.expander("🛠️ 디버그: 계산 캐시"):
+        cache_stats = simulation_cache.stats()
+        d1, d2 = st.columns(2)
+        d1.metric("적중 (hit)", f"{cache_stats['hits']:,}")
+        d2.metric("미적중 (miss)", f"{cache_stats['misses']:,}")
+        st.caption(f"저장 {cache_stats['size']} / {cache_stats['maxsize']}건 · 적중률 {cache_stats['hit_rate'] * 100:.1f}%")
+        if st.button("캐시 비우기"):
+            simulation_cache.clear()
+    with st.expander("🛠️ 디버그: 결과 저장소"):
+        # 저장소를 끈 상태에서는 열지 않음 (default_store() 가 DB 파일을 만듦)
+        if use_store:
+            store_stats = default_store().stats()
+            e1, e2 = st.columns(2)
+            e1.metric("저장 시나리오", f"{store_stats['count']:,}")
+            e2.metric("이번 실행 적중", f"{store_stats['session_hits']:,} / {store_stats['session_hits'] + store_stats['session_misses']:,}")
+            st.caption(f"{default_store().path} · {store_stats['size_bytes'] / 1024 ** 2:,.1f} MB")
+        else:
+            st.caption("비활성 (좌측 '분석 결과 저장·재사용' 을 켜면 사용)")
+
+# --------------------------------------------------------------------------
+# [UI] 디버그 패널 (성능 진단: 재실행 단계별 시간 · 카운터 · 프로파일)
+# --------------------------------------------------------------------------
+# 패널 자체를 그리는 시간은 계측에서 빠지도록 여기서 종료
+diag_run = diagnostics.finish()
+if diag_run is not None:
+    st.session_state.diag_runs = (st.session_state.get("diag_runs", []) + [diag_run])[-DIAG_HISTORY:]
+with st.sidebar:
+    with st.expander("🛠️ 디버그: 성능 진단"):
+        st.toggle("재실행 계측", key="diag_on", help="다음 재실행부터 단계별 시간과 캐시·IRR 카운터를 모읍니다.")
+        st.checkbox("cProfile 함수별 시간", key="diag_profile", disabled=not st.session_state.get("diag_on"))
+        st.checkbox("tracemalloc 메모리 추적", key="diag_memory", disabled=not st.session_state.get("diag_on"),
+                    help="할당마다 기록하므로 켜면 재실행이 눈에 띄게 느려집니다.")
+        diag_runs = st.session_state.get("diag_runs", [])
+        if diag_runs:
+            last = diag_runs[-1]
+            f1, f2 = st.columns(2)
+            f1.metric("마지막 재실행", f"{last.duration_ms:,.1f} ms")
+            f2.metric("IRR 반복", f"{last.counters['irr_iterations']:,}",
+                      help=f"IRR 계산 {last.counters['irr_solves']:,}건")
+            st.caption(f"캐시 적중 {last.counters['cache_hits']} / 미적중 {last.counters['cache_misses']} · "
+                       f"저장소 적중 {last.counters['store_hits']} / 미적중 {last.counters['store_misses']}")
+
+            st.markdown("**단계별 시간**")
+            stages = pd.DataFrame(last.stage_summary(), columns=["name", "duration_ms"])
+            st.bar_chart(stages, x="name", y="duration_ms", horizontal=True, x_label="ms", y_label="", height=220)
+            st.markdown("**구간별 합계**")
+            st.dataframe(pd.DataFrame(last.span_summary()), hide_index=True, use_container_width=True,
+                         column_config={c: st.column_config.NumberColumn(format="%.2f") for c in ("total_ms", "max_ms")})
+            if last.profile_text:
+                with st.popover("cProfile 결과", use_container_width=True):
+                    st.code(last.profile_text, language=None)
+            if last.memory_top:
+                st.markdown(f"**메모리** (최대 {last.memory_peak_kb / 1024:,.1f} MB)")
+                st.dataframe(pd.DataFrame(last.memory_top), hide_index=True, use_container_width=True)
+
+            st.markdown(f"**최근 {len(diag_runs)}회 재실행**")
+            st.line_chart(pd.DataFrame({"ms": [run.duration_ms for run in diag_runs]}), height=120)
+            diag_path = st.text_input("JSONL 저장 경로", value=str(diagnostics.DEFAULT_LOG_PATH))
+            g1, g2 = st.columns(2)
+            if g1.button("JSONL 내보내기", use_container_width=True):
+                st.toast(f"{len(diag_runs)}회 기록 저장: {diagnostics.export_jsonl(diag_runs, diag_path)}")
+            if g2.button("기록 비우기", use_container_width=True):
+                st.session_state.diag_runs = []
+                st.rerun()
+        elif st.session_state.get("diag_on"):
+            st.caption("다음 재실행부터 기록됩니다.")
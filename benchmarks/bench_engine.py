@@ -0,0 +1,269 @@
+"""엔진 성능 벤치마크 + 회귀 비교 (결과 JSON 저장, 이전 결과와 비교).
+
+측정 항목
+- single: 단일 시나리오 지연 (30/50년, 기준 스칼라 경로 vs calculate_simulation)
+- batch: 배치 처리량 (1 ~ 1,000,000건, 경로별 상한 이내)
+- irr: IRR 솔버 비용 (npf.irr vs 2구간 닫힌 식 솔버 vs 일반 현금흐름 행렬 솔버)
+- detail: 세부 분석 표 생성·서식 (연도 루프 dict + Styler vs 원장 배열 + Arrow 변환)
+정확도 검증(check_engine)도 함께 돌려 JSON 에 남긴다 (--skip-check 로 생략).
+
+실행: python -m benchmarks.bench_engine [--out result.json] [--compare base.json] [--quick]
+"""
+import argparse
+import datetime as dt
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+import numpy_financial as npf
+import pandas as pd
+
+from pipeline_engine.core import calculate_simulation
+from pipeline_engine.ledger import build_ledger
+from pipeline_engine.monthly import simulate_monthly
+from pipeline_engine.portfolio import INPUT_COLUMNS, cash_flow_components, irr_from_flows, resolve_inputs, simulate_portfolio
+from pipeline_engine.profiles import Profile, profile_components, simulate_profiles
+from pipeline_engine.solver import two_phase_irr
+
+from .check_engine import make_inputs, print_summary, run_checks
+from .reference import reference_detail_frames, reference_detail_styles, reference_simulation
+
+# [설정] 대표 시나리오 (앱 화면 기본값 + 취사용 500m, 30만 ㎥)
+BASE_SCENARIO = {
+    "sim_len": 500.0, "sim_inv": 300_000_000, "sim_contrib": 50_000_000, "sim_other": 0,
+    "sim_vol": 12_768_900.0, "sim_rev": 301_807_009, "sim_cost": 266_225_180, "sim_jeon": 100,
+    "sim_basic_rev": 1_080_000, "rate": 0.0615, "tax": 0.22, "dep_period": 30, "analysis_period": 30,
+    "c_maint": 8222, "c_adm_jeon": 6209, "c_adm_m": 13605, "sales_price_mj": 23.6361, "purchase_price_mj": 20.8495,
+}
+_LEDGER_ARGS = ["sim_len", "sim_inv", "sim_contrib", "sim_other", "sim_rev", "sim_cost", "sim_jeon", "sim_basic_rev",
+                "rate", "tax", "dep_period", "analysis_period", "c_maint", "c_adm_jeon", "c_adm_m"]
+
+# [설정] 배치 크기와 경로별 최대 크기 (느린 경로는 큰 배치를 건너뜀)
+BATCH_SIZES = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+QUICK_SIZES = (1, 10, 100, 1_000, 10_000)
+REGRESSION_RATIO = 1.25  # 이전 결과 대비 이 배율보다 느리면 회귀로 표시
+
+
+# [함수] 한 번 호출 시간 측정 (짧으면 반복 횟수를 늘려 최솟값, 길면 한 번)
+def measure(fn, repeat=5, budget=0.2):
+    start = time.perf_counter()
+    fn()
+    first = time.perf_counter() - start
+    if first > budget:
+        return first, 1
+    number = max(1, int(budget / max(first, 1e-7) / repeat))
+    best = first
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best, number * repeat + 1
+
+
+def _record(suite, name, seconds, n=1, calls=1, **params):
+    return {"suite": suite, "name": name, **params, "n": n, "seconds": seconds,
+            "per_item_us": seconds / n * 1e6, "items_per_s": n / seconds if seconds > 0 else None, "calls": calls}
+
+
+# [함수] 단일 시나리오 지연
+def bench_single():
+    rows = []
+    for horizon in (30, 50):
+        args = tuple({**BASE_SCENARIO, "analysis_period": horizon}[k] for k in INPUT_COLUMNS)
+        for name, fn in (("reference", reference_simulation), ("calculate_simulation", calculate_simulation),
+                         ("simulate_portfolio[1]", lambda *a: simulate_portfolio(dict(zip(INPUT_COLUMNS, a))))):
+            seconds, calls = measure(lambda: fn(*args))
+            rows.append(_record("single", name, seconds, calls=calls, horizon=horizon))
+    return rows
+
+
+# [함수] 배치 처리량
+def bench_batch(sizes, max_scalar, max_matrix, max_monthly, seed=0):
+    rows = []
+    source = make_inputs(max(sizes), seed)
+    for n in sizes:
+        frame = source.iloc[:n]
+        inputs = frame[INPUT_COLUMNS]
+        paths = [("simulate_portfolio", lambda: simulate_portfolio(inputs), None)]
+        paths.append(("simulate_profiles", lambda: simulate_profiles(inputs, Profile()), max_matrix))
+        paths.append(("simulate_monthly", lambda: simulate_monthly(frame.drop(columns="edge")), max_monthly))
+        args = list(inputs.itertuples(index=False, name=None))
+        paths.append(("calculate_simulation (loop)", lambda: [calculate_simulation(*a) for a in args], max_scalar))
+        paths.append(("reference (loop)", lambda: [reference_simulation(*a) for a in args], max_scalar))
+        for name, fn, limit in paths:
+            if limit is not None and n > limit:
+                continue
+            seconds, calls = measure(fn, repeat=3)
+            rows.append(_record("batch", name, seconds, n=n, calls=calls))
+    return rows
+
+
+# [함수] IRR 솔버 비용 (같은 시나리오 묶음을 경로별로)
+def bench_irr(n=2_000, seed=0):
+    frame = make_inputs(n, seed)
+    rows = []
+    for horizon in (30, 50):
+        p = resolve_inputs(frame[INPUT_COLUMNS], analysis_period=horizon)
+        cf = cash_flow_components(p)
+        solve = cf["net_inv"] > 0
+        args = [cf[k][solve] for k in ("net_inv", "ocf_dep", "ocf_after", "dep_years", "periods")]
+        flows = profile_components(frame[INPUT_COLUMNS][solve], Profile(), horizon=horizon,
+                                   analysis_period=horizon)["flows"]
+        count = int(solve.sum())
+        _, _, iterations = two_phase_irr(*args)
+
+        seconds, calls = measure(lambda: [npf.irr(f) for f in flows[:200]], repeat=3)
+        rows.append(_record("irr", "npf.irr (loop)", seconds, n=min(200, count), calls=calls, horizon=horizon))
+        seconds, calls = measure(lambda: [two_phase_irr(*(a[i] for a in args)) for i in range(200)], repeat=3)
+        rows.append(_record("irr", "two_phase_irr (scalar)", seconds, n=min(200, count), calls=calls, horizon=horizon))
+        seconds, calls = measure(lambda: two_phase_irr(*args))
+        rows.append(_record("irr", "two_phase_irr (array)", seconds, n=count, calls=calls, horizon=horizon,
+                            mean_iterations=float(iterations[iterations > 0].mean())))
+        seconds, calls = measure(lambda: irr_from_flows(flows))
+        rows.append(_record("irr", "irr_from_flows (array)", seconds, n=count, calls=calls, horizon=horizon))
+
+    # 월별 현금흐름 (600개월, 연 환산)
+    monthly = np.repeat(flows[:, 1:] / 12, 12, axis=1)
+    monthly = np.column_stack([flows[:, 0], monthly])
+    seconds, calls = measure(lambda: irr_from_flows(monthly, periods_per_year=12))
+    rows.append(_record("irr", "irr_from_flows (monthly)", seconds, n=count, calls=calls, horizon=50))
+    return rows
+
+
+# [함수] 세부 분석 표 생성 + 화면 전송 형식 변환
+def _render_backend():
+    try:
+        from streamlit.dataframe_util import convert_pandas_df_to_arrow_bytes
+        from streamlit.elements.lib.pandas_styler_utils import marshall_styler
+        from streamlit.proto.ArrowData_pb2 import ArrowData
+    except ImportError:
+        return "pandas", lambda df: df.to_numpy(), lambda styler: styler.to_html()
+
+    def styled(styler):
+        proto = ArrowData()
+        marshall_styler(proto, styler, "bench")
+        return convert_pandas_df_to_arrow_bytes(styler.data)
+    return "streamlit", convert_pandas_df_to_arrow_bytes, styled
+
+
+def bench_detail():
+    backend, to_arrow, styled = _render_backend()
+    rows = []
+    for horizon in (30, 50):
+        p = {**BASE_SCENARIO, "analysis_period": horizon}
+        ledger_args = [p[k] for k in _LEDGER_ARGS]
+
+        def reference():
+            pnl_df, npv_df = reference_detail_frames(*ledger_args)
+            return [styled(s) for s in reference_detail_styles(pnl_df, npv_df)]
+
+        def ledger():
+            built = build_ledger(*ledger_args)
+            return [to_arrow(built.pnl_frame()), to_arrow(built.npv_frame())]
+
+        for name, fn in (("reference (dict + Styler)", reference), ("ledger (array + column_config)", ledger)):
+            seconds, calls = measure(fn)
+            rows.append(_record("detail", name, seconds, calls=calls, horizon=horizon, backend=backend))
+    return rows
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _key(row):
+    return tuple((k, row[k]) for k in ("suite", "name", "horizon", "n") if k in row)
+
+
+# [함수] 이전 결과와 비교 → (비교 행 목록, 회귀 건수)
+def compare_results(current, baseline, ratio=REGRESSION_RATIO):
+    before = {_key(row): row for row in baseline["results"]}
+    rows = []
+    for row in current["results"]:
+        old = before.get(_key(row))
+        if old is None:
+            continue
+        change = row["seconds"] / old["seconds"] if old["seconds"] > 0 else float("inf")
+        rows.append({**{k: row.get(k) for k in ("suite", "name", "horizon", "n")},
+                     "before_us": old["per_item_us"], "after_us": row["per_item_us"], "ratio": change,
+                     "regression": change > ratio})
+    return rows, sum(r["regression"] for r in rows)
+
+
+def print_results(results):
+    print(f"{'구분':<7} {'경로':<32} {'기간':>4} {'건수':>10} {'µs/건':>12} {'건/초':>14}")
+    for r in results:
+        horizon = r.get("horizon", "")
+        print(f"{r['suite']:<7} {r['name']:<32} {horizon:>4} {r['n']:>10,} {r['per_item_us']:>12.2f} {r['items_per_s']:>14,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", help="결과 JSON 저장 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON (회귀가 있으면 종료 코드 1)")
+    parser.add_argument("--ratio", type=float, default=REGRESSION_RATIO, help="회귀로 볼 배율")
+    parser.add_argument("--quick", action="store_true", help="배치 1만 건까지만")
+    parser.add_argument("--sizes", help="배치 크기 (쉼표 구분)")
+    parser.add_argument("--max-scalar", type=int, default=1_000, help="단건 루프 경로 최대 배치")
+    parser.add_argument("--max-matrix", type=int, default=100_000, help="연도별 행렬 엔진 최대 배치")
+    parser.add_argument("--max-monthly", type=int, default=10_000, help="월별 엔진 최대 배치")
+    parser.add_argument("--skip-check", action="store_true", help="정확도 검증 생략")
+    parser.add_argument("--check-n", type=int, default=3_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    sizes = tuple(int(s) for s in args.sizes.split(",")) if args.sizes else (QUICK_SIZES if args.quick else BATCH_SIZES)
+    started = time.perf_counter()
+    results = bench_single()
+    results += bench_batch(sizes, args.max_scalar, args.max_matrix, args.max_monthly, args.seed)
+    results += bench_irr(seed=args.seed)
+    results += bench_detail()
+    print_results(results)
+
+    checks = None if args.skip_check else run_checks(args.check_n, args.seed)
+    failures = sum(row["mismatches"] for row in checks) if checks else 0
+    if checks:
+        print()
+        print_summary([row for row in checks if row["mismatches"]] or checks[:0])
+        print(f"정확도 검증: 불일치 {failures:,}건" if failures else "정확도 검증: 모든 빠른 경로 일치")
+
+    report = {
+        "meta": {
+            "created_at": dt.datetime.now().isoformat(timespec="seconds"), "git_commit": _git_commit(),
+            "python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+            "platform": platform.platform(), "cpu_count": os.cpu_count(), "sizes": list(sizes),
+            "elapsed_s": time.perf_counter() - started,
+        },
+        "results": results,
+        "checks": checks,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.out}")
+
+    regressions = 0
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        compared, regressions = compare_results(report, baseline, args.ratio)
+        print(f"\n이전 결과 비교 ({baseline['meta'].get('git_commit')} → {report['meta']['git_commit']}, "
+              f"{args.ratio:.2f}배 초과 시 회귀)")
+        for r in compared:
+            flag = "  ← 회귀" if r["regression"] else ""
+            print(f"{r['suite']:<7} {r['name']:<32} {r.get('horizon') or '':>4} {r['n']:>10,} "
+                  f"{r['before_us']:>12.2f} → {r['after_us']:>12.2f} ({r['ratio']:.2f}x){flag}")
+    sys.exit(1 if failures or regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
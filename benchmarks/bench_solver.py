@@ -0,0 +1,123 @@
+"""NPV/IRR 솔버 벤치마크: 기존 경로(manual_npv + npf.irr) 대비 닫힌 식 솔버 속도 비교.
+
+단건 행(솔버 단건, 시나리오 단건)은 화면 재실행마다 타는 경로라 기존보다 느리면(1배 미만) 종료 코드 1.
+
+실행: python -m benchmarks.bench_solver [--n 2000] [--seed 0]
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+import numpy_financial as npf
+
+from pipeline_engine.core import calculate_simulation
+from pipeline_engine.portfolio import INPUT_COLUMNS
+from pipeline_engine.solver import depreciation_years, two_phase_irr, two_phase_npv
+
+from .bench_engine import BASE_SCENARIO, measure
+from .reference import reference_simulation
+
+
+# [함수] 기존 app.py 경로 (연도별 제너레이터 NPV)
+def manual_npv(rate, values):
+    return sum(v / ((1 + rate) ** i) for i, v in enumerate(values))
+
+
+# [함수] 감가상각 30년 기준 임의 2구간 현금흐름 생성
+def make_cases(n, seed):
+    rng = np.random.default_rng(seed)
+    net_inv = rng.uniform(5e7, 5e8, n)
+    ocf_dep = net_inv * rng.uniform(0.02, 0.15, n)
+    ocf_after = ocf_dep - rng.uniform(0, 0.5, n) * ocf_dep
+    rate = rng.uniform(0.03, 0.09, n)
+    return net_inv, ocf_dep, ocf_after, rate
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - start, out
+
+
+def run(n, seed, dep_period=30):
+    net_inv, ocf_dep, ocf_after, rate = make_cases(n, seed)
+    rows = []
+    for horizon in (30, 50):
+        dep_years = depreciation_years(dep_period, horizon)
+
+        def legacy():
+            out = []
+            for i in range(n):
+                flows = [-net_inv[i]] + [ocf_dep[i] if y <= dep_period else ocf_after[i] for y in range(1, horizon + 1)]
+                out.append((manual_npv(rate[i], flows), npf.irr(flows)))
+            return out
+
+        def scalar():
+            return [(two_phase_npv(rate[i], net_inv[i], ocf_dep[i], ocf_after[i], dep_years, horizon),
+                     two_phase_irr(net_inv[i], ocf_dep[i], ocf_after[i], dep_years, horizon)[0][0]) for i in range(n)]
+
+        def vectorized():
+            return (two_phase_npv(rate, net_inv, ocf_dep, ocf_after, dep_years, horizon),
+                    two_phase_irr(net_inv, ocf_dep, ocf_after, dep_years, horizon)[0])
+
+        t_legacy, ref = _timed(legacy)
+        t_scalar, _ = _timed(scalar)
+        t_vec, (npv, irr) = _timed(vectorized)
+
+        ref_npv = np.array([r[0] for r in ref])
+        ref_irr = np.array([r[1] for r in ref])
+        both = ~np.isnan(ref_irr)
+        rows.append({
+            "horizon": horizon,
+            "legacy_us": t_legacy / n * 1e6,
+            "scalar_us": t_scalar / n * 1e6,
+            "vector_us": t_vec / n * 1e6,
+            "speedup_scalar": t_legacy / t_scalar,
+            "speedup_vector": t_legacy / t_vec,
+            "max_npv_diff": float(np.max(np.abs(npv - ref_npv))),
+            "max_irr_diff": float(np.max(np.abs(irr[both] - ref_irr[both]), initial=0.0)),
+        })
+    return rows
+
+
+# [함수] 시나리오 단건 (대표 시나리오): 기존 app.py 스칼라 계산 대비 calculate_simulation
+def run_single():
+    rows = []
+    for horizon in (30, 50):
+        args = tuple({**BASE_SCENARIO, "analysis_period": horizon}[k] for k in INPUT_COLUMNS)
+        t_legacy, _ = measure(lambda: reference_simulation(*args))
+        t_engine, _ = measure(lambda: calculate_simulation(*args))
+        rows.append({"horizon": horizon, "legacy_us": t_legacy * 1e6, "engine_us": t_engine * 1e6,
+                     "speedup": t_legacy / t_engine})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"프로젝트 {args.n:,}건 (µs/건)")
+    print(f"{'기간':>4} {'기존':>10} {'솔버(단건)':>10} {'솔버(배열)':>10} {'배속(단건)':>10} {'배속(배열)':>10} {'NPV 오차(원)':>12} {'IRR 오차':>10}")
+    slow = []
+    for r in run(args.n, args.seed):
+        print(f"{r['horizon']:>4} {r['legacy_us']:>10.1f} {r['scalar_us']:>10.1f} {r['vector_us']:>10.2f} "
+              f"{r['speedup_scalar']:>9.1f}x {r['speedup_vector']:>9.0f}x {r['max_npv_diff']:>12.4f} {r['max_irr_diff']:>10.1e}")
+        if r["speedup_scalar"] < 1:
+            slow.append(f"솔버 단건 {r['horizon']}년")
+
+    print("\n시나리오 단건 (µs/건, 기존 app.py 계산 vs calculate_simulation)")
+    print(f"{'기간':>4} {'기존':>10} {'엔진':>10} {'배속':>10}")
+    for r in run_single():
+        print(f"{r['horizon']:>4} {r['legacy_us']:>10.1f} {r['engine_us']:>10.1f} {r['speedup']:>9.1f}x")
+        if r["speedup"] < 1:
+            slow.append(f"시나리오 단건 {r['horizon']}년")
+    if slow:
+        print(f"\n기존 경로보다 느림: {', '.join(slow)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
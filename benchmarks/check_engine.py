@@ -0,0 +1,241 @@
+"""정확도 검증: 모든 빠른 경로를 엔진 분리 이전 스칼라 계산(reference)과 임의 입력으로 비교.
+
+경계 사례(할인율 0, 감가상각 0년, 판매량 0, 순투자 음수, 모두 동시)를 일정 비율 섞는다.
+불일치가 하나라도 있으면 종료 코드 1.
+
+실행: python -m benchmarks.check_engine [--n 3000] [--seed 0] [--out check.json]
+"""
+import argparse
+import json
+import math
+import sys
+
+import numpy as np
+import numpy_financial as npf
+import pandas as pd
+
+from pipeline_engine.cli import run_chunk
+from pipeline_engine.core import calculate_simulation, gas_rates
+from pipeline_engine.ledger import build_ledger
+from pipeline_engine.monthly import monthly_components, simulate_monthly
+from pipeline_engine.portfolio import INPUT_COLUMNS, simulate_portfolio
+from pipeline_engine.profiles import Profile, simulate_profiles
+from pipeline_engine.screening import ZombieScreen
+from pipeline_engine.store import ScenarioStore
+
+from .reference import reference_detail_frames, reference_simulation
+
+# [설정] 경계 사례 (이름 → 적용할 입력 변경). 나머지는 일반 사례
+EDGE_CASES = {
+    "rate0": {"rate": 0.0},
+    "dep0": {"dep_period": 0},
+    "vol0": {"sim_vol": 0.0, "sim_rev": 0.0, "sim_cost": 0.0},
+    "neg_inv": {"sim_contrib": "inv_plus"},
+    "all_edges": {"rate": 0.0, "dep_period": 0, "sim_vol": 0.0, "sim_rev": 0.0, "sim_cost": 0.0, "sim_contrib": "inv_plus"},
+}
+EDGE_SHARE = 0.08  # 경계 사례별 비율
+
+# [설정] 항목별 허용 오차 (금액은 원, 기간은 년, IRR 은 소수)
+MONEY_FIELDS = ["npv", "npv_30", "net_inv", "first_ocf", "first_ebit", "sga", "dep", "margin", "avg_ocf"]
+MONEY_RTOL = 1e-9
+MONEY_ATOL = 1e-3
+IRR_ATOL = 1e-8
+DPP_ATOL = 1e-6
+VOLUME_ATOL = 1  # 올림(ceil) 직전 값의 부동소수 차이
+MONTHLY_IRR_RTOL = 1e-9  # 월별 IRR (연 환산) 상대 오차
+MONTHLY_LIMIT = 30  # npf.irr 이 600차 다항식 근을 구하느라 행당 0.3초 이상 걸려 앞쪽 일부만 비교
+
+
+# [함수] 임의 입력 생성 (app 입력 범위 기준, 경계 사례 포함)
+def make_inputs(n, seed):
+    rng = np.random.default_rng(seed)
+    types = np.array(list(gas_rates))
+    gas_type = types[rng.integers(len(types), size=n)]
+    sales = np.array([gas_rates[t]["sales"] for t in gas_type])
+    purchase = np.array([gas_rates[t]["purchase"] for t in gas_type])
+    residential = np.array([gas_rates[t]["is_residential"] for t in gas_type])
+
+    sim_len = rng.uniform(10, 2000, n).round()
+    sim_inv = (sim_len * rng.uniform(2e5, 1.2e6, n)).round()
+    sim_jeon = np.where(residential, rng.integers(0, 500, n), rng.integers(0, 3, n)).astype(float)
+    sim_vol = rng.lognormal(np.log(5e6), 1.2, n).round()
+    frame = pd.DataFrame({
+        "gas_type": gas_type, "sim_len": sim_len, "sim_inv": sim_inv,
+        "sim_contrib": (sim_inv * rng.uniform(0, 0.5, n)).round(),
+        "sim_other": np.where(rng.random(n) < 0.2, (sim_inv * rng.uniform(0, 0.3, n)).round(), 0.0),
+        "sim_vol": sim_vol, "sim_rev": np.trunc(sim_vol * sales), "sim_cost": np.trunc(sim_vol * purchase),
+        "sim_jeon": sim_jeon, "sim_basic_rev": np.where(residential, 900 * sim_jeon * 12, 0.0),
+        "rate": rng.uniform(0.01, 0.12, n).round(4), "tax": rng.choice([0.22, 0.242, 0.0], n, p=[0.6, 0.3, 0.1]),
+        "dep_period": rng.choice([10, 20, 30, 40], n).astype(float),
+        "analysis_period": np.where(rng.random(n) < 0.8, rng.choice([30, 50], n), rng.integers(1, 51, n)).astype(float),
+        "c_maint": (8222 * rng.uniform(0.5, 1.5, n)).round(), "c_adm_jeon": (6209 * rng.uniform(0.5, 1.5, n)).round(),
+        "c_adm_m": (13605 * rng.uniform(0.5, 1.5, n)).round(),
+        "sales_price_mj": sales, "purchase_price_mj": purchase,
+    })
+
+    edge = np.full(n, "normal", dtype=object)
+    slots = rng.permutation(n)
+    per_edge = int(n * EDGE_SHARE)
+    for k, (name, changes) in enumerate(EDGE_CASES.items()):
+        rows = slots[k * per_edge:(k + 1) * per_edge]
+        edge[rows] = name
+        for column, value in changes.items():
+            if value == "inv_plus":
+                # 분담금이 공사비보다 커서 순투자액이 음수
+                value = frame.loc[rows, "sim_inv"] * rng.uniform(1.05, 1.5, len(rows))
+            frame.loc[rows, column] = value
+    frame.insert(0, "edge", edge)
+    return frame
+
+
+# [함수] 한 항목 비교 → (불일치 마스크, 절대 오차)
+def compare_field(field, ref, fast):
+    ref = np.asarray(ref, dtype=float)
+    fast = np.asarray(fast, dtype=float)
+    both_nan = np.isnan(ref) & np.isnan(fast)
+    with np.errstate(invalid="ignore"):
+        error = np.where(both_nan | (ref == fast), 0.0, np.abs(fast - ref))
+    if field in MONEY_FIELDS:
+        limit = MONEY_ATOL + MONEY_RTOL * np.maximum(np.abs(ref), 1.0)
+    elif field == "irr":
+        limit = IRR_ATOL
+    elif field == "dpp":
+        limit = DPP_ATOL
+    elif field.startswith("required_vol"):
+        limit = VOLUME_ATOL
+    else:
+        limit = 1e-12 * np.maximum(np.abs(ref), 1.0)
+    error = np.where(np.isnan(error), np.inf, error)
+    return error > limit, error
+
+
+def _as_float(values):
+    return [math.nan if v is None else float(v) for v in values]
+
+
+# [함수] 기준 계산 (행별 reference_simulation) → 결과 DataFrame
+def reference_results(frame):
+    rows = [reference_simulation(*args) for args in frame[INPUT_COLUMNS].itertuples(index=False, name=None)]
+    return pd.DataFrame(rows, index=frame.index)
+
+
+# [함수] 검사할 빠른 경로 (이름 → (비교 항목, 결과 DataFrame 계산 함수))
+def fast_paths(frame):
+    args = list(frame[INPUT_COLUMNS].itertuples(index=False, name=None))
+    inputs = frame[INPUT_COLUMNS]
+    all_fields = ["npv", "npv_30", "irr", "dpp", "net_inv", "first_ocf", "first_ebit", "sga", "dep", "margin",
+                  "required_vol_30", "required_vol_50", "avg_ocf", "is_zombie", "zombie_threshold_pct"]
+
+    def scalar():
+        return pd.DataFrame([calculate_simulation(*a) for a in args], index=frame.index)
+
+    def store():
+        # 한 번 계산해 저장한 뒤 저장소에서 다시 읽은 결과 (원장 복원 포함)
+        scenario_store = ScenarioStore(":memory:")
+        for gas_type, a in zip(frame["gas_type"], args):
+            scenario_store.simulate(gas_type, *a)
+        restored = pd.DataFrame([scenario_store.simulate(gas_type, *a) for gas_type, a in zip(frame["gas_type"], args)],
+                                index=frame.index)
+        assert scenario_store.hits == len(args)
+        return restored
+
+    return {
+        "calculate_simulation": (all_fields, scalar),
+        "simulate_portfolio": (all_fields, lambda: simulate_portfolio(inputs)),
+        "cli.run_chunk": (all_fields, lambda: run_chunk(inputs, {}).set_axis(frame.index)),
+        "simulate_profiles": (["npv", "irr", "dpp", "net_inv", "first_ocf", "required_vol_30", "required_vol_50"],
+                              lambda: simulate_profiles(inputs, Profile())),
+        "ScenarioStore": (all_fields, store),
+        "ZombieScreen": (["npv", "net_inv", "sga", "margin", "is_zombie", "zombie_threshold_pct"],
+                         lambda: ZombieScreen(inputs).frame()),
+    }
+
+
+# [함수] 세부 분석 표 비교 (원장 표 = 기준 표를 원 단위 반올림한 값)
+def check_detail_frames(frame, limit=200):
+    worst = 0.0
+    bad = 0
+    for args in frame[INPUT_COLUMNS].head(limit).itertuples(index=False, name=None):
+        p = dict(zip(INPUT_COLUMNS, args))
+        ledger_args = [p[k] for k in ("sim_len", "sim_inv", "sim_contrib", "sim_other", "sim_rev", "sim_cost", "sim_jeon",
+                                      "sim_basic_rev", "rate", "tax", "dep_period", "analysis_period",
+                                      "c_maint", "c_adm_jeon", "c_adm_m")]
+        ledger = build_ledger(*ledger_args)
+        ref_pnl, ref_npv = reference_detail_frames(*ledger_args)
+        for ours, ref in ((ledger.pnl_frame(), ref_pnl), (ledger.npv_frame(), ref_npv)):
+            same_shape = list(ours.columns) == list(ref.columns) and (ours["구분"] == ref["구분"]).all()
+            diff = np.abs(ours.iloc[:, 1:].to_numpy(float) - ref.iloc[:, 1:].to_numpy(float)) if same_shape else [np.inf]
+            worst = max(worst, float(np.max(diff, initial=0.0)))
+            bad += int(not same_shape or np.max(diff, initial=0.0) > 0.5 + 1e-6)
+    return {"path": "Ledger.pnl_frame/npv_frame", "field": "table", "cases": min(limit, len(frame)),
+            "mismatches": bad, "max_abs_err": worst, "worst_edge": None}
+
+
+# [함수] 월별 IRR 비교 (월별 현금흐름에 npf.irr 을 적용해 연 환산한 값 기준, IRR 코드가 ok 인 행)
+def check_monthly_irr(frame, limit=MONTHLY_LIMIT):
+    sample = frame.head(limit).drop(columns="edge")
+    result = simulate_monthly(sample)
+    flows = monthly_components(sample)["flows"]
+    ref = np.array([(1 + r) ** 12 - 1 if np.isfinite(r) else np.nan for r in map(npf.irr, flows)])
+    fast = result["irr"].to_numpy(dtype=float)
+    solvable = (result["irr_code"] == "ok").to_numpy()
+    with np.errstate(invalid="ignore"):
+        error = np.where(solvable, np.abs(fast - ref), 0.0)
+    error = np.where(np.isnan(error), np.inf, error)
+    bad = error > MONTHLY_IRR_RTOL * np.maximum(np.abs(ref), 1.0)
+    return {"path": "simulate_monthly", "field": "irr (npf.irr)", "cases": len(sample), "mismatches": int(bad.sum()),
+            "max_abs_err": float(error.max(initial=0.0)),
+            "worst_edge": frame["edge"].iloc[int(np.argmax(error))] if bad.any() else None,
+            "bad_edges": frame["edge"].head(limit)[bad].value_counts().to_dict() if bad.any() else {}}
+
+
+# [함수] 전체 검증 → 경로·항목별 요약 목록 (monthly_limit: npf.irr 로 확인할 월별 행 수, 행당 ~0.35초)
+def run_checks(n=3000, seed=0, monthly_limit=MONTHLY_LIMIT):
+    frame = make_inputs(n, seed)
+    ref = reference_results(frame)
+    summary = []
+    for path, (fields, compute) in fast_paths(frame).items():
+        fast = compute()
+        for field in fields:
+            ref_values = _as_float(ref[field]) if field == "irr" else ref[field].astype(float)
+            fast_values = _as_float(fast[field]) if field == "irr" else fast[field].astype(float)
+            bad, error = compare_field(field, ref_values, fast_values)
+            worst = int(np.argmax(error)) if len(error) else 0
+            summary.append({
+                "path": path, "field": field, "cases": n, "mismatches": int(bad.sum()),
+                "max_abs_err": float(np.where(np.isfinite(error), error, np.nan).max(initial=0.0))
+                if np.isfinite(error).any() else math.inf,
+                "worst_edge": frame["edge"].iloc[worst] if bad.any() else None,
+                "bad_edges": frame["edge"][bad].value_counts().to_dict() if bad.any() else {},
+            })
+    summary.append(check_detail_frames(frame))
+    summary.append(check_monthly_irr(frame, monthly_limit))
+    return summary
+
+
+def print_summary(summary):
+    print(f"{'경로':<28} {'항목':<22} {'건수':>6} {'불일치':>6} {'최대 오차':>12}  경계 사례")
+    for row in summary:
+        edges = ", ".join(f"{k} {v}" for k, v in row.get("bad_edges", {}).items())
+        print(f"{row['path']:<28} {row['field']:<22} {row['cases']:>6,} {row['mismatches']:>6} {row['max_abs_err']:>12.3g}  {edges}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, default=3000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    summary = run_checks(args.n, args.seed)
+    print_summary(summary)
+    failures = sum(row["mismatches"] for row in summary)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"n": args.n, "seed": args.seed, "checks": summary}, f, ensure_ascii=False, indent=2)
+    print(f"\n불일치 {failures:,}건" if failures else "\n모든 빠른 경로가 기준 계산과 일치")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
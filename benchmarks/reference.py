@@ -0,0 +1,125 @@
+"""정확도 비교 기준: 엔진 분리 이전 app.py 의 스칼라 계산 경로.
+
+연도 루프 + manual_npv + npf.irr 로 한 시나리오씩 계산하고, 세부 분석 표도
+연도별 dict 를 채운 뒤 Styler 로 천 단위 서식을 입히던 방식 그대로 만든다.
+빠른 경로(닫힌 식 솔버·벡터화 엔진·원장)는 모두 이 결과와 비교한다.
+"""
+import math
+
+import numpy as np
+import numpy_financial as npf
+import pandas as pd
+
+
+# [함수] 연도별 제너레이터 NPV
+def manual_npv(rate, values):
+    return sum(v / ((1 + rate) ** i) for i, v in enumerate(values))
+
+
+# [함수] 할인회수기간 (연도 루프, 회수 연도 안에서 선형 보간)
+def reference_payback(flows, rate):
+    cum = 0.0
+    for year, flow in enumerate(flows):
+        pv = flow / ((1 + rate) ** year)
+        if cum + pv >= 0:
+            return 0.0 if year == 0 else year - 1 - cum / pv
+        cum += pv
+    return math.nan
+
+
+# [함수] 단일 시나리오 기준 계산 (calculate_simulation 과 같은 인자·결과 키)
+def reference_simulation(sim_len, sim_inv, sim_contrib, sim_other, sim_vol, sim_rev, sim_cost,
+                         sim_jeon, sim_basic_rev, rate, tax, dep_period, analysis_period, c_maint, c_adm_jeon, c_adm_m,
+                         sales_price_mj, purchase_price_mj):
+    net_inv = sim_inv - sim_contrib - sim_other
+    margin_total = (sim_rev - sim_cost) + sim_basic_rev
+    cost_sga = (sim_len * c_maint) + (sim_len * c_adm_m) + (sim_jeon * c_adm_jeon)
+    annual_depreciation = sim_inv / dep_period if dep_period > 0 else 0
+
+    flows = [-net_inv]
+    ocfs = []
+    for year in range(1, int(analysis_period) + 1):
+        current_dep = annual_depreciation if year <= dep_period else 0
+        current_ebit = margin_total - cost_sga - current_dep
+        current_ocf = current_ebit * (1 - tax) + current_dep
+        flows.append(current_ocf)
+        ocfs.append(current_ocf)
+
+    ocf_with_dep = (margin_total - cost_sga - annual_depreciation) * (1 - tax) + annual_depreciation
+    ocf_without_dep = (margin_total - cost_sga) * (1 - tax)
+
+    irr_val = None
+    if net_inv > 0 and not all(f <= 0 for f in ocfs):
+        try:
+            irr_val = float(npf.irr(flows))
+        except Exception:
+            irr_val = None
+        if irr_val is not None and math.isnan(irr_val):
+            irr_val = None
+
+    unit_margin_for_req = sales_price_mj - purchase_price_mj
+
+    def get_req_vol(target_period):
+        pvifa_total = (1 - (1 + rate) ** (-target_period)) / rate if rate != 0 else target_period
+        pvifa_dep = (1 - (1 + rate) ** (-min(target_period, dep_period))) / rate if rate != 0 else min(target_period, dep_period)
+        if pvifa_total > 0 and (1 - tax) > 0:
+            target_margin = (net_inv - annual_depreciation * tax * pvifa_dep) / (pvifa_total * (1 - tax)) + cost_sga
+            req_v = (target_margin - sim_basic_rev) / unit_margin_for_req if unit_margin_for_req > 0 else 0
+            return math.ceil(max(0, req_v))
+        return 0
+
+    npv_val = manual_npv(rate, flows)
+    return {
+        "npv": npv_val, "npv_30": manual_npv(rate, flows[:31]) if len(flows) >= 31 else npv_val,
+        "irr": irr_val, "dpp": reference_payback(flows, rate), "net_inv": net_inv,
+        "first_ocf": ocfs[0] if ocfs else 0, "first_ebit": margin_total - cost_sga - annual_depreciation,
+        "sga": cost_sga, "dep": annual_depreciation, "margin": margin_total, "flows": flows,
+        "required_vol_30": get_req_vol(30), "required_vol_50": get_req_vol(50),
+        "avg_ocf": float(np.mean(ocfs)) if ocfs else math.nan,
+        "is_zombie": (ocf_with_dep > 0) and (ocf_without_dep < 0),
+        "zombie_threshold_pct": (margin_total / cost_sga - 1) * 100 if cost_sga > 0 else float("inf"),
+    }
+
+
+# [함수] 세부 분석 표 (연도별 dict 구성 → DataFrame, 반올림 전 실수값)
+def reference_detail_frames(sim_len, sim_inv, sim_contrib, sim_other, sim_rev, sim_cost, sim_jeon, sim_basic_rev,
+                            rate, tax, dep_period, analysis_period, c_maint, c_adm_jeon, c_adm_m):
+    years = [str(i) for i in range(1, int(analysis_period) + 1)]
+    val_margin = sim_rev - sim_cost
+    val_maint = sim_len * c_maint
+    val_adm = (sim_len * c_adm_m) + (sim_jeon * c_adm_jeon)
+    val_sga = val_maint + val_adm
+
+    pnl_dict = {"구분": [
+        "가스 판매액", "가스 판매 원가", "수익 (가스판매수익)", "수익 (기본요금수익)",
+        "판매관리비 (배관 유지비)", "판매관리비 (일반 관리비)", "판매관리비 (소계)",
+        "감가상각비", "세전 수요개발 기대이익", "세후 당기 손익", "세후 수요개발 기대이익",
+    ]}
+    npv_dict = {"구분": [
+        "세후 수요개발 기대이익", "배관공사 투자금액", "시설 분담금", "기타 이익",
+        "Free Cash Flow", "순현재가치(NPV) 환산", "미회수 투자액",
+    ]}
+    net_inv = sim_inv - sim_contrib - sim_other
+    npv_dict["초기투자"] = [0, -sim_inv, sim_contrib, sim_other, -net_inv, -net_inv, -net_inv]
+
+    cum_pv = -net_inv
+    for i, y in enumerate(years):
+        period = i + 1
+        current_dep = sim_inv / dep_period if (dep_period > 0 and period <= dep_period) else 0
+        current_ebit = (val_margin + sim_basic_rev) - val_sga - current_dep
+        current_ni = current_ebit * (1 - tax)
+        current_ocf = current_ni + current_dep
+        pnl_dict[y] = [sim_rev, sim_cost, val_margin, sim_basic_rev, val_maint, val_adm, val_sga,
+                       current_dep, current_ebit, current_ni, current_ocf]
+        discounted_fcf = current_ocf / ((1 + rate) ** period)
+        cum_pv += discounted_fcf
+        npv_dict[y] = [current_ocf, 0, 0, 0, current_ocf, discounted_fcf, cum_pv]
+    return pd.DataFrame(pnl_dict), pd.DataFrame(npv_dict)
+
+
+# [함수] 세부 분석 표 Styler (셀마다 천 단위 서식 문자열 생성)
+def reference_detail_styles(pnl_df, npv_df):
+    years = list(pnl_df.columns[1:])
+    format_dict = {"초기투자": "{:,.0f}"}
+    format_dict.update({y: "{:,.0f}" for y in years})
+    return pnl_df.style.format({y: "{:,.0f}" for y in years}), npv_df.style.format(format_dict)
@@ -0,0 +1,167 @@
+import io
+
+import streamlit as st
+import altair as alt
+import pandas as pd
+import numpy as np
+
+from pipeline_engine.core import MIXED_GROUP, USAGE_GROUPS, gas_rates
+from pipeline_engine.optimizer import EXACT_LIMIT, budget_frontier, eligible_mask, prepare_candidates, select_portfolio
+from pipeline_engine.portfolio import DEFAULT_PARAMS
+
+# [설정] 페이지 기본
+st.set_page_config(page_title="투자 예산 포트폴리오 최적화", layout="wide")
+
+EOK = 100_000_000  # 억원
+
+# [설정] 업로드 파일 예시 (컬럼명은 calculate_simulation 인자명, 단가 대신 gas_type 가능)
+TEMPLATE = pd.DataFrame({
+    "name": ["A단지 인입", "B상가 연결", "C공장 신설"],
+    "gas_type": ["취사용", "업무난방용", "산업용"],
+    "sim_len": [420.0, 180.0, 950.0],
+    "sim_inv": [310_000_000, 95_000_000, 720_000_000],
+    "sim_contrib": [40_000_000, 10_000_000, 150_000_000],
+    "sim_other": [0, 0, 0],
+    "sim_vol": [12_000_000, 3_500_000, 60_000_000],
+    "sim_jeon": [120, 8, 1],
+    "basic_price": [900, 0, 0],
+})
+
+
+# [함수] 업로드 파일 읽기 + 후보 계산 (파일 내용과 기준값이 같으면 캐시 사용)
+@st.cache_data(show_spinner="후보 프로젝트 경제성 계산 중...")
+def load_candidates(data, filename, base_params):
+    if filename.lower().endswith((".parquet", ".pq")):
+        source = pd.read_parquet(io.BytesIO(data))
+    else:
+        source = pd.read_csv(io.BytesIO(data))
+    # 기준값은 파일에 해당 컬럼이 없을 때만 적용
+    overrides = {k: v for k, v in base_params if k not in source.columns}
+    return prepare_candidates(source, rates=gas_rates, **overrides)
+
+
+st.title("📦 투자 예산 포트폴리오 최적화")
+st.markdown("후보 배관 목록을 올리면 **순투자액(공사비 - 분담금 - 기타 이익)** 예산 안에서 NPV 합계가 최대인 조합을 찾습니다.")
+
+# --------------------------------------------------------------------------
+# [UI] 좌측 사이드바 (파일에 없는 컬럼에 적용할 기준값)
+# --------------------------------------------------------------------------
+with st.sidebar:
+    st.header("⚙️ 기준값 (파일에 컬럼이 없을 때 적용)")
+    base_params = {
+        "rate": st.number_input("할인율 (%)", value=DEFAULT_PARAMS["rate"] * 100, step=0.01, format="%.2f") / 100,
+        "tax": st.number_input("법인세율+주민세율 (%)", value=DEFAULT_PARAMS["tax"] * 100, step=0.1, format="%.1f") / 100,
+        "dep_period": st.number_input("감가상각 연수 (년)", value=DEFAULT_PARAMS["dep_period"], min_value=0, step=1),
+        "analysis_period": st.number_input("경제성 분석 연수 (년)", value=DEFAULT_PARAMS["analysis_period"], min_value=1, max_value=50, step=1),
+        "c_maint": st.number_input("유지비 (원/m)", value=DEFAULT_PARAMS["c_maint"], step=100),
+        "c_adm_jeon": st.number_input("관리비 (원/전)", value=DEFAULT_PARAMS["c_adm_jeon"], step=100),
+        "c_adm_m": st.number_input("관리비 (원/m)", value=DEFAULT_PARAMS["c_adm_m"], step=100),
+    }
+
+uploaded = st.file_uploader("후보 프로젝트 파일 (CSV / Parquet)", type=["csv", "parquet", "pq"])
+st.download_button("📄 입력 양식 (CSV) 내려받기", TEMPLATE.to_csv(index=False).encode("utf-8-sig"),
+                   file_name="candidates_template.csv", mime="text/csv")
+if uploaded is None:
+    st.info("💡 컬럼명은 메인 화면 계산 인자명(sim_len, sim_inv, sim_contrib, sim_other, sim_vol, sim_jeon 등)을 사용합니다. "
+            "단가 대신 gas_type(세부 용도)을 넣으면 요금표 단가와 용도 그룹이 자동 적용되며, group 컬럼으로 그룹을 직접 지정할 수도 있습니다.")
+    st.stop()
+
+candidates = load_candidates(uploaded.getvalue(), uploaded.name, tuple(base_params.items()))
+label_col = next((c for c in ("name", "id", "project_id") if c in candidates.columns), None)
+labels = candidates[label_col].astype(str) if label_col else candidates.index.astype(str)
+
+# --------------------------------------------------------------------------
+# [UI] 선정 조건
+# --------------------------------------------------------------------------
+st.subheader("🧮 선정 조건")
+o1, o2, o3 = st.columns(3)
+with o1:
+    total_cost = float(candidates["cost"].sum())
+    budget = st.number_input("투자 예산 (억원, 순투자 기준)", value=round(total_cost * 0.3 / EOK, 1), min_value=0.0, step=1.0) * EOK
+    method_label = st.radio("선정 방식", ["자동", "정확 (분지한정법)", "빠른 탐욕 (LP 상한 표시)"], horizontal=True,
+                            help=f"자동: 조건을 만족하는 후보가 {EXACT_LIMIT}건 이하이면 정확, 초과하면 탐욕 방식")
+    method = {"자동": "auto", "정확 (분지한정법)": "exact", "빠른 탐욕 (LP 상한 표시)": "greedy"}[method_label]
+with o2:
+    exclude_zombie = st.checkbox("🧟‍♂️ 좀비 배관 제외 (감가상각 종료 후 적자)", value=True)
+    use_min_irr = st.checkbox("최소 IRR 조건 적용", value=False)
+    min_irr = st.number_input("최소 IRR (%)", value=DEFAULT_PARAMS["rate"] * 100, step=0.5, format="%.2f",
+                              disabled=not use_min_irr) / 100
+with o3:
+    st.markdown("**용도 그룹별 투자 상한 (억원, 비우면 제한 없음)**")
+    groups = [*USAGE_GROUPS, MIXED_GROUP]
+    caps_df = st.data_editor(pd.DataFrame({"그룹": groups, "상한 (억원)": np.full(len(groups), np.nan)}),
+                             hide_index=True, use_container_width=True, disabled=["그룹"], key="group_caps")
+group_caps = {row["그룹"]: row["상한 (억원)"] * EOK for _, row in caps_df.dropna().iterrows()}
+constraints = dict(min_irr=min_irr if use_min_irr else None, exclude_zombie=exclude_zombie,
+                   group_caps=group_caps or None, method=method)
+
+sel = select_portfolio(candidates, budget, **constraints)
+eligible = eligible_mask(candidates, constraints["min_irr"], exclude_zombie)
+
+# --------------------------------------------------------------------------
+# [UI] 선정 결과
+# --------------------------------------------------------------------------
+st.markdown("---")
+st.subheader("✅ 선정 결과")
+r1, r2, r3, r4 = st.columns(4)
+r1.metric("선정 프로젝트", f"{int(sel.selected.sum()):,} / {len(candidates):,} 건", help=f"조건 충족 (NPV > 0 포함) {int(eligible.sum()):,} 건")
+r2.metric("NPV 합계", f"{sel.total_npv / EOK:,.2f} 억원")
+r3.metric("사용 예산", f"{sel.capex / EOK:,.2f} 억원", delta=f"잔여 {(sel.budget - sel.capex) / EOK:,.2f} 억원", delta_color="off")
+if sel.optimal:
+    r4.metric("최적성", "최적해 보장", help=f"{sel.method} · 탐색 노드 {sel.nodes:,}개")
+else:
+    r4.metric("최적성", f"상한 대비 {sel.gap * 100:.3f}% 이내", help=f"LP 완화 상한 {sel.upper_bound / EOK:,.2f} 억원 ({sel.method})")
+
+view = pd.DataFrame({
+    "프로젝트": labels, "그룹": candidates["group"], "순투자 (억원)": candidates["cost"] / EOK,
+    "NPV (억원)": candidates["npv"] / EOK, "IRR (%)": candidates["irr"] * 100,
+    "NPV/순투자": np.where(candidates["cost"] > 0, candidates["npv"] / candidates["cost"].where(candidates["cost"] > 0), np.inf),
+    "좀비": candidates["is_zombie"], "조건 충족": eligible, "선정": sel.selected,
+})
+t1, t2 = st.tabs(["선정 목록", "전체 후보"])
+with t1:
+    st.dataframe(view[view["선정"]].sort_values("NPV (억원)", ascending=False), use_container_width=True, hide_index=True)
+with t2:
+    st.dataframe(view, use_container_width=True, hide_index=True)
+
+group_summary = view[view["선정"]].groupby("그룹")[["순투자 (억원)", "NPV (억원)"]].sum().reset_index()
+if len(group_summary):
+    st.altair_chart(alt.Chart(group_summary).mark_bar().encode(
+        x=alt.X("순투자 (억원):Q"), y=alt.Y("그룹:N"), color=alt.Color("그룹:N", legend=None),
+        tooltip=["그룹", alt.Tooltip("순투자 (억원):Q", format=",.2f"), alt.Tooltip("NPV (억원):Q", format=",.2f")],
+    ), use_container_width=True)
+
+# --------------------------------------------------------------------------
+# [UI] 예산 변화에 따른 선정 변화
+# --------------------------------------------------------------------------
+st.markdown("---")
+st.subheader("📈 예산별 선정 변화")
+f1, f2 = st.columns(2)
+max_budget = f1.number_input("최대 예산 (억원)", value=round(max(budget * 2, 1.0 * EOK) / EOK, 1), min_value=0.1, step=1.0) * EOK
+steps = f2.slider("예산 구간 수", min_value=5, max_value=50, value=20)
+summary, picks = budget_frontier(candidates, np.linspace(0, max_budget, steps + 1), **constraints)
+summary["예산 (억원)"] = summary["budget"] / EOK
+summary["NPV 합계 (억원)"] = summary["total_npv"] / EOK
+summary["선정 수"] = summary["count"]
+
+frontier = alt.Chart(summary).mark_line(point=True).encode(
+    x=alt.X("예산 (억원):Q"), y=alt.Y("NPV 합계 (억원):Q"),
+    tooltip=[alt.Tooltip("예산 (억원):Q", format=",.1f"), alt.Tooltip("NPV 합계 (억원):Q", format=",.2f"), "선정 수", "optimal"],
+)
+current = alt.Chart(pd.DataFrame({"예산 (억원)": [budget / EOK]})).mark_rule(color="red", strokeDash=[4, 4]).encode(x="예산 (억원):Q")
+st.altair_chart(frontier + current, use_container_width=True)
+
+# 한 번이라도 선정된 후보만, 처음 선정되는 예산 순으로 표시
+ever = picks.any(axis=1)
+if ever.any():
+    first_pick = picks[ever].to_numpy().argmax(axis=1)
+    order = np.argsort(first_pick, kind="stable")[:60]
+    matrix = picks[ever].iloc[order]
+    matrix_df = matrix.set_axis(labels[ever].iloc[order].to_numpy(), axis=0).set_axis(matrix.columns / EOK, axis=1) \
+        .rename_axis("프로젝트").reset_index().melt(id_vars="프로젝트", var_name="예산 (억원)", value_name="선정")
+    st.caption("예산이 늘어날 때 어떤 후보가 들어오고 빠지는지 (처음 선정되는 예산 순, 최대 60건)")
+    st.altair_chart(alt.Chart(matrix_df).mark_rect().encode(
+        x=alt.X("예산 (억원):O", axis=alt.Axis(format=",.1f")), y=alt.Y("프로젝트:N", sort=None),
+        color=alt.Color("선정:N", scale=alt.Scale(domain=[True, False], range=["#2ca02c", "#eeeeee"])),
+        tooltip=["프로젝트", alt.Tooltip("예산 (억원):O", format=",.1f"), "선정"],
+    ), use_container_width=True)
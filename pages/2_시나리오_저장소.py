@@ -0,0 +1,126 @@
+import datetime as dt
+
+import streamlit as st
+import pandas as pd
+
+from pipeline_engine.core import MIXED_GROUP, USAGE_GROUPS
+from pipeline_engine.store import ORDER_COLUMNS, default_store
+
+# [설정] 페이지 기본
+st.set_page_config(page_title="시나리오 저장소", layout="wide")
+
+EOK = 100_000_000  # 억원
+
+# [설정] 정렬 기준 표시명
+ORDER_LABELS = {"npv": "NPV", "irr": "IRR", "dpp": "할인회수기간", "created_at": "저장 시각",
+                "last_used_at": "최근 사용", "hit_count": "재사용 횟수"}
+
+
+# [함수] 비교표 값 표시 (입력·결과 값이 숫자와 문자열이 섞여 있어 문자열로 통일)
+def fmt_value(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return str(value)
+    if value != value:
+        return "-"
+    return f"{value:,.0f}" if abs(value) >= 1000 else f"{value:,.6g}"
+
+
+store = default_store()
+
+st.title("🗄️ 시나리오 저장소")
+st.markdown("메인 화면에서 분석한 시나리오가 입력값 기준으로 한 번씩만 저장됩니다. 조건으로 찾아보고 두 시나리오를 비교할 수 있습니다.")
+
+stats = store.stats()
+k1, k2, k3 = st.columns(3)
+k1.metric("저장 시나리오", f"{stats['count']:,} 건")
+k2.metric("누적 재사용", f"{stats['stored_hits']:,} 회")
+k3.metric("저장소 크기", f"{stats['size_bytes'] / 1024 ** 2:,.1f} MB", help=str(store.path))
+if not stats["count"]:
+    st.info("💡 아직 저장된 시나리오가 없습니다. 메인 화면 사이드바에서 '분석 결과 저장·재사용'을 켜고 분석을 실행해 보세요.")
+    st.stop()
+
+# --------------------------------------------------------------------------
+# [UI] 조회 조건
+# --------------------------------------------------------------------------
+with st.sidebar:
+    st.header("🔎 조회 조건")
+    known_types = [t for types in USAGE_GROUPS.values() for t in types] + [f"{MIXED_GROUP} (수기입력)"]
+    gas_types = st.multiselect("세부 용도", known_types + [t for t in stats["gas_types"] if t not in known_types])
+    use_npv = st.checkbox("NPV 범위 (억원)")
+    n1, n2 = st.columns(2)
+    npv_min = n1.number_input("최소", value=0.0, step=1.0, disabled=not use_npv, key="npv_min")
+    npv_max = n2.number_input("최대", value=100.0, step=1.0, disabled=not use_npv, key="npv_max")
+    use_irr = st.checkbox("IRR 범위 (%)")
+    i1, i2 = st.columns(2)
+    irr_min = i1.number_input("최소", value=0.0, step=0.5, disabled=not use_irr, key="irr_min")
+    irr_max = i2.number_input("최대", value=20.0, step=0.5, disabled=not use_irr, key="irr_max")
+    zombie_sel = st.radio("좀비 배관", ["전체", "좀비만", "좀비 제외"], horizontal=True)
+    label = st.text_input("시나리오 이름 포함")
+    since = st.date_input("저장일 이후", value=None)
+    st.markdown("---")
+    order_by = st.selectbox("정렬", ORDER_COLUMNS, format_func=ORDER_LABELS.get)
+    descending = st.toggle("내림차순", value=True)
+    limit = st.number_input("최대 표시 건수", value=500, min_value=10, max_value=20_000, step=100)
+
+found = store.query(
+    gas_types=gas_types or None,
+    npv_min=npv_min * EOK if use_npv else None, npv_max=npv_max * EOK if use_npv else None,
+    irr_min=irr_min / 100 if use_irr else None, irr_max=irr_max / 100 if use_irr else None,
+    is_zombie={"전체": None, "좀비만": True, "좀비 제외": False}[zombie_sel],
+    label=label.strip() or None,
+    since=dt.datetime.combine(since, dt.time()).timestamp() if since else None,
+    order_by=order_by, descending=descending, limit=int(limit), with_inputs=True,
+)
+
+# --------------------------------------------------------------------------
+# [UI] 조회 결과
+# --------------------------------------------------------------------------
+st.markdown("---")
+st.subheader("📋 조회 결과")
+st.caption(f"{len(found):,} 건 · 조회 {found.attrs['elapsed_ms']:.1f} ms")
+
+view = pd.DataFrame({
+    "선택": False, "키": found["hash"].str[:12], "이름": found["label"], "용도": found["gas_type"],
+    "NPV (억원)": found["npv"] / EOK, "IRR (%)": found["irr"] * 100, "DPP (년)": found["dpp"],
+    "좀비": found["is_zombie"], "분석 연수": found["analysis_period"], "연간 판매량 (MJ)": found["sim_vol"],
+    "총 공사비 (억원)": found["sim_inv"] / EOK, "재사용": found["hit_count"], "저장 시각": found["created_at"],
+})
+edited = st.data_editor(
+    view, hide_index=True, use_container_width=True, key="scenario_table",
+    disabled=[c for c in view.columns if c not in ("선택", "이름")],
+    column_config={"선택": st.column_config.CheckboxColumn(help="비교·삭제할 시나리오 선택"),
+                   "NPV (억원)": st.column_config.NumberColumn(format="%.2f"),
+                   "IRR (%)": st.column_config.NumberColumn(format="%.2f"),
+                   "DPP (년)": st.column_config.NumberColumn(format="%.1f")},
+)
+picked = found["hash"][edited["선택"].to_numpy()].tolist()
+
+b1, b2, _ = st.columns([1, 1, 3])
+renamed = edited["이름"].fillna("") != view["이름"].fillna("")
+if b1.button(f"이름 변경 저장 ({int(renamed.sum())}건)", disabled=not renamed.any()):
+    for key, new_label in zip(found["hash"][renamed.to_numpy()], edited["이름"][renamed]):
+        store.set_label(key, (new_label or "").strip())
+    st.rerun()
+if b2.button(f"선택 삭제 ({len(picked)}건)", disabled=not picked):
+    store.delete(picked)
+    st.rerun()
+
+# --------------------------------------------------------------------------
+# [UI] 두 시나리오 비교
+# --------------------------------------------------------------------------
+st.markdown("---")
+st.subheader("⚖️ 시나리오 비교")
+if len(picked) != 2:
+    st.info("💡 표에서 두 개를 선택하면 입력값과 결과를 나란히 비교합니다.")
+    st.stop()
+
+changed_only = st.toggle("바뀐 항목만 보기", value=True)
+compare = store.diff(picked[0], picked[1], changed_only=changed_only)
+labels = found.set_index("hash")["label"]
+names = [labels[key] if pd.notna(labels[key]) and labels[key] else key[:12] for key in picked]
+st.caption(f"A: **{names[0]}** · B: **{names[1]}**")
+compare["A"] = compare["A"].map(fmt_value)
+compare["B"] = compare["B"].map(fmt_value)
+st.dataframe(compare.drop(columns="변경").rename(columns={"A": f"A ({names[0]})", "B": f"B ({names[1]})"}),
+             use_container_width=True, hide_index=True,
+             column_config={"차이 (B-A)": st.column_config.NumberColumn(format="%.4g")})
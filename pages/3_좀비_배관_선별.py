@@ -0,0 +1,164 @@
+import hashlib
+import io
+
+import streamlit as st
+import altair as alt
+import pandas as pd
+import numpy as np
+
+from pipeline_engine.core import gas_rates
+from pipeline_engine.portfolio import DEFAULT_PARAMS
+from pipeline_engine.screening import DEFAULT_SCREEN_PARAMS, STATUSES, ZombieScreen
+
+# [설정] 페이지 기본
+st.set_page_config(page_title="좀비 배관 선별", layout="wide")
+
+EOK = 100_000_000  # 억원
+
+# [설정] 상태별 색상 (차트·요약 공통)
+STATUS_COLORS = {"좀비": "#d62728", "상시 적자": "#7f7f7f", "주의": "#ff7f0e", "정상": "#2ca02c"}
+
+# [설정] 업로드 파일 예시 (포트폴리오 최적화 화면과 같은 컬럼)
+TEMPLATE = pd.DataFrame({
+    "name": ["A단지 인입", "B상가 연결", "C공장 신설"],
+    "gas_type": ["취사용", "업무난방용", "산업용"],
+    "sim_len": [420.0, 180.0, 950.0],
+    "sim_inv": [310_000_000, 95_000_000, 720_000_000],
+    "sim_contrib": [40_000_000, 10_000_000, 150_000_000],
+    "sim_other": [0, 0, 0],
+    "sim_vol": [12_000_000, 3_500_000, 60_000_000],
+    "sim_jeon": [120, 8, 1],
+    "basic_price": [900, 0, 0],
+})
+
+
+# [함수] 업로드 파일 읽기 (파일 내용이 같으면 캐시 사용)
+@st.cache_data(show_spinner="프로젝트 파일 읽는 중...")
+def read_projects(data, filename):
+    if filename.lower().endswith((".parquet", ".pq")):
+        return pd.read_parquet(io.BytesIO(data))
+    return pd.read_csv(io.BytesIO(data))
+
+
+st.title("🧟‍♂️ 좀비 배관 선별")
+st.markdown("프로젝트 목록을 올리면 구간별 **좀비 배관(감가상각 종료 후 운영 적자)** 여부와 판관비 대비 마진 여유, "
+            "좀비 전환까지 허용되는 판관비 상승률을 한 번에 확인합니다. 좌측 기준값을 바꾸면 영향받는 항목만 다시 계산합니다.")
+
+# --------------------------------------------------------------------------
+# [UI] 좌측 사이드바 (전역 기준값)
+# --------------------------------------------------------------------------
+with st.sidebar:
+    st.header("⚙️ 기준값 (파일에 컬럼이 없을 때 적용)")
+    params = {
+        "rate": st.number_input("할인율 (%)", value=DEFAULT_PARAMS["rate"] * 100, step=0.01, format="%.2f") / 100,
+        "tax": st.number_input("법인세율+주민세율 (%)", value=DEFAULT_PARAMS["tax"] * 100, step=0.1, format="%.1f") / 100,
+        "dep_period": st.number_input("감가상각 연수 (년)", value=DEFAULT_PARAMS["dep_period"], min_value=0, step=1),
+        "analysis_period": st.number_input("경제성 분석 연수 (년)", value=DEFAULT_PARAMS["analysis_period"], min_value=1, max_value=50, step=1),
+        "c_maint": st.number_input("유지비 (원/m)", value=DEFAULT_PARAMS["c_maint"], step=100),
+        "c_adm_jeon": st.number_input("관리비 (원/전)", value=DEFAULT_PARAMS["c_adm_jeon"], step=100),
+        "c_adm_m": st.number_input("관리비 (원/m)", value=DEFAULT_PARAMS["c_adm_m"], step=100),
+    }
+    st.markdown("---")
+    params["risk_pct"] = st.number_input("'주의' 기준: 좀비 전환 임계 상승률 (%)", value=DEFAULT_SCREEN_PARAMS["risk_pct"],
+                                         min_value=0.0, step=5.0, help="판관비가 이 비율보다 적게 올라도 좀비가 되는 구간을 '주의'로 표시")
+
+uploaded = st.file_uploader("프로젝트 파일 (CSV / Parquet)", type=["csv", "parquet", "pq"])
+st.download_button("📄 입력 양식 (CSV) 내려받기", TEMPLATE.to_csv(index=False).encode("utf-8-sig"),
+                   file_name="zombie_screen_template.csv", mime="text/csv")
+if uploaded is None:
+    st.info("💡 컬럼명은 메인 화면 계산 인자명(sim_len, sim_inv, sim_contrib, sim_other, sim_vol, sim_jeon 등)을 사용합니다. "
+            "단가 대신 gas_type(세부 용도)을 넣으면 요금표 단가가 자동 적용됩니다.")
+    st.stop()
+
+# 같은 파일이면 세션에 둔 모델을 재사용하고 기준값 변경분만 반영 (프로젝트별 마진·투자액은 다시 만들지 않음)
+data = uploaded.getvalue()
+file_key = hashlib.sha1(data).hexdigest()
+screen = st.session_state.get("zombie_screen")
+if screen is None or st.session_state.get("zombie_screen_key") != file_key:
+    screen = ZombieScreen(read_projects(data, uploaded.name), rates=gas_rates, **params)
+    st.session_state.zombie_screen = screen
+    st.session_state.zombie_screen_key = file_key
+else:
+    screen.update(**params)
+
+result = screen.frame()
+curves = screen["curves"]
+summary = screen.summary()
+projects = screen.projects
+label_col = next((c for c in ("name", "id", "project_id") if c in projects.columns), None)
+labels = projects[label_col].astype(str) if label_col else projects.index.astype(str)
+
+fixed_note = f" · 파일 값 우선: {', '.join(screen.fixed)}" if screen.fixed else ""
+st.caption(f"{screen.n:,} 구간 · 이번 재계산: {', '.join(screen.recomputed) or '없음'} ({screen.elapsed_ms:.1f} ms){fixed_note}")
+
+# --------------------------------------------------------------------------
+# [UI] 상태별 요약
+# --------------------------------------------------------------------------
+st.markdown("---")
+st.subheader("📊 상태별 요약")
+for col, (status, row) in zip(st.columns(len(STATUSES)), summary.iterrows()):
+    col.metric(f"{status}", f"{int(row['count']):,} 건",
+               delta=f"순투자 {row['net_inv'] / EOK:,.1f} 억원 · NPV {row['npv'] / EOK:,.1f} 억원", delta_color="off")
+st.caption("좀비: 감가상각 기간 OCF 흑자 → 종료 후 적자 · 상시 적자: 판관비가 마진보다 커 감가상각과 무관하게 적자 · "
+           "주의: 판관비가 기준 비율보다 적게 올라도 좀비 전환")
+
+# --------------------------------------------------------------------------
+# [UI] 구간별 선별 표 (필터 + 정렬)
+# --------------------------------------------------------------------------
+st.markdown("---")
+st.subheader("📋 구간별 좀비 배관 선별")
+f1, f2, f3, f4 = st.columns([2, 2, 2, 1])
+status_sel = f1.multiselect("상태", STATUSES, default=STATUSES)
+group_sel = f2.multiselect("용도 그룹", sorted(pd.unique(result["group"])))
+keyword = f3.text_input("프로젝트명 포함")
+use_max_threshold = f4.checkbox("임계 상승률 상한")
+max_threshold = f4.number_input("상한 (%)", value=50.0, step=5.0, disabled=not use_max_threshold, label_visibility="collapsed")
+
+threshold = result["zombie_threshold_pct"]
+mask = result["status"].isin(status_sel)
+if group_sel:
+    mask &= result["group"].isin(group_sel)
+if keyword.strip():
+    mask &= labels.str.contains(keyword.strip(), regex=False).to_numpy()
+if use_max_threshold:
+    mask &= threshold <= max_threshold
+
+view = pd.DataFrame({
+    "프로젝트": labels.to_numpy(), "그룹": result["group"], "상태": result["status"],
+    "순투자 (억원)": result["net_inv"] / EOK, "연간 마진 (원)": result["margin"], "판관비 (원)": result["sga"],
+    "마진 여유 (원)": result["headroom"],
+    # 판관비 0 인 구간은 임계 상승률이 무한대 → 빈 칸
+    "임계 상승률 (%)": threshold.where(np.isfinite(threshold)),
+    "OCF 상각기간 (원)": result["ocf_dep"], "OCF 상각 후 (원)": result["ocf_after"], "NPV (억원)": result["npv"] / EOK,
+})[mask.to_numpy()].sort_values("임계 상승률 (%)", na_position="last")
+
+won_format = st.column_config.NumberColumn(format="%,d")
+st.caption(f"{len(view):,} / {screen.n:,} 구간 (열 제목을 눌러 정렬, 기본은 좀비 전환 임계 상승률 낮은 순)")
+st.dataframe(view, use_container_width=True, hide_index=True, column_config={
+    "순투자 (억원)": st.column_config.NumberColumn(format="%.2f"), "NPV (억원)": st.column_config.NumberColumn(format="%.2f"),
+    "임계 상승률 (%)": st.column_config.NumberColumn(format="%.1f", help="판관비가 이만큼 오르면 감가상각 종료 후 적자 (판관비 0 이면 빈 칸)"),
+    **{c: won_format for c in ("연간 마진 (원)", "판관비 (원)", "마진 여유 (원)", "OCF 상각기간 (원)", "OCF 상각 후 (원)")},
+})
+st.download_button("⬇️ 선별 결과 (CSV) 내려받기", view.to_csv(index=False).encode("utf-8-sig"),
+                   file_name="zombie_screen.csv", mime="text/csv")
+
+# --------------------------------------------------------------------------
+# [UI] 포트폴리오 누적 현금흐름
+# --------------------------------------------------------------------------
+st.markdown("---")
+st.subheader("📈 포트폴리오 누적 현금흐름")
+discounted = st.toggle("현재가치 기준 (할인율 반영)", value=False)
+series = ["전체 (현재가치)"] if discounted else ["전체", "좀비 배관", "좀비 외"]
+curve_df = curves.melt(id_vars="Year", value_vars=series, var_name="구분", value_name="누적 현금흐름")
+curve_df["누적 현금흐름 (억원)"] = curve_df["누적 현금흐름"] / EOK
+lines = alt.Chart(curve_df).mark_line().encode(
+    x=alt.X("Year:Q", title="연차"), y=alt.Y("누적 현금흐름 (억원):Q"),
+    color=alt.Color("구분:N", scale=alt.Scale(domain=series, range=["#1f77b4", "#d62728", "#2ca02c"][:len(series)])),
+    tooltip=["Year", "구분", alt.Tooltip("누적 현금흐름 (억원):Q", format=",.2f")],
+)
+zero = alt.Chart(pd.DataFrame({"y": [0]})).mark_rule(color="gray").encode(y="y:Q")
+layers = [lines, zero]
+if "dep_period" not in screen.fixed:
+    # 감가상각 종료 시점 (이후 좀비 배관 곡선이 꺾임)
+    layers.append(alt.Chart(pd.DataFrame({"Year": [params["dep_period"]]})).mark_rule(color="red", strokeDash=[4, 4]).encode(x="Year:Q"))
+st.altair_chart(alt.layer(*layers), use_container_width=True)
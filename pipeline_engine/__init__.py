@@ -0,0 +1,34 @@
+"""신규배관 경제성 분석 계산 엔진 (Streamlit 비의존).
+
+하위 모듈은 처음 접근할 때 import 한다 (배치 작업 시작 시간 단축).
+"""
+import importlib
+
+# [설정] 공개 이름 → 정의 모듈
+_EXPORTS = {
+    "calculate_simulation": "core", "manual_npv": "core", "gas_rates": "core", "MJ_PER_M3": "core",
+    "USAGE_GROUPS": "core", "usage_group": "core",
+    "simulate_portfolio": "portfolio", "irr_from_flows": "portfolio", "resolve_inputs": "portfolio",
+    "annuity_factor": "solver", "discounted_payback": "solver", "two_phase_irr": "solver",
+    "two_phase_npv": "solver", "two_phase_payback": "solver",
+    "solve_target": "targets",
+    "Profile": "profiles", "TariffSchedule": "profiles", "simulate_profiles": "profiles",
+    "simulate_monthly": "monthly",
+    "prepare_candidates": "optimizer", "select_portfolio": "optimizer", "budget_frontier": "optimizer",
+    "ScenarioStore": "store", "scenario_hash": "store", "default_store": "store",
+    "ZombieScreen": "screening",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,74 @@
+"""Streamlit 재실행 간 시뮬레이션 결과를 재사용하는 LRU 메모이제이션.
+
+Streamlit 은 위젯이 바뀔 때마다 app.py 전체를 다시 실행하지만, import 된 모듈은
+프로세스에 남아 있으므로 캐시를 이 모듈 수준에 둔다. 키는 함수 이름과
+정규화된 입력 튜플(30 과 30.0, numpy 스칼라와 파이썬 숫자를 같은 값으로 취급)이다.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .diagnostics import count
+
+
+# [함수] 입력값 정규화 (숫자는 float, 그 외는 그대로)
+def normalize_key(values):
+    key = []
+    for v in values:
+        if isinstance(v, (bool, np.bool_)):
+            key.append(bool(v))
+        elif isinstance(v, (int, float, np.integer, np.floating)):
+            key.append(float(v))
+        else:
+            key.append(v)
+    return tuple(key)
+
+
+class SimulationCache:
+    """크기 제한이 있는 LRU 캐시 (적중/미적중 횟수 집계)."""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, fn, *args):
+        key = (fn.__qualname__,) + normalize_key(args)
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                count("cache_hits")
+                return self._data[key]
+            self.misses += 1
+        count("cache_misses")
+
+        value = fn(*args)
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits, "misses": self.misses, "size": len(self._data),
+                "maxsize": self.maxsize, "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# 앱 전역 공유 캐시
+simulation_cache = SimulationCache()
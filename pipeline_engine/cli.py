@@ -0,0 +1,156 @@
+"""대용량 프로젝트 파일 일괄 계산 CLI.
+
+    python -m pipeline_engine projects.csv -o results.parquet --chunksize 100000 --workers 4
+
+입력(CSV/Parquet)을 고정 크기 청크로 읽어 simulate_portfolio 로 계산하고,
+결과를 청크마다 바로 출력 파일에 이어 쓴다. 동시에 메모리에 있는 청크는
+최대 (프로세스 수 x 2) 개이므로 입력 행 수와 관계없이 메모리 사용량이 일정하다.
+"""
+import argparse
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from .core import gas_rates
+from .portfolio import INPUT_COLUMNS, simulate_portfolio
+
+# [설정] 명령행에서 전체 프로젝트에 일괄 적용할 수 있는 기준값
+GLOBAL_OPTIONS = {
+    "rate": "할인율 (소수, 예: 0.0615)",
+    "tax": "법인세율+주민세율 (소수, 예: 0.22)",
+    "dep_period": "감가상각 연수 (년)",
+    "analysis_period": "경제성 분석 연수 (년)",
+    "c_maint": "유지비 (원/m)",
+    "c_adm_jeon": "관리비 (원/전)",
+    "c_adm_m": "관리비 (원/m)",
+}
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise SystemExit("Parquet 입출력에는 pyarrow 가 필요합니다 (pip install pyarrow)") from exc
+    return pyarrow
+
+
+def _is_parquet(path):
+    return Path(path).suffix.lower() in (".parquet", ".pq")
+
+
+# [함수] 입력 파일을 청크(DataFrame) 단위로 읽기
+def read_chunks(path, chunksize):
+    if _is_parquet(path):
+        pa = _require_pyarrow()
+        for batch in pa.parquet.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+class ChunkWriter:
+    """결과 청크를 CSV/Parquet 파일에 이어 쓰기."""
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = _is_parquet(path)
+        self._writer = None
+        self._schema = None
+        self._first = True
+
+    def write(self, frame):
+        if self.parquet:
+            pa = _require_pyarrow()
+            if self._writer is None:
+                table = pa.Table.from_pandas(frame, preserve_index=False)
+                self._schema = table.schema
+                self._writer = pa.parquet.ParquetWriter(self.path, self._schema)
+            else:
+                table = pa.Table.from_pandas(frame, schema=self._schema, preserve_index=False)
+            self._writer.write_table(table)
+        else:
+            frame.to_csv(self.path, mode="w" if self._first else "a", header=self._first, index=False)
+        self._first = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+# [함수] 청크 하나 계산 (프로세스 풀 작업 단위). 입력 컬럼 뒤에 결과 컬럼을 붙여 반환
+def run_chunk(chunk, overrides):
+    chunk = chunk.reset_index(drop=True)
+    # 청크마다 정수/실수 추론이 달라도 출력 스키마가 같도록 계산 입력은 실수로 통일
+    numeric = [c for c in INPUT_COLUMNS if c in chunk.columns]
+    chunk[numeric] = chunk[numeric].astype(float)
+    result = simulate_portfolio(chunk, rates=gas_rates, **overrides)
+    return pd.concat([chunk, result.drop(columns=[c for c in result.columns if c in chunk.columns])], axis=1)
+
+
+# [함수] 파일 전체 스트리밍 처리
+def run_batch(input_path, output_path, chunksize=100_000, workers=1, overrides=None, progress=None):
+    overrides = overrides or {}
+    writer = ChunkWriter(output_path)
+    rows = 0
+    start = time.perf_counter()
+
+    def emit(frame):
+        nonlocal rows
+        writer.write(frame)
+        rows += len(frame)
+        if progress:
+            progress(rows, time.perf_counter() - start)
+
+    try:
+        if workers and workers > 1:
+            # 제출한 청크 수를 제한해 메모리 상한 유지, 결과는 입력 순서대로 기록
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for chunk in read_chunks(input_path, chunksize):
+                    pending.append(pool.submit(run_chunk, chunk, overrides))
+                    if len(pending) >= workers * 2:
+                        emit(pending.popleft().result())
+                while pending:
+                    emit(pending.popleft().result())
+        else:
+            for chunk in read_chunks(input_path, chunksize):
+                emit(run_chunk(chunk, overrides))
+    finally:
+        writer.close()
+    return rows, time.perf_counter() - start
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m pipeline_engine",
+        description="신규배관 프로젝트 파일(CSV/Parquet)을 청크 단위로 일괄 계산합니다.",
+    )
+    parser.add_argument("input", help="입력 파일 (.csv / .parquet). 컬럼명은 calculate_simulation 인자명, 단가 대신 gas_type 가능")
+    parser.add_argument("-o", "--output", required=True, help="출력 파일 (.csv / .parquet)")
+    parser.add_argument("--chunksize", type=int, default=100_000, help="청크당 행 수 (기본 100,000)")
+    parser.add_argument("--workers", type=int, default=1, help="병렬 프로세스 수 (기본 1)")
+    parser.add_argument("--quiet", action="store_true", help="진행 상황 출력 생략")
+    for name, text in GLOBAL_OPTIONS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", dest=name, type=float, help=f"{text} - 입력 파일 값을 덮어씀")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.chunksize <= 0 or args.workers <= 0:
+        raise SystemExit("--chunksize 와 --workers 는 1 이상이어야 합니다")
+    overrides = {name: getattr(args, name) for name in GLOBAL_OPTIONS if getattr(args, name) is not None}
+
+    def progress(rows, elapsed):
+        print(f"\r{rows:,} 행 처리 ({rows / max(elapsed, 1e-9):,.0f} 행/초)", end="", file=sys.stderr, flush=True)
+
+    rows, elapsed = run_batch(args.input, args.output, args.chunksize, args.workers, overrides,
+                              progress=None if args.quiet else progress)
+    if not args.quiet:
+        print(f"\n완료: {rows:,} 행, {elapsed:.1f}초 → {args.output}", file=sys.stderr)
+    return 0
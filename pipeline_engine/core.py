@@ -0,0 +1,128 @@
+"""신규배관 경제성 계산 핵심 (단일 프로젝트 calculate_simulation, 요금 단가표, 단위 환산).
+
+Streamlit 없이 import 할 수 있도록 app.py 에서 분리했다.
+"""
+import math
+
+import numpy as np
+
+from .diagnostics import traced
+from .ledger import build_ledger
+from .solver import IRR_OK, IRR_REASON_MESSAGES, depreciation_years, discounted_payback, two_phase_irr, two_phase_npv
+
+# [설정] 도시가스 표준 열량 (MJ/㎥)
+MJ_PER_M3 = 42.563
+
+# [함수] 금융 계산 로직
+def manual_npv(rate, values):
+    return sum(v / ((1 + rate) ** i) for i, v in enumerate(values))
+
+@traced()
+def calculate_simulation(sim_len, sim_inv, sim_contrib, sim_other, sim_vol, sim_rev, sim_cost, 
+                         sim_jeon, sim_basic_rev, rate, tax, dep_period, analysis_period, c_maint, c_adm_jeon, c_adm_m,
+                         sales_price_mj, purchase_price_mj):
+    
+    # 1. 초기 순투자액 (Year 0)
+    net_inv = sim_inv - sim_contrib - sim_other
+    
+    # 2. 고정 수익/비용 항목 계산
+    margin_total = (sim_rev - sim_cost) + sim_basic_rev 
+    unit_margin = (sim_rev - sim_cost) / sim_vol if sim_vol > 0 else (sales_price_mj - purchase_price_mj)
+    
+    cost_sga = (sim_len * c_maint) + (sim_len * c_adm_m) + (sim_jeon * c_adm_jeon)
+    annual_depreciation = sim_inv / dep_period if dep_period > 0 else 0
+    
+    # 3. 세후 현금흐름(OCF) 산출 (연도별 원장)
+    ledger = build_ledger(sim_len, sim_inv, sim_contrib, sim_other, sim_rev, sim_cost, sim_jeon, sim_basic_rev,
+                          rate, tax, dep_period, analysis_period, c_maint, c_adm_jeon, c_adm_m)
+    flows = ledger.flows.tolist()
+    ocfs = ledger.ocf
+
+    first_ocf = ocfs[0] if len(ocfs) > 0 else 0
+    first_ebit = margin_total - cost_sga - annual_depreciation
+    
+    # 좀비 배관(가짜 흑자) 판별 및 민감도 분석 로직
+    ocf_with_dep = (margin_total - cost_sga - annual_depreciation) * (1 - tax) + annual_depreciation
+    ocf_without_dep = (margin_total - cost_sga) * (1 - tax)
+    is_zombie = (ocf_with_dep > 0) and (ocf_without_dep < 0)
+    
+    if cost_sga > 0:
+        zombie_threshold_pct = (margin_total / cost_sga - 1) * 100
+    else:
+        zombie_threshold_pct = float('inf')
+    
+    # 4. 지표 산출 (연금현가계수 닫힌 식 + 구간 보장 Newton IRR)
+    dep_years = depreciation_years(dep_period, int(analysis_period))
+    npv_val = float(two_phase_npv(rate, net_inv, ocf_with_dep, ocf_without_dep, dep_years, int(analysis_period)))
+    
+    npv_30_val = float(two_phase_npv(rate, net_inv, ocf_with_dep, ocf_without_dep, min(dep_years, 30), 30)) if len(flows) >= 31 else npv_val
+    
+    irr_vals, irr_codes, _ = two_phase_irr(net_inv, ocf_with_dep, ocf_without_dep, dep_years, int(analysis_period))
+    irr_code = irr_codes[0]
+    irr_val = float(irr_vals[0]) if irr_code == IRR_OK else None
+    irr_reason = IRR_REASON_MESSAGES[irr_code]
+    
+    # 할인회수기간: 누적 할인현금흐름이 처음 0 이상이 되는 연도 (연도 내 선형 보간)
+    dpp_val = discounted_payback(ledger.flows, rate)
+    
+    # 5. 감가상각 종료를 완벽히 반영한 목표 판매량 역산 함수
+    unit_margin_for_req = sales_price_mj - purchase_price_mj
+    
+    def get_req_vol(target_period):
+        pvifa_total = (1 - (1 + rate) ** (-target_period)) / rate if rate != 0 else target_period
+        pvifa_dep = (1 - (1 + rate) ** (-min(target_period, dep_period))) / rate if rate != 0 else min(target_period, dep_period)
+        
+        if pvifa_total > 0 and (1 - tax) > 0:
+            target_margin_minus_sga = (net_inv - annual_depreciation * tax * pvifa_dep) / (pvifa_total * (1 - tax))
+            target_margin = target_margin_minus_sga + cost_sga
+            
+            req_v = (target_margin - sim_basic_rev) / unit_margin_for_req if unit_margin_for_req > 0 else 0
+            return math.ceil(max(0, req_v))
+        return 0
+
+    required_vol_30 = get_req_vol(30)
+    required_vol_50 = get_req_vol(50)
+    
+    return {
+        "npv": npv_val, "npv_30": npv_30_val, "irr": irr_val, "irr_code": irr_code, "irr_reason": irr_reason, "dpp": dpp_val, "net_inv": net_inv, 
+        "first_ocf": first_ocf, "first_ebit": first_ebit, "sga": cost_sga, 
+        "dep": annual_depreciation, "margin": margin_total, "flows": flows, 
+        "required_vol_30": required_vol_30, "required_vol_50": required_vol_50,
+        "avg_ocf": np.mean(ocfs), "is_zombie": is_zombie,
+        "zombie_threshold_pct": zombie_threshold_pct, "ledger": ledger
+    }
+
+# --------------------------------------------------------------------------
+# [데이터] 상품별 요금 단가표 (25.8.1 기준)
+# --------------------------------------------------------------------------
+gas_rates = {
+    "취사용": {"sales": 23.6361, "purchase": 20.8495, "is_residential": True},
+    "개별난방용": {"sales": 23.6361, "purchase": 20.8495, "is_residential": True},
+    "중앙난방용(중집용)": {"sales": 23.5981, "purchase": 20.8495, "is_residential": True},
+    "영업용1(영업용)": {"sales": 22.7841, "purchase": 19.0904, "is_residential": False},
+    "영업용2(목욕탕 등)": {"sales": 22.7841, "purchase": 19.0904, "is_residential": False},
+    "업무난방용": {"sales": 23.0759, "purchase": 19.3822, "is_residential": False},
+    "냉난방공조용(하절기외)": {"sales": 21.1556, "purchase": 17.4619, "is_residential": False},
+    "냉난방공조용(하절기)": {"sales": 13.8465, "purchase": 11.5064, "is_residential": False},
+    "산업용": {"sales": 18.4438, "purchase": 17.0729, "is_residential": False},
+    "연료전지": {"sales": 15.7417, "purchase": 14.8272, "is_residential": False},
+    "열병합": {"sales": 19.0972, "purchase": 16.3486, "is_residential": False},
+    "열전용설비(주택용 외)": {"sales": 21.9164, "purchase": 19.1677, "is_residential": False},
+    "수송용": {"sales": 21.3533, "purchase": 16.5919, "is_residential": False}
+}
+
+# [설정] 용도 그룹 → 세부 용도 (요금표 키). 판매액을 수기입력하는 프로젝트는 복합용도
+USAGE_GROUPS = {
+    "가정용": ["취사용", "개별난방용", "중앙난방용(중집용)"],
+    "일반용": ["영업용1(영업용)", "영업용2(목욕탕 등)", "업무난방용", "냉난방공조용(하절기외)", "냉난방공조용(하절기)"],
+    "기타": ["산업용", "연료전지", "열병합", "열전용설비(주택용 외)", "수송용"],
+}
+MIXED_GROUP = "복합용도"
+
+
+# [함수] 세부 용도 → 용도 그룹
+def usage_group(gas_type):
+    for group, types in USAGE_GROUPS.items():
+        if gas_type in types:
+            return group
+    return MIXED_GROUP
@@ -0,0 +1,227 @@
+"""재실행 단위 계측 (구간 시간·카운터, 선택적으로 cProfile·tracemalloc).
+
+Streamlit 은 위젯이 바뀔 때마다 app.py 전체를 다시 실행한다. start() 로 한 번의
+재실행을 Run 으로 묶고 stage() 로 화면 단계(입력·계산·KPI·차트·표)를 나누면,
+엔진 쪽 span()/count() 가 현재 Run 에 중첩 구간과 카운터(캐시 적중, IRR 반복 등)를 남긴다.
+
+현재 Run 은 스레드별로 둔다 (Streamlit 은 세션마다 스크립트 스레드가 따로 돈다).
+계측을 켜지 않았으면 span() 은 공유 no-op 컨텍스트를, count() 는 즉시 반환하므로
+비용은 스레드 지역 변수 조회 한 번이다.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from contextlib import nullcontext
+from functools import wraps
+from pathlib import Path
+
+# [설정] 기본 내보내기 위치 (환경변수 PIPELINE_DIAGNOSTICS_LOG 로 변경)
+DEFAULT_LOG_PATH = Path(os.environ.get("PIPELINE_DIAGNOSTICS_LOG", Path.home() / ".pipeline_engine" / "diagnostics.jsonl"))
+
+PROFILE_TOP = 30  # cProfile 결과에서 남길 함수 수 (누적 시간 순)
+MEMORY_TOP = 15  # tracemalloc 결과에서 남길 할당 위치 수
+
+_state = threading.local()
+_NULL_SPAN = nullcontext()
+
+
+class _Span:
+    """Run 안의 한 구간 (with 문으로 사용)."""
+
+    __slots__ = ("run", "name", "attrs", "start", "mem_start")
+
+    def __init__(self, run, name, attrs):
+        self.run = run
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.run._depth += 1
+        self.mem_start = tracemalloc.get_traced_memory()[0] if self.run.trace_memory else None
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        run = self.run
+        run._depth -= 1
+        record = {"name": self.name, "depth": run._depth, "start_ms": (self.start - run._t0) * 1000,
+                  "duration_ms": (end - self.start) * 1000}
+        if self.mem_start is not None:
+            record["mem_kb"] = (tracemalloc.get_traced_memory()[0] - self.mem_start) / 1024
+        if self.attrs:
+            record["attrs"] = self.attrs
+        run.spans.append(record)
+        return False
+
+
+class Run:
+    """한 번의 재실행에서 모은 구간·카운터·프로파일 결과."""
+
+    def __init__(self, label="", profile=False, trace_memory=False):
+        self.id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.started_at = time.time()
+        self.trace_memory = trace_memory
+        self.spans = []
+        self.counters = Counter()
+        self.duration_ms = None
+        self.profile_top = None
+        self.profile_text = None
+        self.memory_peak_kb = None
+        self.memory_top = None
+        self._depth = 0
+        self._stage = None
+        self._profiler = cProfile.Profile() if profile else None
+        self._started_tracing = trace_memory and not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+        elif trace_memory:
+            tracemalloc.reset_peak()
+        self._t0 = time.perf_counter()
+        if self._profiler is not None:
+            try:
+                self._profiler.enable()
+            except ValueError:
+                # 다른 세션이 이미 프로파일링 중 (프로파일러는 프로세스에 하나만 켤 수 있음)
+                self._profiler = None
+                self.counters["profile_unavailable"] += 1
+
+    def span(self, name, attrs=None):
+        return _Span(self, name, attrs)
+
+    def stage(self, name):
+        """이전 단계를 닫고 새 최상위 단계를 연다."""
+        self.end_stage()
+        self._stage = _Span(self, name, None).__enter__()
+
+    def end_stage(self):
+        if self._stage is not None:
+            self._stage.__exit__(None, None, None)
+            self._stage = None
+
+    def close(self):
+        if self.duration_ms is not None:
+            return
+        self.end_stage()
+        if self._profiler is not None:
+            self._profiler.disable()
+        self.duration_ms = (time.perf_counter() - self._t0) * 1000
+        if self._profiler is not None:
+            stats = pstats.Stats(self._profiler, stream=io.StringIO()).sort_stats("cumulative")
+            self.profile_top = [
+                {"function": f"{Path(file).name}:{line}({func})", "calls": calls, "total_ms": total * 1000,
+                 "cumulative_ms": cumulative * 1000}
+                for (file, line, func), (_, calls, total, cumulative, _) in
+                sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:PROFILE_TOP]
+            ]
+            stats.print_stats(PROFILE_TOP)
+            self.profile_text = stats.stream.getvalue()
+            self._profiler = None
+        if self.trace_memory:
+            self.memory_peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+            # 계측 도구 자신의 할당(cProfile 통계 등)은 제외
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                [tracemalloc.Filter(False, module.__file__) for module in (tracemalloc, cProfile, pstats)]
+                + [tracemalloc.Filter(False, __file__)])
+            self.memory_top = [{"location": f"{Path(s.traceback[0].filename).name}:{s.traceback[0].lineno}",
+                                "size_kb": s.size / 1024, "count": s.count}
+                               for s in snapshot.statistics("lineno")[:MEMORY_TOP]]
+            if self._started_tracing:
+                tracemalloc.stop()
+
+    def stage_summary(self):
+        """최상위 단계별 소요 시간 목록 (실행 순서)."""
+        return [s for s in sorted(self.spans, key=lambda s: s["start_ms"]) if s["depth"] == 0]
+
+    def span_summary(self):
+        """구간 이름별 호출 수·합계·최대 시간 (합계 내림차순)."""
+        totals = {}
+        for s in self.spans:
+            row = totals.setdefault(s["name"], {"name": s["name"], "calls": 0, "total_ms": 0.0, "max_ms": 0.0})
+            row["calls"] += 1
+            row["total_ms"] += s["duration_ms"]
+            row["max_ms"] = max(row["max_ms"], s["duration_ms"])
+        return sorted(totals.values(), key=lambda row: row["total_ms"], reverse=True)
+
+    def to_record(self):
+        return {
+            "run_id": self.id, "label": self.label, "started_at": self.started_at, "duration_ms": self.duration_ms,
+            "counters": dict(self.counters), "spans": sorted(self.spans, key=lambda s: s["start_ms"]),
+            "memory_peak_kb": self.memory_peak_kb, "memory_top": self.memory_top, "profile_top": self.profile_top,
+        }
+
+
+# [함수] 현재 스레드에서 계측 시작 (끝나지 않은 이전 Run 은 닫음)
+def start(label="", profile=False, trace_memory=False):
+    finish()
+    _state.run = Run(label, profile=profile, trace_memory=trace_memory)
+    return _state.run
+
+
+# [함수] 현재 Run 종료 → Run (계측 중이 아니면 None)
+def finish():
+    run = getattr(_state, "run", None)
+    _state.run = None
+    if run is not None:
+        run.close()
+    return run
+
+
+def current():
+    return getattr(_state, "run", None)
+
+
+# [함수] 중첩 구간 (계측 중이 아니면 no-op)
+def span(name, **attrs):
+    run = getattr(_state, "run", None)
+    if run is None:
+        return _NULL_SPAN
+    return run.span(name, attrs)
+
+
+# [함수] 최상위 단계 전환 (app.py 흐름을 들여쓰기 없이 구분)
+def stage(name):
+    run = getattr(_state, "run", None)
+    if run is not None:
+        run.stage(name)
+
+
+# [함수] 카운터 증가
+def count(name, value=1):
+    run = getattr(_state, "run", None)
+    if run is not None:
+        run.counters[name] += value
+
+
+# [함수] 함수 전체를 구간으로 감싸는 데코레이터
+def traced(name=None):
+    def decorate(fn):
+        label = name or fn.__qualname__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            run = getattr(_state, "run", None)
+            if run is None:
+                return fn(*args, **kwargs)
+            with run.span(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# [함수] Run 목록을 JSON Lines 로 추가 저장 (Run 하나당 한 줄) → 저장 경로
+def export_jsonl(runs, path=None):
+    path = Path(path or DEFAULT_LOG_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for run in runs:
+            f.write(json.dumps(run.to_record(), ensure_ascii=False, default=str) + "\n")
+    return path
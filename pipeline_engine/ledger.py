@@ -0,0 +1,109 @@
+"""연도별 손익/현금흐름 원장 (항목별 NumPy 배열).
+
+시나리오마다 한 번만 만들고, 엔진 KPI·누적 현금흐름 차트·세부 분석 표가
+모두 같은 원장을 읽는다.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .diagnostics import traced
+
+PNL_ROWS = [
+    ("가스 판매액", "sales"), ("가스 판매 원가", "cogs"), ("수익 (가스판매수익)", "gas_margin"),
+    ("수익 (기본요금수익)", "basic_rev"), ("판매관리비 (배관 유지비)", "maint"),
+    ("판매관리비 (일반 관리비)", "admin"), ("판매관리비 (소계)", "sga"), ("감가상각비", "depreciation"),
+    ("세전 수요개발 기대이익", "ebit"), ("세후 당기 손익", "net_income"), ("세후 수요개발 기대이익", "ocf"),
+]
+
+NPV_ROWS = [
+    "세후 수요개발 기대이익", "배관공사 투자금액", "시설 분담금", "기타 이익",
+    "Free Cash Flow", "순현재가치(NPV) 환산", "미회수 투자액",
+]
+
+
+@dataclass(frozen=True)
+class Ledger:
+    """연도(1..N)별 항목 배열과 초기 투자 정보."""
+
+    years: np.ndarray
+    sales: np.ndarray
+    cogs: np.ndarray
+    gas_margin: np.ndarray
+    basic_rev: np.ndarray
+    maint: np.ndarray
+    admin: np.ndarray
+    sga: np.ndarray
+    depreciation: np.ndarray
+    ebit: np.ndarray
+    net_income: np.ndarray
+    ocf: np.ndarray
+    discount_factor: np.ndarray
+    pv: np.ndarray
+    cum_pv: np.ndarray
+    sim_inv: float
+    sim_contrib: float
+    sim_other: float
+
+    @property
+    def net_inv(self):
+        return self.sim_inv - self.sim_contrib - self.sim_other
+
+    @property
+    def flows(self):
+        return np.concatenate([[-self.net_inv], self.ocf])
+
+    @property
+    def cumulative_flows(self):
+        return np.cumsum(self.flows)
+
+    def chart_frame(self):
+        return pd.DataFrame({"Year": np.arange(len(self.years) + 1), "Cumulative Cash Flow": self.cumulative_flows})
+
+    @traced()
+    def pnl_frame(self):
+        values = np.rint(np.vstack([getattr(self, attr) for _, attr in PNL_ROWS])).astype(np.int64)
+        frame = pd.DataFrame(values, columns=[str(y) for y in self.years])
+        frame.insert(0, "구분", [label for label, _ in PNL_ROWS])
+        return frame
+
+    @traced()
+    def npv_frame(self):
+        zeros = np.zeros_like(self.ocf)
+        body = np.vstack([self.ocf, zeros, zeros, zeros, self.ocf, self.pv, self.cum_pv])
+        initial = [0, -self.sim_inv, self.sim_contrib, self.sim_other, -self.net_inv, -self.net_inv, -self.net_inv]
+        values = np.rint(np.column_stack([initial, body])).astype(np.int64)
+        frame = pd.DataFrame(values, columns=["초기투자"] + [str(y) for y in self.years])
+        frame.insert(0, "구분", NPV_ROWS)
+        return frame
+
+
+# [함수] 원장 생성 (연도 루프 없이 배열 연산)
+@traced()
+def build_ledger(sim_len, sim_inv, sim_contrib, sim_other, sim_rev, sim_cost, sim_jeon, sim_basic_rev,
+                 rate, tax, dep_period, analysis_period, c_maint, c_adm_jeon, c_adm_m):
+    years = np.arange(1, int(analysis_period) + 1)
+    ones = np.ones(len(years))
+
+    maint = sim_len * c_maint
+    admin = (sim_len * c_adm_m) + (sim_jeon * c_adm_jeon)
+    cost_sga = (sim_len * c_maint) + (sim_len * c_adm_m) + (sim_jeon * c_adm_jeon)
+    annual_depreciation = sim_inv / dep_period if dep_period > 0 else 0
+
+    depreciation = np.where(years <= dep_period, annual_depreciation, 0.0)
+    ebit = ((sim_rev - sim_cost) + sim_basic_rev) - cost_sga - depreciation
+    net_income = ebit * (1 - tax)
+    ocf = net_income + depreciation
+
+    discount_factor = (1 + rate) ** -years.astype(float)
+    pv = ocf * discount_factor
+    cum_pv = -(sim_inv - sim_contrib - sim_other) + np.cumsum(pv)
+
+    return Ledger(
+        years=years, sales=sim_rev * ones, cogs=sim_cost * ones, gas_margin=(sim_rev - sim_cost) * ones,
+        basic_rev=sim_basic_rev * ones, maint=maint * ones, admin=admin * ones, sga=cost_sga * ones,
+        depreciation=depreciation, ebit=ebit, net_income=net_income, ocf=ocf,
+        discount_factor=discount_factor, pv=pv, cum_pv=cum_pv,
+        sim_inv=float(sim_inv), sim_contrib=float(sim_contrib), sim_other=float(sim_other),
+    )
@@ -0,0 +1,218 @@
+"""판매량·요금 단가·유지관리 단가 불확실성을 반영한 몬테카를로 리스크 분석.
+
+판매/사입 단가를 각각 독립 분포로 뽑으면 둘의 차이(마진) 변동이 과대해지므로,
+margin_per_mj 에 분포를 주면 판매 단가 = 사입 단가 표본 + 마진 표본으로 만든다.
+이때 사입 단가 분포는 두 단가에 공통으로 걸리는 요금 수준 충격이 된다.
+
+표본은 청크 단위로 생성·평가하고, 각 청크 결과는 고정 구간 히스토그램과
+합계/제곱합에 누적하므로 표본 수와 무관하게 메모리가 일정하다.
+청크마다 SeedSequence 자식 시드를 쓰므로 병렬 프로세스 수와 상관없이
+같은 seed 는 같은 결과를 낸다.
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .diagnostics import traced
+from .portfolio import cash_flow_components, resolve_inputs
+from .solver import two_phase_npv
+
+# [설정] 확률분포를 지정할 수 있는 입력 (calculate_simulation 인자명)
+UNCERTAIN_INPUTS = ["sim_vol", "sales_price_mj", "purchase_price_mj", "margin_per_mj", "c_maint", "c_adm_m", "c_adm_jeon"]
+
+_HIST_BINS = 4096
+
+
+@dataclass(frozen=True)
+class Distribution:
+    """입력 하나의 확률분포. kind: fixed / normal / lognormal / uniform / triangular."""
+
+    kind: str
+    params: tuple
+    low: float = None
+    high: float = None
+
+    @classmethod
+    def fixed(cls, value):
+        return cls("fixed", (value,))
+
+    @classmethod
+    def normal(cls, mean, sd, low=None, high=None):
+        return cls("normal", (mean, sd), low, high)
+
+    @classmethod
+    def lognormal(cls, median, sigma):
+        return cls("lognormal", (median, sigma))
+
+    @classmethod
+    def uniform(cls, low, high):
+        return cls("uniform", (low, high))
+
+    @classmethod
+    def triangular(cls, low, mode, high):
+        return cls("triangular", (low, mode, high))
+
+    def sample(self, rng, size):
+        if self.kind == "fixed":
+            values = np.full(size, float(self.params[0]))
+        elif self.kind == "normal":
+            values = rng.normal(self.params[0], self.params[1], size)
+        elif self.kind == "lognormal":
+            values = self.params[0] * np.exp(rng.normal(0.0, self.params[1], size))
+        elif self.kind == "uniform":
+            values = rng.uniform(self.params[0], self.params[1], size)
+        elif self.kind == "triangular":
+            low, mode, high = self.params
+            values = rng.triangular(low, mode, high, size) if high > low else np.full(size, float(mode))
+        else:
+            raise ValueError(f"지원하지 않는 분포: {self.kind}")
+        if self.low is not None or self.high is not None:
+            values = np.clip(values, self.low, self.high)
+        return values
+
+
+class StreamingStats:
+    """고정 구간 히스토그램 기반 스트리밍 통계 (병합 가능)."""
+
+    def __init__(self, lo, hi, bins=_HIST_BINS):
+        self.edges = np.linspace(lo, hi, bins + 1)
+        self.counts = np.zeros(bins + 2, dtype=np.int64)  # [하한 밖, 구간..., 상한 밖]
+        self.shift = 0.5 * (lo + hi)  # 합계/제곱합의 자릿수 손실 방지용 기준점
+        self.n = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.zombies = 0
+        self.negatives = 0
+
+    def add(self, npv, is_zombie):
+        idx = np.searchsorted(self.edges, npv, side="right")
+        self.counts += np.bincount(idx, minlength=len(self.counts))[:len(self.counts)]
+        self.n += len(npv)
+        centered = npv - self.shift
+        self.total += float(centered.sum())
+        self.total_sq += float(np.square(centered).sum())
+        self.min = min(self.min, float(npv.min(initial=np.inf)))
+        self.max = max(self.max, float(npv.max(initial=-np.inf)))
+        self.zombies += int(is_zombie.sum())
+        self.negatives += int((npv < 0).sum())
+
+    def merge(self, other):
+        self.counts += other.counts
+        self.n += other.n
+        self.total += other.total
+        self.total_sq += other.total_sq
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.zombies += other.zombies
+        self.negatives += other.negatives
+
+    def mean(self):
+        return self.shift + self.total / self.n
+
+    def std(self):
+        centered_mean = self.total / self.n
+        return max(self.total_sq / self.n - centered_mean ** 2, 0.0) ** 0.5
+
+    def percentile(self, q):
+        target = q / 100 * self.n
+        cum = np.cumsum(self.counts)
+        k = int(np.searchsorted(cum, target, side="left"))
+        if k == 0:
+            return self.min
+        if k == len(self.counts) - 1:
+            return self.max
+        before = cum[k - 1]
+        frac = (target - before) / self.counts[k] if self.counts[k] else 0.0
+        lo, hi = self.edges[k - 1], self.edges[k]
+        return float(min(max(lo + frac * (hi - lo), self.min), self.max))
+
+
+@dataclass
+class MonteCarloResult:
+    n: int
+    mean: float
+    std: float
+    p10: float
+    p50: float
+    p90: float
+    prob_zombie: float
+    prob_negative: float
+    min: float
+    max: float
+    elapsed: float
+    hist_edges: np.ndarray = field(repr=False)
+    hist_counts: np.ndarray = field(repr=False)
+
+
+# [함수] 청크 하나 평가 (프로세스 풀 작업 단위)
+def _evaluate_chunk(base, spec, size, seed_seq):
+    rng = np.random.default_rng(seed_seq)
+    columns = {name: dist.sample(rng, size) for name, dist in spec.items()}
+    if "margin_per_mj" in columns:
+        columns["sales_price_mj"] = columns.get("purchase_price_mj", base.get("purchase_price_mj", 0.0)) + columns.pop("margin_per_mj")
+    p = resolve_inputs(base, **columns)
+    cf = cash_flow_components(p)
+    npv = two_phase_npv(cf["rate"], cf["net_inv"], cf["ocf_dep"], cf["ocf_after"], cf["dep_years"], cf["periods"])
+    is_zombie = (cf["ocf_dep"] > 0) & (cf["ocf_after"] < 0)
+    return np.broadcast_to(npv, (size,)), np.broadcast_to(is_zombie, (size,))
+
+
+def _run_chunk(base, spec, size, seed_seq, lo, hi):
+    stats = StreamingStats(lo, hi)
+    stats.add(*_evaluate_chunk(base, spec, size, seed_seq))
+    return stats
+
+
+# [함수] 몬테카를로 실행
+@traced()
+def run_monte_carlo(base, spec, n_draws=100_000, seed=0, chunk_size=50_000, workers=1):
+    """base: calculate_simulation 인자 dict, spec: {입력명: Distribution} (둘 다 (키, 값) 쌍 튜플 허용).
+
+    sim_vol 이나 단가에 분포를 주면 판매액/판매원가는 표본마다 다시 계산한다.
+    margin_per_mj 는 판매 단가를 대신하므로 sales_price_mj 와 함께 줄 수 없다.
+    """
+    spec = dict(spec)
+    unknown = set(spec) - set(UNCERTAIN_INPUTS)
+    if unknown:
+        raise ValueError(f"분포를 지정할 수 없는 입력: {sorted(unknown)}")
+    if {"sales_price_mj", "margin_per_mj"} <= spec.keys():
+        raise ValueError("sales_price_mj 와 margin_per_mj 는 함께 지정할 수 없음")
+    start = time.perf_counter()
+
+    # 판매량/단가가 변하면 판매액·판매원가는 표본별로 재계산
+    base = dict(base)
+    if {"sim_vol", "sales_price_mj", "purchase_price_mj", "margin_per_mj"} & spec.keys():
+        base.pop("sim_rev", None)
+        base.pop("sim_cost", None)
+
+    sizes = [min(chunk_size, n_draws - i) for i in range(0, n_draws, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    # 첫 청크로 히스토그램 범위를 정하고 그대로 집계에 포함
+    npv, is_zombie = _evaluate_chunk(base, spec, sizes[0], seeds[0])
+    lo, hi = float(npv.min()), float(npv.max())
+    pad = max(hi - lo, abs(hi), 1.0) * 0.5
+    stats = StreamingStats(lo - pad, hi + pad)
+    stats.add(npv, is_zombie)
+
+    rest = list(zip(sizes[1:], seeds[1:]))
+    if workers and workers > 1 and rest:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_run_chunk, base, spec, size, ss, lo - pad, hi + pad) for size, ss in rest]
+            for future in futures:
+                stats.merge(future.result())
+    else:
+        for size, ss in rest:
+            stats.add(*_evaluate_chunk(base, spec, size, ss))
+
+    return MonteCarloResult(
+        n=stats.n, mean=stats.mean(), std=stats.std(),
+        p10=stats.percentile(10), p50=stats.percentile(50), p90=stats.percentile(90),
+        prob_zombie=stats.zombies / stats.n, prob_negative=stats.negatives / stats.n,
+        min=stats.min, max=stats.max, elapsed=time.perf_counter() - start,
+        hist_edges=stats.edges, hist_counts=stats.counts[1:-1],
+    )
@@ -0,0 +1,228 @@
+"""월 단위(최대 600개월) 엔진: 하절기/하절기외 요금과 월별 판매량 분포 반영.
+
+판매량은 연간 판매량 x 월별 비중, 단가는 달마다 해당 계절 단가를 적용한다.
+현금흐름은 월말 기준으로 월 할인하고, 법인세와 감가상각은 운영 연도 단위로
+합산해 해당 연도 마지막 달에 반영한다 (연간 합계는 calculate_simulation 과 동일).
+"""
+import numpy as np
+import pandas as pd
+
+from .core import gas_rates
+from .diagnostics import traced
+from .portfolio import irr_from_flows, resolve_inputs
+from .profiles import _row_count, _slice_mapping, _source_column
+from .solver import (IRR_LOWER, IRR_NO_CASHFLOW, IRR_NO_INVESTMENT, IRR_NO_ROOT, IRR_OK, IRR_OUT_OF_RANGE,
+                     IRR_UPPER, discounted_payback)
+
+_BLOCK = 1024
+_TARGET_PERIODS = (30, 50)
+
+# [설정] 하절기 (5월 ~ 9월)
+SUMMER_MONTHS = (5, 6, 7, 8, 9)
+
+# [설정] 계절별 요금 용도: 그룹명 → (하절기 요금 키, 하절기외 요금 키)
+SEASONAL_TYPES = {
+    "냉난방공조용": ("냉난방공조용(하절기)", "냉난방공조용(하절기외)"),
+}
+
+
+def _normalize(shares):
+    shares = np.asarray(shares, dtype=float)
+    return shares / shares.sum()
+
+
+# [설정] 용도별 월 판매량 비중 기본값 (1월 ~ 12월, 합계 1)
+_HEATING = _normalize([17, 15, 12, 8, 4, 2, 1.5, 1.5, 2, 5, 11, 16])
+_COOKING = _normalize([1.1, 1.1, 1.05, 1.0, 0.95, 0.9, 0.9, 0.9, 0.95, 1.0, 1.05, 1.1])
+_HVAC = _normalize([14, 12, 8, 4, 5, 9, 13, 13, 7, 3, 5, 7])
+FLAT_SHARES = np.full(12, 1 / 12)
+
+MONTHLY_SHARES = {
+    "취사용": _COOKING,
+    "개별난방용": _HEATING,
+    "중앙난방용(중집용)": _HEATING,
+    "업무난방용": _HEATING,
+    "열전용설비(주택용 외)": _HEATING,
+    "냉난방공조용": _HVAC,
+    "냉난방공조용(하절기)": _HVAC,
+    "냉난방공조용(하절기외)": _HVAC,
+}
+
+MONTHLY_RESULT_COLUMNS = [
+    "npv", "irr", "irr_code", "dpp", "net_inv", "gas_margin_1y", "summer_margin_share",
+    "required_vol_30", "required_vol_50", "is_zombie",
+]
+
+
+# [함수] 용도 → 계절 그룹명 (하절기/하절기외 개별 키도 그룹으로 묶음)
+def seasonal_group(gas_type):
+    for group, keys in SEASONAL_TYPES.items():
+        if gas_type == group or gas_type in keys:
+            return group
+    return None
+
+
+# [함수] 용도별 월 단가 (12개월). 계절 요금 용도는 하절기 달에 하절기 단가 적용
+def monthly_prices(gas_type, rates=gas_rates):
+    group = seasonal_group(gas_type)
+    summer = np.isin(np.arange(1, 13), SUMMER_MONTHS)
+    if group is not None:
+        summer_key, other_key = SEASONAL_TYPES[group]
+        sales = np.where(summer, rates[summer_key]["sales"], rates[other_key]["sales"])
+        purchase = np.where(summer, rates[summer_key]["purchase"], rates[other_key]["purchase"])
+    else:
+        sales = np.full(12, float(rates[gas_type]["sales"]))
+        purchase = np.full(12, float(rates[gas_type]["purchase"]))
+    return sales, purchase
+
+
+# [함수] 프로젝트별 12개월 단가·비중 행렬 (n, 12)
+def _calendar_tables(projects, overrides, p, rates, shares):
+    n = len(p["sim_inv"])
+    gas_type = _source_column(projects, overrides, "gas_type")
+    summer = np.isin(np.arange(1, 13), SUMMER_MONTHS)
+
+    sales = np.repeat(p["sales_price_mj"][:, None], 12, axis=1)
+    purchase = np.repeat(p["purchase_price_mj"][:, None], 12, axis=1)
+    share = np.tile(FLAT_SHARES, (n, 1))
+
+    if gas_type is not None:
+        gas_type = np.broadcast_to(np.asarray(gas_type, dtype=object), (n,))
+        for name in pd.unique(gas_type):
+            sel = gas_type == name
+            if seasonal_group(name) is not None:
+                sales[sel], purchase[sel] = monthly_prices(name, rates)
+            share[sel] = MONTHLY_SHARES.get(name, FLAT_SHARES)
+
+    # 계절 단가 직접 입력 (하절기 달만 덮어씀)
+    for column, table in (("summer_sales_price_mj", sales), ("summer_purchase_price_mj", purchase)):
+        value = _source_column(projects, overrides, column)
+        if value is not None:
+            value = np.broadcast_to(np.asarray(value, dtype=float), (n,))
+            table[:, summer] = np.where(np.isnan(value)[:, None], table[:, summer], value[:, None])
+
+    # 월 비중 지정: 12개 배열(전체 공통) 또는 {용도: 12개 배열}
+    if isinstance(shares, dict):
+        if gas_type is not None:
+            for name, values in shares.items():
+                share[gas_type == name] = _normalize(values)
+    elif shares is not None:
+        share[:] = _normalize(shares)
+    return sales, purchase, share
+
+
+# [함수] 월별 현금흐름 행렬 구성 (행 = 프로젝트, 열 = 0..12 x horizon 개월)
+def monthly_components(projects=None, rates=gas_rates, shares=None, start_month=1, horizon=None, **overrides):
+    """반환 dict: flows (n, 12H+1), annual_ocf (n, H), ocf0 / ocf_slope (판매량 0 일 때 월 OCF 와 연간 판매량 1 MJ 당 증분),
+    monthly_rate, tax, net_inv, periods, months, 1차년도 가스판매수익(전체/하절기)."""
+    gas_type = _source_column(projects, overrides, "gas_type")
+    if gas_type is not None:
+        # 그룹명(냉난방공조용)은 요금표 키가 아니므로 하절기외 키로 단가를 읽은 뒤 월별 단가로 대체
+        overrides = {**overrides, "gas_type": np.array(
+            [SEASONAL_TYPES[t][1] if t in SEASONAL_TYPES else t for t in np.atleast_1d(gas_type)], dtype=object)}
+    p = resolve_inputs(projects, rates=rates, **overrides)
+    n = len(p["sim_inv"])
+    periods = np.trunc(p["analysis_period"]).astype(np.int64)
+    horizon = int(horizon or max(periods.max(), max(_TARGET_PERIODS)))
+    months = np.arange(12 * horizon)
+    year_of = months // 12
+    calendar = (start_month - 1 + months) % 12
+
+    sales, purchase, share = _calendar_tables(projects, overrides, p, rates, shares)
+    unit = (share * (sales - purchase))[:, calendar]          # 연간 판매량 1 MJ 당 월 가스판매수익
+    volume = p["sim_vol"][:, None]
+
+    tax, dep_period = p["tax"][:, None], p["dep_period"][:, None]
+    sga = (p["sim_len"] * p["c_maint"]) + (p["sim_len"] * p["c_adm_m"]) + (p["sim_jeon"] * p["c_adm_jeon"])
+    fixed = (p["sim_basic_rev"] - sga)[:, None]                # 연간 기본요금 - 판관비
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annual_dep = np.where(dep_period > 0, p["sim_inv"][:, None] / np.where(dep_period > 0, dep_period, 1.0), 0.0)
+    years = np.arange(1, horizon + 1)
+    dep = np.where(years <= dep_period, annual_dep, 0.0)      # (n, H)
+
+    # 연간 합산: 과세소득 = 가스판매수익 + 기본요금 - 판관비 - 감가상각비
+    unit_annual = unit.reshape(n, horizon, 12).sum(axis=2)
+    taxable0 = fixed - dep                                     # 판매량 0 일 때
+    pretax0 = np.broadcast_to(fixed / 12, (n, 12 * horizon))
+
+    year_end = (months % 12) == 11
+
+    def monthly_ocf(v):
+        # 세전 현금은 매월, 법인세는 운영 연도 마지막 달에 일괄 반영
+        pretax = v * unit + pretax0
+        tax_paid = np.zeros_like(pretax)
+        tax_paid[:, year_end] = (v * unit_annual + taxable0) * tax
+        return pretax - tax_paid
+
+    ocf_all = monthly_ocf(volume)
+    ocf = np.where(year_of < periods[:, None], ocf_all, 0.0)
+    ocf0 = monthly_ocf(0.0)
+    net_inv = p["sim_inv"] - p["sim_contrib"] - p["sim_other"]
+
+    # 좀비 배관: 연간 합산 OCF 기준 (감가상각 마지막 해 흑자, 종료 후 적자 연도 존재)
+    annual_ocf = ocf_all.reshape(n, horizon, 12).sum(axis=2)
+    dep_years = np.clip(np.floor(p["dep_period"]), 0, horizon).astype(np.int64)
+    last_dep_ocf = np.where(dep_years > 0, annual_ocf[np.arange(n), np.maximum(dep_years - 1, 0)], 0.0)
+    is_zombie = (last_dep_ocf > 0) & ((annual_ocf < 0) & (years > dep_period)).any(axis=1)
+
+    first_year = volume * unit[:, :12]
+    summer = np.isin(calendar[:12] + 1, SUMMER_MONTHS)
+    return {
+        "flows": np.column_stack([-net_inv, ocf]), "is_zombie": is_zombie, "annual_ocf": annual_ocf,
+        "ocf0": ocf0, "ocf_slope": monthly_ocf(1.0) - ocf0,
+        "monthly_rate": (1 + p["rate"]) ** (1 / 12) - 1, "rate": p["rate"], "tax": p["tax"],
+        "net_inv": net_inv, "periods": periods, "dep_period": p["dep_period"], "months": months + 1,
+        "gas_margin_1y": first_year.sum(axis=1), "summer_margin_1y": first_year[:, summer].sum(axis=1),
+    }
+
+
+# [함수] 목표 기간 NPV = 0 연간 판매량
+def _required_volume(c, discount, target_period):
+    # 목표 기간까지는 앞쪽 열 구간 → 잘라서 행별 내적 (n x 600 임시 행렬을 만들지 않음)
+    upto = int(np.count_nonzero(c["months"] <= 12 * target_period))
+    npv0 = -c["net_inv"] + np.einsum("ij,ij->i", c["ocf0"][:, :upto], discount[:, :upto])
+    slope = np.einsum("ij,ij->i", c["ocf_slope"][:, :upto], discount[:, :upto])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        req = np.where(slope > 0, -npv0 / np.where(slope > 0, slope, 1.0), 0.0)
+    return np.where(slope > 0, np.ceil(np.maximum(req, 0)), 0).astype(np.int64)
+
+
+# [함수] 월 단위 포트폴리오 일괄 시뮬레이션
+@traced()
+def simulate_monthly(projects=None, rates=gas_rates, shares=None, start_month=1, **overrides):
+    """IRR 은 연 환산((1 + 월 IRR)^12 - 1), 할인회수기간은 년 단위로 반환."""
+    n = _row_count(projects, overrides)
+    frames = []
+    for begin in range(0, n, _BLOCK):
+        rows = slice(begin, begin + _BLOCK)
+        block = projects.iloc[rows] if isinstance(projects, pd.DataFrame) else _slice_mapping(projects, rows, n)
+        c = monthly_components(block, rates, shares, start_month, **_slice_mapping(overrides, rows, n))
+        flows = c["flows"]
+        ocf = flows[:, 1:]
+        discount = (1 + c["monthly_rate"][:, None]) ** -c["months"].astype(float)
+
+        # IRR 코드는 연간 합산 OCF 기준으로 two_phase_irr 과 같게 분류, 월 IRR 은 연 환산
+        irr = irr_from_flows(flows, periods_per_year=12)
+        annual = np.where(np.arange(1, c["annual_ocf"].shape[1] + 1) <= c["periods"][:, None], c["annual_ocf"], 0.0)
+        no_investment = c["net_inv"] <= 0
+        no_cashflow = ~no_investment & (annual <= 0).all(axis=1)
+        in_range = (irr >= IRR_LOWER) & (irr <= IRR_UPPER)
+        irr_code = np.where(no_investment, IRR_NO_INVESTMENT, np.where(no_cashflow, IRR_NO_CASHFLOW, np.where(
+            in_range, IRR_OK, np.where((annual < 0).any(axis=1), IRR_NO_ROOT, IRR_OUT_OF_RANGE)))).astype(object)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            summer_share = np.where(c["gas_margin_1y"] != 0, c["summer_margin_1y"] / c["gas_margin_1y"], np.nan)
+        frames.append(pd.DataFrame({
+            "npv": -c["net_inv"] + (ocf * discount).sum(axis=1),
+            "irr": np.where(irr_code == IRR_OK, irr, np.nan), "irr_code": irr_code,
+            "dpp": discounted_payback(flows, c["monthly_rate"]) / 12,
+            "net_inv": c["net_inv"],
+            "gas_margin_1y": c["gas_margin_1y"],
+            "summer_margin_share": summer_share,
+            "required_vol_30": _required_volume(c, discount, 30),
+            "required_vol_50": _required_volume(c, discount, 50),
+            "is_zombie": c["is_zombie"],
+        }))
+    result = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=MONTHLY_RESULT_COLUMNS)
+    if isinstance(projects, pd.DataFrame):
+        result.index = projects.index
+    return result
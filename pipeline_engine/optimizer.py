@@ -0,0 +1,279 @@
+"""투자 예산 제약 하의 후보 배관 선정 (NPV 합계 최대화).
+
+비용은 순투자액(총 공사비 - 시설 분담금 - 기타 이익, 0 미만은 0), 가치는 NPV.
+NPV 가 양(+)이 아닌 후보는 선택해도 합계가 늘지 않으므로 제외한다.
+
+- exact : 분지한정법. 상한은 분수 배낭(예산 전체 / 용도 그룹별 상한) 완화해의 최솟값
+- greedy: NPV/비용 비율 순 탐욕 선택 + LP 완화 상한 (최적해와의 최대 격차 확인용)
+그룹 상한은 예산 제약 안에 포함되는(계층형) 제약이라 LP 완화해는 비율 순 분수 선택으로 정확히 구해지며,
+분지한정법 전에 LP 쌍대값으로 결과가 정해진 후보를 고정해 탐색 범위를 줄인다.
+"""
+from bisect import bisect_right
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .core import MIXED_GROUP, gas_rates, usage_group
+from .portfolio import simulate_portfolio
+from .solver import IRR_OK
+
+# [설정] auto 모드에서 분지한정법을 쓰는 최대 후보 수
+EXACT_LIMIT = 500
+_MAX_NODES = 2_000_000
+_TOL = 1e-9
+
+
+@dataclass
+class Selection:
+    selected: pd.Series      # 후보별 선택 여부 (후보 DataFrame 과 같은 인덱스)
+    total_npv: float
+    capex: float
+    budget: float
+    upper_bound: float       # 최적 NPV 합계의 상한 (exact 가 끝까지 탐색했으면 total_npv 와 같음)
+    method: str
+    optimal: bool
+    nodes: int = 0
+
+    @property
+    def gap(self):
+        """상한 대비 부족분 비율 (0 이면 최적 보장)."""
+        return 0.0 if self.upper_bound <= 0 else max(0.0, 1 - self.total_npv / self.upper_bound)
+
+
+# [함수] 후보 프로젝트 일괄 계산 + 선정용 컬럼(group, cost) 부착
+def prepare_candidates(projects, rates=gas_rates, **overrides):
+    result = simulate_portfolio(projects, rates=rates, **overrides)
+    candidates = pd.concat([projects, result.drop(columns=[c for c in result.columns if c in projects.columns])], axis=1)
+    if "group" not in candidates.columns:
+        candidates["group"] = candidates["gas_type"].map(usage_group) if "gas_type" in candidates.columns else MIXED_GROUP
+    candidates["cost"] = np.maximum(candidates["net_inv"].to_numpy(dtype=float), 0.0)
+    return candidates
+
+
+# [함수] 제약 조건(좀비 제외, 최소 IRR)을 만족하고 NPV > 0 인 후보
+def eligible_mask(candidates, min_irr=None, exclude_zombie=False):
+    mask = candidates["npv"].to_numpy(dtype=float) > 0
+    if exclude_zombie:
+        mask &= ~candidates["is_zombie"].to_numpy(dtype=bool)
+    if min_irr is not None:
+        # IRR 계산 불가(순투자 0 이하 포함)는 최소 IRR 조건을 판정할 수 없어 제외
+        ok = (candidates["irr_code"] == IRR_OK).to_numpy()
+        mask &= ok & (candidates["irr"].fillna(-np.inf).to_numpy(dtype=float) >= min_irr)
+    return mask
+
+
+class _Knapsack:
+    """비율 내림차순으로 정렬된 후보의 누적합 (분수 배낭 상한 O(log n) 계산)."""
+
+    def __init__(self, cost, value, group, caps):
+        self.cost, self.value, self.group = cost, value, group
+        self.n = len(cost)
+        self.ratio = value / cost
+        self.c_cum = np.concatenate([[0.0], np.cumsum(cost)]).tolist()
+        self.v_cum = np.concatenate([[0.0], np.cumsum(value)]).tolist()
+        self.caps = caps
+        # 그룹별: 그룹 내 누적합과 전체 위치 k 이전의 그룹 항목 수
+        self.groups = []
+        for g in range(len(caps)):
+            members = np.flatnonzero(group == g)
+            self.groups.append((
+                np.concatenate([[0.0], np.cumsum(cost[members])]).tolist(),
+                np.concatenate([[0.0], np.cumsum(value[members])]).tolist(),
+                self.ratio[members].tolist(),
+                np.searchsorted(members, np.arange(self.n + 1)).tolist(),
+            ))
+
+    @staticmethod
+    def _fractional(c_cum, v_cum, ratio, k, capacity):
+        # 허용 오차(_TOL) 안에서 담은 뒤 남는 음의 잔여는 0 으로 (음수면 위치 k 앞의 누적합을 잘못 빼게 됨)
+        target = c_cum[k] + max(capacity, 0.0)
+        j = bisect_right(c_cum, target) - 1
+        bound = v_cum[j] - v_cum[k]
+        if j < len(ratio):
+            bound += (target - c_cum[j]) * ratio[j]
+        return bound
+
+    def bound(self, k, remaining, group_remaining):
+        """위치 k 이후 후보로 더 얻을 수 있는 NPV 상한."""
+        total = self._fractional(self.c_cum, self.v_cum, self.ratio, k, remaining)
+        if self.caps:
+            by_group = sum(self._fractional(c, v, r, pos[k], min(remaining, group_remaining[g]))
+                           for g, (c, v, r, pos) in enumerate(self.groups))
+            total = min(total, by_group)
+        return total
+
+    def greedy(self, remaining, group_remaining):
+        chosen = np.zeros(self.n, dtype=bool)
+        group_remaining = list(group_remaining)
+        for i in range(self.n):
+            g = self.group[i]
+            if self.cost[i] <= remaining + _TOL and self.cost[i] <= group_remaining[g] + _TOL:
+                chosen[i] = True
+                remaining -= self.cost[i]
+                group_remaining[g] -= self.cost[i]
+        return chosen
+
+    def relaxation(self, remaining, group_remaining):
+        """LP 완화해 (비율 순 분수 선택). 반환: (LP 최적값, 후보별 x, 후보별 쌍대 기준 비율 λ + μ_g)."""
+        x = np.zeros(self.n)
+        group_remaining = list(group_remaining)
+        group_ratio = [0.0] * len(group_remaining)
+        budget_ratio = 0.0
+        for i in range(self.n):
+            g = self.group[i]
+            room = min(remaining, group_remaining[g])
+            if room <= 0:
+                continue
+            if room < self.cost[i]:
+                # 분수로 담기는 항목이 임계 항목 (잔여를 빼서 정하면 부동소수 오차 ~1e-14 가 남아
+                # 다음 항목이 x ≈ 0 으로 담기고 쌍대 비율을 잘못 가져감)
+                x[i] = room / self.cost[i]
+                if remaining <= group_remaining[g]:
+                    budget_ratio = self.ratio[i]
+                    break
+                remaining -= room
+                group_remaining[g] = 0.0
+                group_ratio[g] = self.ratio[i]
+                continue
+            x[i] = 1.0
+            remaining -= self.cost[i]
+            group_remaining[g] -= self.cost[i]
+            if remaining <= 0:
+                budget_ratio = self.ratio[i]
+                break
+            if group_remaining[g] <= 0:
+                group_ratio[g] = self.ratio[i]
+        threshold = np.maximum(budget_ratio, np.asarray(group_ratio)[self.group]) if self.n else np.zeros(0)
+        return float(x @ self.value), x, threshold
+
+    def reduce(self, remaining, group_remaining, incumbent_value):
+        """Dembo-Hammer 축소: LP 해와 반대 값을 두면 LP 상한(z_LP - |감소비용|)이 현재 해를 넘지 못하는 후보 고정.
+
+        반환: (1 로 고정, 0 으로 고정) 불리언 배열.
+        """
+        z_lp, x, threshold = self.relaxation(remaining, group_remaining)
+        fixed = z_lp - np.abs(self.value - threshold * self.cost) <= incumbent_value * (1 + _TOL) + _TOL
+        return fixed & (x >= 1), fixed & (x < 1)
+
+    def branch_and_bound(self, remaining, group_remaining, threshold, max_nodes):
+        """깊이 우선 (포함 먼저) 탐색으로 NPV 합계가 threshold 를 넘는 최선의 조합.
+
+        반환: (선택 배열 또는 None, 완전 탐색 여부, 탐색 노드 수).
+        """
+        best_value, best = threshold, None
+        cost, value, group = self.cost.tolist(), self.value.tolist(), self.group.tolist()
+        # 스택 항목: (다음 위치, 잔여 예산, 그룹 잔여, 누적 NPV, 선택 연결 리스트)
+        stack = [(0, remaining, tuple(group_remaining), 0.0, None)]
+        nodes = 0
+        while stack:
+            if nodes >= max_nodes:
+                return (None if best is None else self._chosen(best)), False, nodes
+            k, rem, g_rem, acc, picked = stack.pop()
+            nodes += 1
+            if acc > best_value * (1 + _TOL) + _TOL:
+                best_value, best = acc, self._unlink(picked)
+            if k == self.n or acc + self.bound(k, rem, g_rem) <= best_value * (1 + _TOL) + _TOL:
+                continue
+            stack.append((k + 1, rem, g_rem, acc, picked))
+            g = group[k]
+            if cost[k] <= rem + _TOL and cost[k] <= g_rem[g] + _TOL:
+                g_next = g_rem[:g] + (g_rem[g] - cost[k],) + g_rem[g + 1:]
+                stack.append((k + 1, rem - cost[k], g_next, acc + value[k], (k, picked)))
+        return (None if best is None else self._chosen(best)), True, nodes
+
+    @staticmethod
+    def _unlink(picked):
+        items = []
+        while picked is not None:
+            items.append(picked[0])
+            picked = picked[1]
+        return items
+
+    def _chosen(self, items):
+        chosen = np.zeros(self.n, dtype=bool)
+        chosen[items] = True
+        return chosen
+
+
+# [함수] 축소 후 남은 후보만 분지한정법으로 탐색 (탐욕 해가 초기 하한)
+def _exact(ks, budget, caps, incumbent, max_nodes):
+    incumbent_value = float(ks.value[incumbent].sum())
+    fix_in, fix_out = ks.reduce(budget, caps, incumbent_value)
+    remaining, group_remaining = budget - ks.cost[fix_in].sum(), list(caps)
+    for g in range(len(caps)):
+        group_remaining[g] -= ks.cost[fix_in & (ks.group == g)].sum()
+    if remaining < -_TOL or min(group_remaining) < -_TOL:
+        # 고정 후보를 모두 담을 수 없으면 탐욕 해보다 나은 해가 없음
+        return incumbent, True, 0
+
+    free = np.flatnonzero(~fix_in & ~fix_out)
+    sub = _Knapsack(ks.cost[free], ks.value[free], ks.group[free], ks.caps)
+    found, complete, nodes = sub.branch_and_bound(remaining, group_remaining,
+                                                  incumbent_value - float(ks.value[fix_in].sum()), max_nodes)
+    if found is None:
+        return incumbent, complete, nodes
+    chosen = fix_in.copy()
+    chosen[free[found]] = True
+    return chosen, complete, nodes
+
+
+# [함수] 예산 내 NPV 합계 최대 조합 선정
+def select_portfolio(candidates, budget, min_irr=None, exclude_zombie=False, group_caps=None,
+                     method="auto", max_nodes=_MAX_NODES):
+    """candidates 는 prepare_candidates 결과 (npv, irr, irr_code, is_zombie, group, cost 컬럼).
+
+    group_caps: {용도 그룹: 그룹별 투자 상한(원)}. method: "auto" | "exact" | "greedy".
+    """
+    if method not in ("auto", "exact", "greedy"):
+        raise ValueError(f"지원하지 않는 선정 방식: {method}")
+    eligible = eligible_mask(candidates, min_irr, exclude_zombie)
+    cost = candidates["cost"].to_numpy(dtype=float)
+    value = candidates["npv"].to_numpy(dtype=float)
+    selected = np.zeros(len(candidates), dtype=bool)
+
+    # 순투자 0 이하 후보는 예산을 쓰지 않으므로 항상 선택
+    free = eligible & (cost <= 0)
+    selected[free] = True
+    idx = np.flatnonzero(eligible & ~free)
+
+    group_caps = dict(group_caps or {})
+    names = list(group_caps)
+    cap_values = [float(group_caps[name]) for name in names] + [np.inf]
+    groups = candidates["group"].to_numpy()
+    group = np.array([names.index(groups[i]) if groups[i] in group_caps else len(names) for i in idx], dtype=np.int64)
+
+    # 단독으로도 예산/그룹 상한을 넘는 후보는 제외
+    fits = (cost[idx] <= budget + _TOL) & (cost[idx] <= np.array(cap_values)[group] + _TOL)
+    idx, group = idx[fits], group[fits]
+    order = np.lexsort((idx, -(value[idx] / cost[idx])))
+    idx, group = idx[order], group[order]
+
+    ks = _Knapsack(cost[idx], value[idx], group, cap_values if names else [])
+    upper = ks.relaxation(float(budget), cap_values)[0]
+    method_used = ("exact" if len(idx) <= EXACT_LIMIT else "greedy") if method == "auto" else method
+    chosen = ks.greedy(float(budget), cap_values)
+    optimal, nodes = not len(idx), 0
+    if method_used == "exact" and len(idx):
+        chosen, optimal, nodes = _exact(ks, float(budget), cap_values, chosen, max_nodes)
+    selected[idx[chosen]] = True
+
+    base = float(value[free].sum())
+    total = float(value[selected].sum())
+    return Selection(
+        selected=pd.Series(selected, index=candidates.index, name="selected"),
+        total_npv=total, capex=float(cost[selected].sum()), budget=float(budget),
+        upper_bound=total if optimal else base + upper, method=method_used, optimal=optimal, nodes=nodes,
+    )
+
+
+# [함수] 예산 변화에 따른 선정 결과 (예산별 요약 + 후보 x 예산 선택 여부 행렬)
+def budget_frontier(candidates, budgets, **constraints):
+    summary, picks = [], {}
+    for budget in budgets:
+        sel = select_portfolio(candidates, budget, **constraints)
+        summary.append({"budget": sel.budget, "total_npv": sel.total_npv, "capex": sel.capex,
+                        "count": int(sel.selected.sum()), "upper_bound": sel.upper_bound,
+                        "optimal": sel.optimal, "method": sel.method})
+        picks[sel.budget] = sel.selected
+    return pd.DataFrame(summary), pd.DataFrame(picks)
@@ -0,0 +1,334 @@
+"""다수 배관 프로젝트를 한 번에 계산하는 벡터화 포트폴리오 엔진.
+
+``calculate_simulation`` 과 동일한 산식을 프로젝트별 컬럼 배열로 옮겨
+수천 건의 후보 구간을 파이썬 루프 없이 한 번에 평가한다.
+일정한 2구간 현금흐름은 solver 의 닫힌 식으로, 일반 현금흐름 행렬의 IRR 은
+irr_from_flows 로 계산한다.
+"""
+import numpy as np
+import pandas as pd
+
+from .diagnostics import count, traced
+from .solver import IRR_LOWER, IRR_UPPER, IRR_REASON_MESSAGES, depreciation_years, two_phase_irr, two_phase_npv, two_phase_payback
+
+# [설정] 입력 컬럼 (calculate_simulation 인자명과 동일)
+INPUT_COLUMNS = [
+    "sim_len", "sim_inv", "sim_contrib", "sim_other", "sim_vol", "sim_rev", "sim_cost",
+    "sim_jeon", "sim_basic_rev", "rate", "tax", "dep_period", "analysis_period",
+    "c_maint", "c_adm_jeon", "c_adm_m", "sales_price_mj", "purchase_price_mj",
+]
+
+# [설정] 입력에 없을 때 적용하는 기본값 (사이드바 기본값과 동일)
+DEFAULT_PARAMS = {
+    "sim_contrib": 0.0, "sim_other": 0.0, "sim_jeon": 0.0,
+    "rate": 0.0615, "tax": 0.22, "dep_period": 30, "analysis_period": 30,
+    "c_maint": 8222, "c_adm_jeon": 6209, "c_adm_m": 13605,
+}
+
+RESULT_COLUMNS = [
+    "npv", "npv_30", "irr", "irr_code", "irr_reason", "dpp", "net_inv", "first_ocf", "first_ebit", "sga",
+    "dep", "margin", "required_vol_30", "required_vol_50", "avg_ocf", "is_zombie",
+    "zombie_threshold_pct",
+]
+
+# IRR 탐색 구간: x = 1/(1+r) 기준, solver 와 같은 r = -99.99% ~ 1,000,000%
+_IRR_GRID = np.geomspace(1 / (1 + IRR_UPPER), 1 / (1 + IRR_LOWER), 641)
+_IRR_MAX_STEPS = 64
+_NARROW_POINTS = np.linspace(0, 1, 17)
+_NARROW_ROUNDS = 4
+_IRR_RESIDUAL = 1e-9  # 근으로 인정하는 |NPV 잔차| / sum |f_t| x^t
+
+
+# [함수] 입력 정규화 (DataFrame/dict → 컬럼별 float 배열)
+def resolve_inputs(projects=None, rates=None, **overrides):
+    if projects is None:
+        source = {}
+    elif isinstance(projects, pd.DataFrame):
+        source = {c: projects[c].to_numpy() for c in projects.columns}
+    else:
+        source = dict(projects)
+    source.update(overrides)
+
+    n = 1
+    for v in source.values():
+        if np.ndim(v) > 0:
+            n = len(v)
+            break
+
+    def col(name, default=None):
+        if name in source:
+            value = source[name]
+        elif default is not None:
+            value = default
+        else:
+            raise KeyError(f"필수 입력 컬럼 누락: {name}")
+        return np.broadcast_to(np.asarray(value, dtype=float), (n,)).copy()
+
+    cols = {}
+    for name in ("sim_len", "sim_inv", "sim_vol"):
+        cols[name] = col(name)
+    for name, default in DEFAULT_PARAMS.items():
+        cols[name] = col(name, default)
+
+    # 요금 단가: 직접 입력이 없으면 용도(gas_type)로 단가표 조회
+    if "sales_price_mj" not in source and "gas_type" in source:
+        if rates is None:
+            raise KeyError("gas_type 조회에는 요금 단가표(rates)가 필요합니다")
+        types = np.broadcast_to(np.asarray(source["gas_type"], dtype=object), (n,))
+        source["sales_price_mj"] = [rates[t]["sales"] for t in types]
+        source["purchase_price_mj"] = [rates[t]["purchase"] for t in types]
+        if "is_residential" not in source:
+            source["is_residential"] = [rates[t]["is_residential"] for t in types]
+    cols["sales_price_mj"] = col("sales_price_mj", 0.0)
+    cols["purchase_price_mj"] = col("purchase_price_mj", 0.0)
+
+    # 판매액/판매원가: 화면과 동일하게 원 단위 절사
+    if "sim_rev" in source:
+        cols["sim_rev"] = col("sim_rev")
+    else:
+        cols["sim_rev"] = np.trunc(cols["sim_vol"] * cols["sales_price_mj"])
+    if "sim_cost" in source:
+        cols["sim_cost"] = col("sim_cost")
+    else:
+        cols["sim_cost"] = np.trunc(cols["sim_vol"] * cols["purchase_price_mj"])
+
+    # 기본요금 수익: 주택용 성격일 때만 월 단가 x 전수 x 12
+    if "sim_basic_rev" in source:
+        cols["sim_basic_rev"] = col("sim_basic_rev")
+    elif "basic_price" in source:
+        residential = np.broadcast_to(np.asarray(source.get("is_residential", True), dtype=bool), (n,))
+        cols["sim_basic_rev"] = np.where(residential, col("basic_price") * cols["sim_jeon"] * 12, 0.0)
+    else:
+        cols["sim_basic_rev"] = np.zeros(n)
+
+    return {name: cols[name] for name in INPUT_COLUMNS}
+
+
+# [함수] 현금흐름을 m 기간씩 묶은 계수 (행, m, 묶음 수), 끝은 0 으로 채움
+def _period_blocks(flows, m):
+    groups = -(-flows.shape[1] // m)
+    padded = np.zeros((len(flows), groups * m))
+    padded[:, :flows.shape[1]] = flows
+    return np.ascontiguousarray(padded.reshape(len(flows), groups, m).transpose(0, 2, 1))
+
+
+# [함수] 묶음 계수의 다항식 평가 (월별 600 기간을 기간마다 Horner 하면 Python 반복이 600번)
+def _blocked_poly(x, blocks):
+    """sum(f_t * x^t) 와 도함수: 묶음 안(x^0..x^(m-1))은 행렬곱, 묶음 사이는 y = x^m 에 대한 Horner."""
+    m = blocks.shape[1]
+    within = np.arange(m)
+    with np.errstate(over="ignore", invalid="ignore"):
+        x_pow = x[:, :, None] ** within                                # (행, 점, m)
+        inner = x_pow @ blocks                                         # 묶음별 sum_j f_(mk+j) x^j
+        inner_slope = (x_pow[:, :, :-1] * within[1:]) @ blocks[:, 1:]  # 그 x 도함수
+        y = x ** m
+        acc = np.zeros((len(blocks), x.shape[1]))
+        slope_y = np.zeros_like(acc)
+        slope_in = np.zeros_like(acc)
+        for k in range(blocks.shape[2] - 1, -1, -1):
+            slope_y = slope_y * y + acc
+            acc = acc * y + inner[:, :, k]
+            slope_in = slope_in * y + inner_slope[:, :, k]
+        # d/dx = (묶음 사이 y 도함수) x m x^(m-1) + (묶음 안 도함수)
+        return acc, slope_y * (m * x_pow[:, :, m - 1]) + slope_in
+
+
+# [함수] 현금흐름 행렬의 IRR (영점이 여러 개면 0에 가장 가까운 근, npf.irr 과 동일 기준)
+def irr_from_flows(flows, periods_per_year=1):
+    """periods_per_year > 1 (예: 월별 12) 이면 기간 IRR 을 연 환산해 반환하고, 탐색 구간도 연 환산 기준으로 맞춘다."""
+    flows = np.atleast_2d(np.asarray(flows, dtype=float))
+    grid = _IRR_GRID ** (1 / periods_per_year)
+    # 월별처럼 기간이 길면 기간 묶음 계수로 평가 (poly 에 넘기는 행 선택·절댓값은 두 형태 모두 그대로 적용됨)
+    blocked = periods_per_year > 1
+    columns = _period_blocks(flows, periods_per_year) if blocked else np.asfortranarray(flows)
+
+    def poly(x, cols=columns):
+        # Horner: sum(f_t * x^t) 와 도함수를 한 번에, x = 1/(1+r), x 는 (행, 점) 2차원
+        if blocked:
+            return _blocked_poly(x, cols)
+        acc = np.zeros((len(cols), x.shape[1]))
+        slope = np.zeros_like(acc)
+        with np.errstate(over="ignore", invalid="ignore"):
+            for t in range(cols.shape[1] - 1, -1, -1):
+                slope = slope * x + acc
+                acc = acc * x + cols[:, t:t + 1]
+        return acc, slope
+
+    # 격자 평가는 거듭제곱 행렬과의 행렬곱 한 번 (x^t 가 넘치는 칸은 NaN → 구간 후보에서 제외)
+    with np.errstate(over="ignore", invalid="ignore"):
+        powers = grid[None, :] ** np.arange(flows.shape[1])[:, None]
+        values = flows @ powers
+    lo_s, hi_s = np.sign(values[:, :-1]), np.sign(values[:, 1:])
+    bracket = (lo_s * hi_s <= 0) & ~((lo_s == 0) & (hi_s == 0))
+    r_mid = 1 / np.sqrt(grid[:-1] * grid[1:]) - 1
+
+    # 양(+)/음(-) 쪽에서 0에 가장 가까운 구간을 하나씩 (열 0, 1) 동시에 정밀화한 뒤 |r| 이 작은 근 선택
+    # (격자 칸 중앙값만으로 고르면 0 양쪽에 비슷한 거리의 근이 있을 때 틀릴 수 있음)
+    distance = np.stack([np.where(bracket & side, np.abs(r_mid), np.inf) for side in (r_mid >= 0, r_mid < 0)], axis=1)
+    pick = np.argmin(distance, axis=2)
+    found = np.isfinite(np.take_along_axis(distance, pick[:, :, None], axis=2)[:, :, 0])
+
+    lo, hi = grid[pick], grid[pick + 1]
+
+    # 부호가 바뀌는 칸이 없어도 현금흐름 부호가 두 번 이상 바뀌면 두 근이 한 칸 안에 있을 수 있음:
+    # 격자 최댓값 주변을 세분 격자로 좁혀 가며 NPV 가 양수인 점을 찾으면 그 점 양쪽 구간을 두 후보로 정밀화
+    signs = np.sign(flows)
+    last_sign = np.take_along_axis(signs, np.maximum.accumulate(
+        np.where(signs != 0, np.arange(flows.shape[1]), 0), axis=1), axis=1)
+    narrow = ~found.any(axis=1) & (((last_sign[:, :-1] * signs[:, 1:]) < 0).sum(axis=1) >= 2)
+    if narrow.any():
+        rows = np.flatnonzero(narrow)
+        k_max = np.argmax(np.where(np.isnan(values[rows]), -np.inf, values[rows]), axis=1)
+        # 꼭짓점은 격자 안쪽이어야 함 (끝 칸은 x^t 가 넘치기 직전이라 값이 상쇄 오차뿐)
+        interior = (k_max > 0) & (k_max < len(grid) - 1)
+        interior[interior] = np.isfinite(values[rows[interior], k_max[interior] + 1])
+        rows, k_max = rows[interior], k_max[interior]
+        cols = columns[rows]
+        left, right = grid[k_max - 1], grid[k_max + 1]
+        a, b = left, right
+        peak = np.full(len(rows), np.nan)
+        for _ in range(_NARROW_ROUNDS):
+            points = a[:, None] + (b - a)[:, None] * _NARROW_POINTS
+            npv = poly(points, cols)[0]
+            best = np.argmax(np.where(np.isnan(npv), -np.inf, npv), axis=1)
+            x_best = points[np.arange(len(rows)), best]
+            hit = np.isnan(peak) & (npv[np.arange(len(rows)), best] > 0)
+            peak[hit] = x_best[hit]
+            if not np.isnan(peak).any():
+                break
+            width = (b - a) / (len(_NARROW_POINTS) - 1)
+            a, b = np.maximum(x_best - width, left), np.minimum(x_best + width, right)
+        split = ~np.isnan(peak)
+        rows, left, right, peak = rows[split], left[split], right[split], peak[split]
+        lo[rows] = np.column_stack([left, peak])
+        hi[rows] = np.column_stack([peak, right])
+        found[rows] = True
+
+    # 구간 보호 Newton: 구간 밖으로 나가는 Newton 단계는 이분법으로 대체
+    # (수렴한 행은 빼고 남은 행만 다시 평가 → 조건이 나쁜 소수 행이 전체 반복 비용을 늘리지 않음)
+    # 시작점은 구간 양 끝의 할선 보간점 (꼭짓점으로 나눈 구간처럼 한쪽이 평평하면 중점보다 근에 가까움)
+    f_lo, f_hi = poly(lo)[0], poly(hi)[0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = lo - f_lo * (hi - lo) / (f_hi - f_lo)
+    x = np.where(np.isfinite(x) & (x > lo) & (x < hi), x, 0.5 * (lo + hi))
+    f_x, d_x = poly(x)
+    active = found & (f_x != 0)
+    steps = 0
+    for _ in range(_IRR_MAX_STEPS):
+        rows = np.flatnonzero(active.any(axis=1))
+        if len(rows) == 0:
+            break
+        steps += len(rows)
+        xs, fs, ds, los, fls, his = x[rows], f_x[rows], d_x[rows], lo[rows], f_lo[rows], hi[rows]
+        same = np.sign(fs) == np.sign(fls)
+        los, fls, his = np.where(same, xs, los), np.where(same, fs, fls), np.where(same, his, xs)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = xs - fs / ds
+        inside = (newton >= np.minimum(los, his)) & (newton <= np.maximum(los, his))
+        step = np.where(inside, newton, 0.5 * (los + his)) - xs
+        xs = xs + step
+        fs, ds = poly(xs, columns[rows])
+        tol = 1e-13 * xs
+        x[rows], f_x[rows], d_x[rows], lo[rows], f_lo[rows], hi[rows] = xs, fs, ds, los, fls, his
+        active[rows] = found[rows] & (np.abs(step) > tol) & (np.abs(his - los) > tol) & (fs != 0)
+    count("irr_solves", len(flows))
+    count("irr_iterations", steps)
+    # 잔차 검증: 부동소수 평가 오차 한계(sum |f_t| x^t) 에 비해 잔차가 크면 수렴하지 못한 후보로 보고 제외
+    # (월별 음의 수익률 쪽은 x^t 가 1e100 을 넘어 잔차 절댓값 자체는 크지만 평가 오차 대비로는 0 과 구분 불가)
+    found &= np.abs(f_x) <= _IRR_RESIDUAL * poly(x, np.abs(columns))[0]
+    # 근 선택은 기간 수익률 기준 (npf.irr 과 같이 |기간 r| 최소), 연 환산은 선택 후
+    # (연 환산 뒤에 고르면 월 -37% 같은 근이 연 -99.7% 로 눌려 실제 근보다 0에 가까워 보임)
+    positive, negative = np.where(found, x, np.nan).T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        closer = np.abs(1 / negative - 1) < np.abs(1 / positive - 1)
+    chosen = np.where(np.isnan(positive) | closer, negative, positive)
+    return chosen ** -periods_per_year - 1
+
+
+# [함수] 목표 판매량 역산 (calculate_simulation 의 get_req_vol 벡터화)
+def required_volume(target_period, rate, tax, dep_period, net_inv, annual_depreciation,
+                    cost_sga, sim_basic_rev, unit_margin):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        safe_rate = np.where(rate != 0, rate, 1.0)
+        dep_years = np.minimum(target_period, dep_period)
+        pvifa_total = np.where(rate != 0, (1 - (1 + rate) ** (-target_period)) / safe_rate, target_period)
+        pvifa_dep = np.where(rate != 0, (1 - (1 + rate) ** (-dep_years)) / safe_rate, dep_years)
+
+        solvable = (pvifa_total > 0) & ((1 - tax) > 0)
+        target_margin_minus_sga = (net_inv - annual_depreciation * tax * pvifa_dep) / (pvifa_total * (1 - tax))
+        target_margin = target_margin_minus_sga + cost_sga
+
+        req_v = np.where(unit_margin > 0, (target_margin - sim_basic_rev) / np.where(unit_margin > 0, unit_margin, 1.0), 0.0)
+        req_v = np.ceil(np.maximum(0, req_v))
+    return np.where(solvable, req_v, 0).astype(np.int64)
+
+
+# [함수] 2구간 현금흐름 구성요소 (정규화된 입력 배열 → 순투자/마진/판관비/OCF)
+def cash_flow_components(p):
+    rate, tax, dep_period = p["rate"], p["tax"], p["dep_period"]
+    periods = np.trunc(p["analysis_period"]).astype(np.int64)
+
+    # 1. 초기 순투자액 (Year 0)
+    net_inv = p["sim_inv"] - p["sim_contrib"] - p["sim_other"]
+
+    # 2. 고정 수익/비용 항목 계산
+    margin_total = (p["sim_rev"] - p["sim_cost"]) + p["sim_basic_rev"]
+    cost_sga = (p["sim_len"] * p["c_maint"]) + (p["sim_len"] * p["c_adm_m"]) + (p["sim_jeon"] * p["c_adm_jeon"])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annual_depreciation = np.where(dep_period > 0, p["sim_inv"] / np.where(dep_period > 0, dep_period, 1.0), 0.0)
+
+    # 3. 세후 현금흐름(OCF): 감가상각 기간 / 종료 후 2구간
+    dep_years = depreciation_years(dep_period, periods)
+    ocf_dep = (margin_total - cost_sga - annual_depreciation) * (1 - tax) + annual_depreciation
+    ocf_after = (margin_total - cost_sga) * (1 - tax)
+
+    return {
+        "rate": rate, "tax": tax, "dep_period": dep_period, "periods": periods, "net_inv": net_inv,
+        "margin": margin_total, "sga": cost_sga, "dep": annual_depreciation, "dep_years": dep_years,
+        "ocf_dep": ocf_dep, "ocf_after": ocf_after,
+    }
+
+
+# [함수] 포트폴리오 일괄 시뮬레이션
+@traced()
+def simulate_portfolio(projects=None, rates=None, **overrides):
+    p = resolve_inputs(projects, rates=rates, **overrides)
+    cf = cash_flow_components(p)
+    rate, tax, dep_period, periods = cf["rate"], cf["tax"], cf["dep_period"], cf["periods"]
+    net_inv, margin_total, cost_sga, annual_depreciation = cf["net_inv"], cf["margin"], cf["sga"], cf["dep"]
+    dep_years, ocf_dep, ocf_after = cf["dep_years"], cf["ocf_dep"], cf["ocf_after"]
+
+    first_ocf = np.where(periods >= 1, np.where(dep_years >= 1, ocf_dep, ocf_after), 0.0)
+    first_ebit = margin_total - cost_sga - annual_depreciation
+
+    # 좀비 배관(가짜 흑자) 판별 및 민감도 분석 로직
+    is_zombie = (ocf_dep > 0) & (ocf_after < 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        zombie_threshold_pct = np.where(cost_sga > 0, (margin_total / cost_sga - 1) * 100, np.inf)
+
+    # 4. 지표 산출 (연금현가계수 닫힌 식)
+    npv_val = two_phase_npv(rate, net_inv, ocf_dep, ocf_after, dep_years, periods)
+    npv_30_val = np.where(periods >= 30, two_phase_npv(rate, net_inv, ocf_dep, ocf_after,
+                                                         np.minimum(dep_years, 30), 30), npv_val)
+
+    irr_val, irr_code, _ = two_phase_irr(net_inv, ocf_dep, ocf_after, dep_years, periods)
+    irr_reason = pd.Series(irr_code).map(IRR_REASON_MESSAGES).to_numpy()
+    dpp = two_phase_payback(rate, net_inv, ocf_dep, ocf_after, dep_years, periods)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        avg_ocf = (ocf_dep * dep_years + ocf_after * (periods - dep_years)) / np.where(periods > 0, periods, np.nan)
+
+    # 5. 목표 판매량 역산
+    unit_margin_for_req = p["sales_price_mj"] - p["purchase_price_mj"]
+    req_args = (rate, tax, dep_period, net_inv, annual_depreciation, cost_sga, p["sim_basic_rev"], unit_margin_for_req)
+
+    index = projects.index if isinstance(projects, pd.DataFrame) else None
+    return pd.DataFrame({
+        "npv": npv_val, "npv_30": npv_30_val, "irr": irr_val, "irr_code": irr_code, "irr_reason": irr_reason,
+        "dpp": dpp, "net_inv": net_inv, "first_ocf": first_ocf, "first_ebit": first_ebit, "sga": cost_sga,
+        "dep": annual_depreciation, "margin": margin_total,
+        "required_vol_30": required_volume(30, *req_args),
+        "required_vol_50": required_volume(50, *req_args),
+        "avg_ocf": avg_ocf, "is_zombie": is_zombie,
+        "zombie_threshold_pct": zombie_threshold_pct,
+    }, index=index)
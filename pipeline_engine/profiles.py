@@ -0,0 +1,291 @@
+"""요금 개정 이력·연간 상승률·판매량 램프업을 반영한 연도별 배열 엔진.
+
+calculate_simulation 은 매년 같은 판매량·마진·판관비를 가정하지만, 여기서는
+(프로젝트, 연도) 행렬로 연도마다 다른 값을 두고 한 번에 계산한다.
+판매량은 기준 판매량 x 연차별 램프업 배율이므로 NPV 는 기준 판매량의 1차식이고,
+목표 판매량은 여전히 닫힌 식으로 역산된다.
+"""
+from dataclasses import dataclass, replace
+
+import numpy as np
+import pandas as pd
+
+from .core import gas_rates
+from .diagnostics import traced
+from .portfolio import irr_from_flows, resolve_inputs
+from .solver import (IRR_NO_CASHFLOW, IRR_NO_INVESTMENT, IRR_NO_ROOT, IRR_OK, IRR_OUT_OF_RANGE,
+                     discounted_payback)
+
+_BLOCK = 4096
+_TARGET_PERIODS = (30, 50)
+
+PROFILE_RESULT_COLUMNS = [
+    "npv", "irr", "irr_code", "dpp", "net_inv", "first_ocf", "min_ocf", "required_vol_30", "required_vol_50", "is_zombie",
+]
+
+
+def _to_days(when):
+    return np.asarray(pd.to_datetime(when).to_numpy(), dtype="datetime64[D]")
+
+
+class TariffSchedule:
+    """용도별 요금 단가 개정 이력 (적용 시작일 기준, 이전 날짜에는 가장 오래된 단가 적용)."""
+
+    def __init__(self, records):
+        table = pd.DataFrame(records, columns=["effective", "gas_type", "sales", "purchase", "is_residential"])
+        table["effective"] = pd.to_datetime(table["effective"])
+        self.table = table.sort_values(["gas_type", "effective"], ignore_index=True)
+
+    @classmethod
+    def from_rates(cls, effective, rates):
+        return cls([(effective, name, r["sales"], r["purchase"], r["is_residential"]) for name, r in rates.items()])
+
+    # [함수] 개정 단가 추가 (rates 는 gas_rates 와 같은 형식, 일부 용도만 넣어도 됨)
+    def with_revision(self, effective, rates):
+        added = TariffSchedule.from_rates(effective, rates).table
+        return TariffSchedule(pd.concat([self.table, added], ignore_index=True).itertuples(index=False))
+
+    @property
+    def revisions(self):
+        return sorted(self.table["effective"].dt.date.unique())
+
+    # [함수] 특정 일자 기준 단가표 (gas_rates 형식)
+    def rates_on(self, when):
+        when = pd.Timestamp(when)
+        rates = {}
+        for name, rows in self.table.groupby("gas_type", sort=False):
+            current = rows[rows["effective"] <= when]
+            row = (current if len(current) else rows).iloc[-1 if len(current) else 0]
+            rates[name] = {"sales": row["sales"], "purchase": row["purchase"], "is_residential": bool(row["is_residential"])}
+        return rates
+
+    # [함수] 연차별 단가 (연도 안에서 개정되면 적용 일수로 가중평균)
+    def yearly_prices(self, gas_types, start_dates, years):
+        """gas_types, start_dates: 프로젝트별 배열(또는 스칼라). 반환: (sales, purchase) 각 (프로젝트, 연도) 행렬."""
+        gas_types = np.asarray(gas_types, dtype=object)
+        n = max(gas_types.size, np.size(start_dates))
+        gas_types = np.broadcast_to(gas_types, (n,))
+        starts = np.broadcast_to(_to_days(start_dates), (n,))
+
+        # 연도 경계: 시작일에서 12개월씩 (월말 시작일은 해당 월 말일 유지)
+        months = starts.astype("datetime64[M]")
+        day_offset = (starts - months.astype("datetime64[D]")).astype(np.int64)
+        bounds = (months[:, None] + 12 * np.arange(years + 1)).astype("datetime64[D]").astype(np.int64)
+        bounds = bounds + day_offset[:, None]
+        lengths = np.diff(bounds, axis=1)
+
+        sales = np.empty((n, years))
+        purchase = np.empty((n, years))
+        for name, rows in self.table.groupby("gas_type", sort=False):
+            sel = np.flatnonzero(gas_types == name)
+            if not len(sel):
+                continue
+            edges = rows["effective"].to_numpy().astype("datetime64[D]").astype(np.int64)
+            lo = np.concatenate([[np.iinfo(np.int64).min // 2], edges[1:]])
+            hi = np.concatenate([edges[1:], [np.iinfo(np.int64).max // 2]])
+            b0, b1 = bounds[sel, :-1, None], bounds[sel, 1:, None]
+            weight = np.maximum(0, np.minimum(b1, hi) - np.maximum(b0, lo)) / lengths[sel, :, None]
+            sales[sel] = weight @ rows["sales"].to_numpy(dtype=float)
+            purchase[sel] = weight @ rows["purchase"].to_numpy(dtype=float)
+        missing = set(gas_types) - set(self.table["gas_type"])
+        if missing:
+            raise KeyError(f"요금 이력에 없는 용도: {sorted(missing)}")
+        return sales, purchase
+
+
+# 현재 단가표(25.8.1 기준)를 첫 이력으로 하는 기본 요금 이력
+DEFAULT_TARIFFS = TariffSchedule.from_rates("2025-08-01", gas_rates)
+
+
+# [함수] 직선형 램프업: 첫해 start_share 에서 years_to_full 년차에 100% 도달 (프로젝트별 배열 허용)
+def linear_ramp(years_to_full, start_share=0.0, horizon=50):
+    years_to_full = np.atleast_1d(np.asarray(years_to_full, dtype=float))[:, None]
+    start_share = np.atleast_1d(np.asarray(start_share, dtype=float))[:, None]
+    t = np.arange(1, horizon + 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        progress = np.where(years_to_full > 1, (t - 1) / (years_to_full - 1), 1.0)
+    ramp = start_share + (1 - start_share) * np.clip(progress, 0, 1)
+    return ramp[0] if ramp.shape[0] == 1 else ramp
+
+
+# [함수] S자형(로지스틱) 램프업: midpoint 년차에 50%, steepness 가 클수록 급격
+def s_curve_ramp(midpoint, steepness=1.0, horizon=50):
+    t = np.arange(1, horizon + 1)
+    midpoint = np.atleast_1d(np.asarray(midpoint, dtype=float))[:, None]
+    ramp = 1 / (1 + np.exp(-steepness * (t - midpoint)))
+    return ramp[0] if ramp.shape[0] == 1 else ramp
+
+
+@dataclass(frozen=True)
+class Profile:
+    """연도별 가정. 배열은 1차원(연도, 전 프로젝트 공통) 또는 2차원(프로젝트, 연도).
+
+    volume_ramp: 연차별 판매량 배율 (짧으면 마지막 값 유지, None 이면 1.0)
+    tariff_escalation / om_escalation: 연간 요금 / 유지·관리비 상승률 (스칼라 또는 연도별)
+    tariffs: 요금 이력 (지정 시 gas_type 컬럼과 start_date 로 연도별 단가 산출)
+    start_date: 공급 개시일 (스칼라 또는 프로젝트 컬럼 start_date 가 우선, tariffs 지정 시 필수)
+    """
+
+    volume_ramp: object = None
+    tariff_escalation: object = 0.0
+    om_escalation: object = 0.0
+    tariffs: TariffSchedule = None
+    start_date: object = None
+
+
+# [함수] 연도별 배열 정규화 → (1 또는 n, horizon)
+def _per_year(values, horizon, default):
+    if values is None:
+        return np.full((1, horizon), default)
+    values = np.atleast_1d(np.asarray(values, dtype=float))
+    values = values[None, :] if values.ndim == 1 else values
+    if values.shape[1] < horizon:
+        values = np.concatenate([values, np.repeat(values[:, -1:], horizon - values.shape[1], axis=1)], axis=1)
+    return values[:, :horizon]
+
+
+# [함수] 연간 상승률 → 누적 지수 (1년차 = 1)
+def growth_index(rates, horizon):
+    rates = _per_year(rates, horizon, 0.0)
+    return np.concatenate([np.ones((len(rates), 1)), np.cumprod(1 + rates[:, :-1], axis=1)], axis=1)
+
+
+def _source_column(projects, overrides, name):
+    if name in overrides:
+        return overrides[name]
+    if isinstance(projects, pd.DataFrame) and name in projects.columns:
+        return projects[name].to_numpy()
+    if isinstance(projects, dict) and name in projects:
+        return projects[name]
+    return None
+
+
+# [함수] 연도별 현금흐름 행렬 구성 (행 = 프로젝트, 열 = 0..horizon 년)
+def profile_components(projects=None, profile=Profile(), rates=None, horizon=None, **overrides):
+    """반환 dict: flows (n, horizon+1), ocf0 (판매량 0 일 때 OCF), volume_margin (기준 판매량 1 MJ 당 세전 마진),
+    rate, tax, net_inv, periods, dep_period, years."""
+    tariffs = profile.tariffs
+    start = None
+    if tariffs is not None:
+        # 오늘 날짜로 대신하면 실행일마다 결과(와 캐시·저장소 키)가 달라지므로 개시일을 반드시 받음
+        start = _source_column(projects, overrides, "start_date")
+        start = start if start is not None else profile.start_date
+        if start is None:
+            raise ValueError("요금 이력(tariffs)을 쓰려면 start_date (Profile 또는 프로젝트 컬럼) 가 필요")
+        if rates is None:
+            rates = tariffs.rates_on(_to_days(start).min())
+    p = resolve_inputs(projects, rates=rates, **overrides)
+    n = len(p["sim_inv"])
+    periods = np.trunc(p["analysis_period"]).astype(np.int64)
+    horizon = int(horizon or max(periods.max(), max(_TARGET_PERIODS)))
+    years = np.arange(1, horizon + 1)
+
+    ramp = _per_year(profile.volume_ramp, horizon, 1.0)
+    tariff_idx = growth_index(profile.tariff_escalation, horizon)
+    om_idx = growth_index(profile.om_escalation, horizon)
+
+    gas_type = _source_column(projects, overrides, "gas_type")
+    if tariffs is not None and gas_type is not None:
+        sales, purchase = tariffs.yearly_prices(gas_type, start, horizon)
+        sales, purchase = sales * tariff_idx, purchase * tariff_idx
+        volume = p["sim_vol"][:, None] * ramp
+        gas_margin = np.trunc(volume * sales) - np.trunc(volume * purchase)
+        unit_margin = sales - purchase
+    else:
+        gas_margin = (p["sim_rev"] - p["sim_cost"])[:, None] * ramp * tariff_idx
+        unit_margin = (p["sales_price_mj"] - p["purchase_price_mj"])[:, None] * tariff_idx
+
+    rate, tax, dep_period = p["rate"][:, None], p["tax"][:, None], p["dep_period"][:, None]
+    basic = p["sim_basic_rev"][:, None] * tariff_idx
+    sga = ((p["sim_len"] * p["c_maint"]) + (p["sim_len"] * p["c_adm_m"]) + (p["sim_jeon"] * p["c_adm_jeon"]))[:, None] * om_idx
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annual_dep = np.where(dep_period > 0, p["sim_inv"][:, None] / np.where(dep_period > 0, dep_period, 1.0), 0.0)
+    dep = np.where(years <= dep_period, annual_dep, 0.0)
+
+    ocf_all = np.broadcast_to((gas_margin + basic - sga - dep) * (1 - tax) + dep, (n, horizon))
+    ocf = np.where(years <= periods[:, None], ocf_all, 0.0)
+    ocf0 = (basic - sga - dep) * (1 - tax) + dep
+    net_inv = p["sim_inv"] - p["sim_contrib"] - p["sim_other"]
+
+    # 좀비 배관: 감가상각 마지막 해 OCF 는 흑자인데 종료 후 적자 연도가 존재
+    dep_years = np.clip(np.floor(p["dep_period"]), 0, horizon).astype(np.int64)
+    last_dep_ocf = np.where(dep_years > 0, ocf_all[np.arange(n), np.maximum(dep_years - 1, 0)], 0.0)
+    is_zombie = (last_dep_ocf > 0) & ((ocf_all < 0) & (years > dep_period)).any(axis=1)
+    return {
+        "flows": np.column_stack([-net_inv, ocf]), "is_zombie": is_zombie, "ocf_all": ocf_all,
+        "ocf0": np.broadcast_to(ocf0, (n, horizon)),
+        "volume_margin": np.broadcast_to(ramp * unit_margin, (n, horizon)),
+        "rate": p["rate"], "tax": p["tax"], "net_inv": net_inv, "periods": periods,
+        "dep_period": p["dep_period"], "years": years,
+    }
+
+
+# [함수] 목표 기간 NPV = 0 판매량 (판매량 0 일 때 NPV 와 기준 판매량 1 MJ 당 NPV 기울기로 역산)
+def _required_volume(c, discount, target_period):
+    upto = c["years"] <= target_period
+    npv0 = -c["net_inv"] + (c["ocf0"] * discount * upto).sum(axis=1)
+    slope = ((1 - c["tax"])[:, None] * c["volume_margin"] * discount * upto).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        req = np.where(slope > 0, -npv0 / np.where(slope > 0, slope, 1.0), 0.0)
+    return np.where(slope > 0, np.ceil(np.maximum(req, 0)), 0).astype(np.int64)
+
+
+# [함수] 연도별 가정 포트폴리오 일괄 시뮬레이션
+@traced()
+def simulate_profiles(projects=None, profile=Profile(), rates=None, **overrides):
+    n = _row_count(projects, overrides)
+    frames = []
+    for begin in range(0, n, _BLOCK):
+        rows = slice(begin, begin + _BLOCK)
+        block = projects.iloc[rows] if isinstance(projects, pd.DataFrame) else _slice_mapping(projects, rows, n)
+        block_overrides = _slice_mapping(overrides, rows, n)
+        c = profile_components(block, _slice_profile(profile, rows, n), rates, **block_overrides)
+        flows = c["flows"]
+        ocf = flows[:, 1:]
+        discount = (1 + c["rate"][:, None]) ** -c["years"].astype(float)
+
+        # IRR 코드는 two_phase_irr 과 같은 기준
+        irr = irr_from_flows(flows)
+        no_investment = c["net_inv"] <= 0
+        no_cashflow = ~no_investment & (ocf <= 0).all(axis=1)
+        irr_code = np.where(no_investment, IRR_NO_INVESTMENT, np.where(no_cashflow, IRR_NO_CASHFLOW, np.where(
+            ~np.isnan(irr), IRR_OK, np.where((ocf < 0).any(axis=1), IRR_NO_ROOT, IRR_OUT_OF_RANGE)))).astype(object)
+        frames.append(pd.DataFrame({
+            "npv": -c["net_inv"] + (ocf * discount).sum(axis=1),
+            "irr": np.where(irr_code == IRR_OK, irr, np.nan), "irr_code": irr_code,
+            "dpp": discounted_payback(flows, c["rate"]),
+            "net_inv": c["net_inv"],
+            "first_ocf": ocf[:, 0],
+            "min_ocf": np.where(c["years"] <= c["periods"][:, None], ocf, np.inf).min(axis=1),
+            "required_vol_30": _required_volume(c, discount, 30),
+            "required_vol_50": _required_volume(c, discount, 50),
+            "is_zombie": c["is_zombie"],
+        }))
+    result = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=PROFILE_RESULT_COLUMNS)
+    if isinstance(projects, pd.DataFrame):
+        result.index = projects.index
+    return result
+
+
+def _row_count(projects, overrides):
+    if isinstance(projects, pd.DataFrame):
+        return len(projects)
+    for v in list(dict(projects or {}).values()) + list(overrides.values()):
+        if np.ndim(v) > 0:
+            return len(v)
+    return 1
+
+
+def _slice_mapping(values, rows, n):
+    if values is None:
+        return None
+    return {k: (v[rows] if np.ndim(v) > 0 and len(v) == n else v) for k, v in dict(values).items()}
+
+
+def _slice_profile(profile, rows, n):
+    changes = {}
+    for name in ("volume_ramp", "tariff_escalation", "om_escalation"):
+        value = getattr(profile, name)
+        if value is not None and np.ndim(value) == 2 and len(value) == n:
+            changes[name] = np.asarray(value)[rows]
+    return replace(profile, **changes) if changes else profile
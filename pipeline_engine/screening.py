@@ -0,0 +1,211 @@
+"""업로드 포트폴리오의 좀비 배관 선별 (전역 변수 변경 시 영향받는 컬럼만 재계산).
+
+프로젝트별 값 중 판매 마진·순투자·연장·전수는 파일에서 한 번만 만든다. 나머지
+파생 컬럼(판관비, 마진 여유, 좀비 전환 임계 상승률, OCF, 좀비 여부, NPV, 상태,
+포트폴리오 누적 현금흐름)은 DEPENDENCIES 에 적은 전역 변수·다른 컬럼에만 의존한다.
+update() 로 전역 변수를 바꾸면 그 변수에 (간접적으로라도) 의존하는 컬럼만 무효화되고,
+다음에 읽을 때 배열 연산으로 다시 계산된다. 예를 들어 법인세율을 바꾸면 판관비·임계
+상승률은 그대로 두고 OCF 이후만 다시 계산한다.
+
+산식은 simulate_portfolio 와 같다 (파일에 전역 변수 컬럼이 있으면 그 행은 파일 값 우선).
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from .core import MIXED_GROUP, gas_rates, usage_group
+from .diagnostics import count, traced
+from .portfolio import DEFAULT_PARAMS, resolve_inputs
+from .solver import depreciation_years, two_phase_npv
+
+# [설정] 화면에서 바꾸는 전역 변수와 기본값 (risk_pct: '주의' 상태로 보는 임계 상승률 %)
+GLOBAL_PARAMS = ["rate", "tax", "dep_period", "analysis_period", "c_maint", "c_adm_jeon", "c_adm_m"]
+DEFAULT_SCREEN_PARAMS = {**{k: DEFAULT_PARAMS[k] for k in GLOBAL_PARAMS}, "risk_pct": 20.0}
+
+# [설정] 파생 컬럼 → 의존 항목 (전역 변수 또는 다른 파생 컬럼). 계산 순서는 자동으로 정해짐
+DEPENDENCIES = {
+    "sga": ("c_maint", "c_adm_jeon", "c_adm_m"),
+    "headroom": ("sga",),
+    "zombie_threshold_pct": ("sga",),
+    "dep": ("dep_period",),
+    "periods": ("analysis_period",),
+    "dep_years": ("dep_period", "periods"),
+    "ocf_dep": ("headroom", "dep", "tax"),
+    "ocf_after": ("headroom", "tax"),
+    "is_zombie": ("ocf_dep", "ocf_after"),
+    "npv": ("rate", "ocf_dep", "ocf_after", "dep_years", "periods"),
+    "status": ("is_zombie", "headroom", "zombie_threshold_pct", "risk_pct"),
+    "ocf_matrix": ("ocf_dep", "ocf_after", "dep_years", "periods"),
+    "discount": ("rate", "periods"),
+    "curves": ("ocf_matrix", "discount", "is_zombie"),
+}
+
+# [설정] 상태 구분 (표시 순서)
+STATUS_ZOMBIE = "좀비"
+STATUS_DEFICIT = "상시 적자"
+STATUS_WATCH = "주의"
+STATUS_OK = "정상"
+STATUSES = [STATUS_ZOMBIE, STATUS_DEFICIT, STATUS_WATCH, STATUS_OK]
+
+# 표에 싣는 파생 컬럼 (행렬·곡선 제외)
+TABLE_COLUMNS = ["status", "is_zombie", "margin", "sga", "headroom", "zombie_threshold_pct",
+                 "ocf_dep", "ocf_after", "npv"]
+
+
+# [함수] 바뀐 항목 → 그 항목에 (간접적으로) 의존하는 파생 컬럼 전체
+def _dependents(names):
+    dirty = set(names)
+    changed = True
+    while changed:
+        changed = False
+        for column, deps in DEPENDENCIES.items():
+            if column not in dirty and dirty.intersection(deps):
+                dirty.add(column)
+                changed = True
+    return dirty & set(DEPENDENCIES)
+
+
+class ZombieScreen:
+    """포트폴리오 좀비 배관 선별 모델 (파생 컬럼 지연 계산 + 의존 컬럼만 무효화)."""
+
+    def __init__(self, projects, rates=gas_rates, **params):
+        self.projects = projects
+        self.n = len(projects)
+        # 파일에 있는 전역 변수 컬럼은 행별 값으로 고정 (화면 값 변경의 영향 없음)
+        self.fixed = {k: projects[k].to_numpy(dtype=float) for k in GLOBAL_PARAMS if k in projects.columns}
+        p = resolve_inputs(projects, rates=rates)
+        self.base = {
+            "sim_len": p["sim_len"], "sim_jeon": p["sim_jeon"], "sim_inv": p["sim_inv"],
+            "net_inv": p["sim_inv"] - p["sim_contrib"] - p["sim_other"],
+            "margin": (p["sim_rev"] - p["sim_cost"]) + p["sim_basic_rev"],
+        }
+        if "group" in projects.columns:
+            self.group = projects["group"].to_numpy()
+        elif "gas_type" in projects.columns:
+            self.group = projects["gas_type"].map(usage_group).to_numpy()
+        else:
+            self.group = np.full(self.n, MIXED_GROUP)
+        self.params = dict(DEFAULT_SCREEN_PARAMS)
+        self.params.update(params)
+        self._values = {}
+        self.recomputed = []
+        self.elapsed_ms = 0.0
+
+    # ------------------------------------------------------------------
+    # 전역 변수 변경 / 지연 계산
+    # ------------------------------------------------------------------
+    @traced()
+    def update(self, **params):
+        """바뀐 전역 변수에 의존하는 컬럼만 무효화 → 무효화된 컬럼 이름 목록."""
+        changed = [k for k, v in params.items() if self.params.get(k) != v and k not in self.fixed]
+        self.params.update(params)
+        stale = sorted(_dependents(changed) & set(self._values))
+        for column in stale:
+            del self._values[column]
+        self.recomputed = []
+        self.elapsed_ms = 0.0
+        return stale
+
+    def param(self, name):
+        return self.fixed[name] if name in self.fixed else self.params[name]
+
+    def __getitem__(self, name):
+        if name in self.base:
+            return self.base[name]
+        if name not in self._values:
+            start = time.perf_counter()
+            self._values[name] = getattr(self, f"_calc_{name}")()
+            self.elapsed_ms += (time.perf_counter() - start) * 1000
+            self.recomputed.append(name)
+            count("screen_recomputed")
+        return self._values[name]
+
+    # ------------------------------------------------------------------
+    # 파생 컬럼 계산식 (simulate_portfolio 와 같은 산식)
+    # ------------------------------------------------------------------
+    def _calc_sga(self):
+        length, jeon = self["sim_len"], self["sim_jeon"]
+        return np.broadcast_to((length * self.param("c_maint")) + (length * self.param("c_adm_m"))
+                               + (jeon * self.param("c_adm_jeon")), (self.n,))
+
+    def _calc_headroom(self):
+        return self["margin"] - self["sga"]
+
+    def _calc_zombie_threshold_pct(self):
+        sga = self["sga"]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(sga > 0, (self["margin"] / sga - 1) * 100, np.inf)
+
+    def _calc_dep(self):
+        dep_period = np.broadcast_to(np.asarray(self.param("dep_period"), dtype=float), (self.n,))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(dep_period > 0, self["sim_inv"] / np.where(dep_period > 0, dep_period, 1.0), 0.0)
+
+    def _calc_periods(self):
+        return np.broadcast_to(np.trunc(np.asarray(self.param("analysis_period"), dtype=float)), (self.n,)).astype(np.int64)
+
+    def _calc_dep_years(self):
+        return depreciation_years(self.param("dep_period"), self["periods"])
+
+    def _calc_ocf_dep(self):
+        dep = self["dep"]
+        return (self["headroom"] - dep) * (1 - self.param("tax")) + dep
+
+    def _calc_ocf_after(self):
+        return self["headroom"] * (1 - self.param("tax"))
+
+    def _calc_is_zombie(self):
+        return (self["ocf_dep"] > 0) & (self["ocf_after"] < 0)
+
+    def _calc_npv(self):
+        return two_phase_npv(self.param("rate"), self["net_inv"], self["ocf_dep"], self["ocf_after"],
+                             self["dep_years"], self["periods"])
+
+    def _calc_status(self):
+        threshold = self["zombie_threshold_pct"]
+        return np.select(
+            [self["is_zombie"], self["headroom"] < 0, threshold < self.params["risk_pct"]],
+            [STATUS_ZOMBIE, STATUS_DEFICIT, STATUS_WATCH], STATUS_OK).astype(object)
+
+    def _calc_ocf_matrix(self):
+        # (프로젝트, 1..최대 분석연수) 연도별 OCF (분석기간 밖은 0)
+        periods = self["periods"]
+        years = np.arange(1, int(periods.max(initial=0)) + 1)
+        ocf = np.where(years <= self["dep_years"][:, None], self["ocf_dep"][:, None], self["ocf_after"][:, None])
+        return np.where(years <= periods[:, None], ocf, 0.0)
+
+    def _calc_discount(self):
+        rate = np.asarray(self.param("rate"), dtype=float).reshape(-1, 1)
+        years = np.arange(1, int(self["periods"].max(initial=0)) + 1)
+        return (1 + rate) ** -years
+
+    def _calc_curves(self):
+        ocf, net_inv, zombie = self["ocf_matrix"], self["net_inv"], self["is_zombie"]
+
+        def cumulative(rows, flows):
+            return np.cumsum(np.concatenate([[-net_inv[rows].sum()], flows[rows].sum(axis=0)]))
+
+        everything = np.ones(self.n, dtype=bool)
+        return pd.DataFrame({
+            "Year": np.arange(ocf.shape[1] + 1),
+            "전체": cumulative(everything, ocf),
+            "좀비 배관": cumulative(zombie, ocf),
+            "좀비 외": cumulative(~zombie, ocf),
+            "전체 (현재가치)": cumulative(everything, ocf * self["discount"]),
+        })
+
+    # ------------------------------------------------------------------
+    # 결과
+    # ------------------------------------------------------------------
+    def frame(self):
+        """프로젝트별 선별 결과 (입력 DataFrame 과 같은 인덱스)."""
+        columns = {"group": self.group, "net_inv": self["net_inv"]}
+        columns.update({name: self[name] for name in TABLE_COLUMNS})
+        return pd.DataFrame(columns, index=self.projects.index)
+
+    def summary(self):
+        """상태별 건수·순투자·NPV 합계 (STATUSES 순서)."""
+        frame = pd.DataFrame({"status": self["status"], "net_inv": self["net_inv"], "npv": self["npv"]})
+        grouped = frame.groupby("status").agg(count=("npv", "size"), net_inv=("net_inv", "sum"), npv=("npv", "sum"))
+        return grouped.reindex(STATUSES, fill_value=0)
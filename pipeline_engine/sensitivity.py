@@ -0,0 +1,176 @@
+"""2차원 민감도 격자와 토네이도 분석 (한 번의 브로드캐스트 평가).
+
+NPV = -순투자 + OCF(감가상각 기간) x PVIFA_dep + OCF(종료 후) x (PVIFA_total - PVIFA_dep)
+이므로 할인율·기간에만 의존하는 연금현가계수 표를 (할인율, 기간)별로 캐시해 두고,
+나머지 축은 OCF 만 다시 계산해 곱한다.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .diagnostics import traced
+from .portfolio import cash_flow_components, resolve_inputs
+from .solver import annuity_factor, two_phase_npv
+
+# [설정] 민감도 축 (calculate_simulation 입력 + 파생 축)
+AXES = {
+    "rate": "할인율",
+    "sim_vol": "연간 판매량 (MJ)",
+    "margin_per_mj": "MJ당 요금 마진 (원)",
+    "om_scale": "유지·관리비 단가 배율",
+    "sales_price_mj": "MJ당 판매가격 (원)",
+    "purchase_price_mj": "MJ당 사입가격 (원)",
+    "tax": "법인세율",
+    "sim_inv": "총 공사비 (원)",
+    "sim_contrib": "시설 분담금 (원)",
+    "sim_other": "기타 이익 (보조금, 원)",
+    "sim_len": "투자 길이 (m)",
+    "sim_jeon": "공급 전수 (전)",
+    "sim_basic_rev": "연간 기본요금 수익 (원)",
+    "c_maint": "유지비 (원/m)",
+    "c_adm_m": "관리비 (원/m)",
+    "c_adm_jeon": "관리비 (원/전)",
+    "dep_period": "감가상각 연수 (년)",
+    "analysis_period": "경제성 분석 연수 (년)",
+}
+
+TORNADO_PARAMS = [
+    "sim_vol", "sales_price_mj", "purchase_price_mj", "rate", "tax", "sim_inv", "sim_contrib", "sim_other",
+    "sim_len", "sim_jeon", "sim_basic_rev", "c_maint", "c_adm_m", "c_adm_jeon", "dep_period", "analysis_period",
+]
+
+_REVENUE_DRIVERS = {"sim_vol", "sales_price_mj", "purchase_price_mj", "margin_per_mj"}
+_PERIOD_AXES = {"dep_period", "analysis_period"}
+
+
+# [함수] (할인율 묶음, 감가상각 반영 연수, 분석 연수)별 연금현가계수 표 (캐시)
+@lru_cache(maxsize=128)
+def discount_table(rates, dep_years, periods):
+    rates = np.asarray(rates, dtype=float)
+    return annuity_factor(rates, dep_years), annuity_factor(rates, periods)
+
+
+# [함수] 축 값 → calculate_simulation 입력 컬럼으로 변환
+def axis_columns(base, name, values):
+    values = np.asarray(values, dtype=float)
+    if name == "margin_per_mj":
+        return {"sales_price_mj": base["purchase_price_mj"] + values}
+    if name == "om_scale":
+        return {c: base[c] * values for c in ("c_maint", "c_adm_m", "c_adm_jeon")}
+    if name not in AXES:
+        raise KeyError(f"지원하지 않는 민감도 축: {name}")
+    return {name: values}
+
+
+# [함수] 축 기준값 (파생 축 포함)
+def base_value(base, name):
+    if name == "margin_per_mj":
+        return base["sales_price_mj"] - base["purchase_price_mj"]
+    if name == "om_scale":
+        return 1.0
+    return base[name]
+
+
+def _scenario(base, names):
+    scenario = dict(base)
+    if _REVENUE_DRIVERS & set(names):
+        scenario.pop("sim_rev", None)
+        scenario.pop("sim_cost", None)
+    return scenario
+
+
+@dataclass
+class SensitivityGrid:
+    x_param: str
+    x_values: np.ndarray
+    y_param: str
+    y_values: np.ndarray
+    npv: np.ndarray        # (len(y), len(x))
+    is_zombie: np.ndarray  # (len(y), len(x))
+
+    def to_frame(self):
+        """히트맵용 긴 형식 (셀 경계 포함)."""
+        def edges(v):
+            mid = (v[1:] + v[:-1]) / 2 if len(v) > 1 else np.array([])
+            first = v[0] - (mid[0] - v[0] if len(mid) else 0.5)
+            last = v[-1] + (v[-1] - mid[-1] if len(mid) else 0.5)
+            return np.concatenate([[first], mid]), np.concatenate([mid, [last]])
+
+        x0, x1 = edges(self.x_values)
+        y0, y1 = edges(self.y_values)
+        xi, yi = np.meshgrid(np.arange(len(self.x_values)), np.arange(len(self.y_values)))
+        xi, yi = xi.ravel(), yi.ravel()
+        return pd.DataFrame({
+            "x": self.x_values[xi], "x0": x0[xi], "x1": x1[xi],
+            "y": self.y_values[yi], "y0": y0[yi], "y1": y1[yi],
+            "npv": self.npv.ravel(), "is_zombie": self.is_zombie.ravel(),
+        })
+
+
+# [함수] 2차원 민감도 격자 (예: 할인율 x 판매량, 요금 마진 x 유지관리비)
+@traced()
+def sensitivity_grid(base, x_param, x_values, y_param, y_values):
+    base = dict(base)
+    x_values = np.asarray(x_values, dtype=float)
+    y_values = np.asarray(y_values, dtype=float)
+    xs, ys = np.meshgrid(x_values, y_values)
+
+    columns = axis_columns(base, x_param, xs.ravel())
+    columns.update(axis_columns(base, y_param, ys.ravel()))
+    p = resolve_inputs(_scenario(base, (x_param, y_param)), **columns)
+    cf = cash_flow_components(p)
+    shape = xs.shape
+
+    if _PERIOD_AXES & {x_param, y_param}:
+        # 기간 축은 셀마다 연수가 달라 표를 공유할 수 없음
+        npv = two_phase_npv(cf["rate"], cf["net_inv"], cf["ocf_dep"], cf["ocf_after"], cf["dep_years"], cf["periods"])
+        npv = npv.reshape(shape)
+    else:
+        dep_years, periods = float(cf["dep_years"][0]), float(cf["periods"][0])
+        if "rate" in (x_param, y_param):
+            axis_rates = x_values if x_param == "rate" else y_values
+            a_dep, a_total = discount_table(tuple(axis_rates), dep_years, periods)
+            a_dep, a_total = (a_dep[None, :], a_total[None, :]) if x_param == "rate" else (a_dep[:, None], a_total[:, None])
+        else:
+            a_dep, a_total = discount_table((float(cf["rate"][0]),), dep_years, periods)
+        npv = (-cf["net_inv"].reshape(shape) + cf["ocf_dep"].reshape(shape) * a_dep
+               + cf["ocf_after"].reshape(shape) * (a_total - a_dep))
+
+    is_zombie = (cf["ocf_dep"] > 0) & (cf["ocf_after"] < 0)
+    return SensitivityGrid(x_param, x_values, y_param, y_values, npv, is_zombie.reshape(shape))
+
+
+# [함수] 토네이도 분석: 입력별로 기준값 ±change 만큼 움직였을 때의 NPV 변동폭 (한 번에 평가)
+@traced()
+def tornado(base, change=0.2, params=None):
+    base = dict(base)
+    params = [q for q in (params or TORNADO_PARAMS) if q in AXES]
+    scenario = _scenario(base, params)
+    resolved = resolve_inputs(scenario)
+
+    # 행 0 은 기준, 이후 2행씩(하한/상한) 해당 입력만 변경
+    lows = np.array([base_value(base, q) * (1 - change) for q in params], dtype=float)
+    highs = np.array([base_value(base, q) * (1 + change) for q in params], dtype=float)
+    rows = 1 + 2 * len(params)
+    overrides = {}
+    for i, q in enumerate(params):
+        for j, value in enumerate((lows[i], highs[i])):
+            for col, arr in axis_columns(base, q, [value]).items():
+                if col not in overrides:
+                    overrides[col] = np.full(rows, resolved[col][0])
+                overrides[col][1 + 2 * i + j] = arr[0]
+
+    cf = cash_flow_components(resolve_inputs(scenario, **overrides))
+    npv = np.broadcast_to(
+        two_phase_npv(cf["rate"], cf["net_inv"], cf["ocf_dep"], cf["ocf_after"], cf["dep_years"], cf["periods"]),
+        (rows,))
+    frame = pd.DataFrame({
+        "param": params, "label": [AXES[q] for q in params],
+        "low_value": lows, "high_value": highs,
+        "npv_low": npv[1::2], "npv_high": npv[2::2],
+    })
+    frame["swing"] = (frame["npv_high"] - frame["npv_low"]).abs()
+    frame.attrs["base_npv"] = float(npv[0])
+    return frame.sort_values("swing", ascending=False, ignore_index=True)
@@ -0,0 +1,374 @@
+"""2구간(감가상각 기간/종료 후) 현금흐름 전용 NPV·IRR 솔버.
+
+calculate_simulation 의 현금흐름은 초기 순투자(-net_inv) 뒤에
+감가상각 기간 동안의 일정한 OCF, 종료 후의 또 다른 일정한 OCF 로만 구성된다.
+따라서 NPV 는 연금현가계수(PVIFA)로 닫힌 식 계산이 가능하고,
+IRR 은 구간(bracket)을 보장한 Newton 반복을 배열 단위로 수행한다.
+"""
+import math
+
+import numpy as np
+
+from .diagnostics import count
+
+# [설정] IRR 결과 코드
+IRR_OK = "ok"
+IRR_NO_INVESTMENT = "no_investment"
+IRR_NO_CASHFLOW = "no_cashflow"
+IRR_NO_ROOT = "no_root"
+IRR_OUT_OF_RANGE = "out_of_range"
+
+IRR_REASON_MESSAGES = {
+    IRR_OK: "",
+    IRR_NO_INVESTMENT: "초기 순투자비가 0원 이하(보조금/분담금 과다)로 수익률 산출 의미 없음",
+    IRR_NO_CASHFLOW: "운영 적자 지속(모든 연도 OCF ≤ 0)으로 투자금 회수 불가",
+    IRR_NO_ROOT: "어떤 할인율에서도 NPV가 0 이상이 되지 않아 수익률이 존재하지 않음 (감가상각 종료 후 적자 누적)",
+    IRR_OUT_OF_RANGE: "수익률이 탐색 범위(-99.99% ~ 1,000,000%)를 벗어남",
+}
+
+# IRR 탐색 범위 ((1+r) 등비 격자, r = -99.99% ~ 1,000,000%)
+IRR_LOWER = -0.9999
+IRR_UPPER = 1e4
+_IRR_GRID = np.geomspace(1 + IRR_LOWER, 1 + IRR_UPPER, 81) - 1
+_MAX_ITER = 100
+_XTOL = 1e-13
+_BLOCK = 16384
+# 단건 경로: r = 0 에서 바깥쪽으로 NPV 부호를 확인하는 할인율 (양/음 방향, 끝은 탐색 범위 경계)
+_SCALAR_UP = (0.1, 1.0, 10.0, 100.0, IRR_UPPER)
+_SCALAR_DOWN = (-0.5, -0.9, -0.99, IRR_LOWER)
+_EXP_MAX = 709.0  # math.expm1 은 넘치면 OverflowError
+
+
+# [함수] 분석기간 중 감가상각이 반영되는 연수 (year <= dep_period 인 연도 수)
+def depreciation_years(dep_period, periods):
+    dep_period = np.asarray(dep_period, dtype=float)
+    return np.clip(np.floor(dep_period), 0, periods)
+
+
+# [함수] 연금현가계수 PVIFA(r, n) = (1 - (1+r)^-n) / r, r = 0 이면 n
+def annuity_factor(rate, n):
+    rate = np.asarray(rate, dtype=float)
+    n = np.asarray(n, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factor = -np.expm1(-n * np.log1p(rate)) / rate
+    return np.where(rate == 0, n, factor)
+
+
+# [함수] 2구간 현금흐름 NPV (닫힌 식)
+def two_phase_npv(rate, net_inv, ocf_dep, ocf_after, dep_years, periods):
+    args = (rate, net_inv, ocf_dep, ocf_after, dep_years, periods)
+    if all(np.ndim(a) == 0 for a in args) and rate > -1:
+        # 단건: 배열 생성·errstate 비용 없이 같은 식을 파이썬 float 로
+        return _scalar_npv_and_slope(*(float(a) for a in args))[0]
+    a_dep = annuity_factor(rate, dep_years)
+    a_total = annuity_factor(rate, periods)
+    return -np.asarray(net_inv, dtype=float) + ocf_dep * a_dep + ocf_after * (a_total - a_dep)
+
+
+# [함수] 할인회수기간 (누적 할인현금흐름이 처음 0 이상이 되는 시점, 해당 연도 안에서 선형 보간)
+def discounted_payback(flows, rate):
+    """flows: (연도 0..N) 1차원 또는 (프로젝트, 연도) 2차원. 분석기간 내 회수 불가면 NaN."""
+    flows = np.asarray(flows, dtype=float)
+    if flows.ndim == 1 and np.ndim(rate) == 0:
+        # 단건: 처음으로 누적 할인현금흐름 >= 0 인 연도 k 에서 보간
+        pv = flows * (1 + float(rate)) ** -np.arange(len(flows), dtype=float)
+        cum = np.cumsum(pv)
+        reached = np.flatnonzero(cum >= 0)
+        if len(reached) == 0:
+            return math.nan
+        k = int(reached[0])
+        return 0.0 if k == 0 else float(k - 1 - cum[k - 1] / pv[k])
+    single = flows.ndim == 1
+    flows = np.atleast_2d(flows)
+    rate = np.broadcast_to(np.asarray(rate, dtype=float).reshape(-1, 1), (len(flows), 1))
+    years = np.arange(flows.shape[1])
+
+    pv = flows * (1 + rate) ** -years
+    cum = np.cumsum(pv, axis=1)
+    # 누적 최댓값은 단조 증가 → 행별 searchsorted(reached, 0) 위치 = 0 미만인 칸 수
+    reached = np.maximum.accumulate(cum, axis=1)
+    k = (reached < 0).sum(axis=1)
+
+    payback = np.where(k == 0, 0.0, np.nan)
+    inside = (k > 0) & (k < flows.shape[1])
+    if inside.any():
+        rows = np.flatnonzero(inside)
+        kk = k[rows]
+        payback[rows] = kk - 1 - cum[rows, kk - 1] / pv[rows, kk]
+    return float(payback[0]) if single else payback
+
+
+# [함수] 2구간 현금흐름 할인회수기간 (블록 단위로 연도 행렬을 만들어 discounted_payback 적용)
+def two_phase_payback(rate, net_inv, ocf_dep, ocf_after, dep_years, periods):
+    rate, net_inv, ocf_dep, ocf_after, dep_years, periods = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(a, dtype=float)) for a in (rate, net_inv, ocf_dep, ocf_after, dep_years, periods)))
+    payback = np.full(len(net_inv), np.nan)
+    if len(payback) == 0:
+        return payback
+    years = np.arange(1, int(periods.max()) + 1)
+    for begin in range(0, len(payback), _BLOCK):
+        block = slice(begin, begin + _BLOCK)
+        ocf = np.where(years <= dep_years[block, None], ocf_dep[block, None], ocf_after[block, None])
+        ocf = np.where(years <= periods[block, None], ocf, 0.0)
+        flows = np.column_stack([-net_inv[block], ocf])
+        payback[block] = discounted_payback(flows, rate[block])
+    return payback
+
+
+# [함수] NPV 와 할인율 미분을 한 번에 계산 (Newton 반복용, log1p/expm1 공유)
+def _npv_and_slope(rate, net_inv, ocf_dep, ocf_after, dep_years, periods):
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        log_growth = np.log1p(rate)
+        em_dep = np.expm1(-dep_years * log_growth)
+        em_total = np.expm1(-periods * log_growth)
+        a_dep = -em_dep / rate
+        a_total = -em_total / rate
+        s_dep = (dep_years * (em_dep + 1) * rate / (1 + rate) + em_dep) / rate ** 2
+        s_total = (periods * (em_total + 1) * rate / (1 + rate) + em_total) / rate ** 2
+    small = np.abs(rate) < 1e-6
+    if small.any():
+        a_dep = np.where(rate == 0, dep_years, a_dep)
+        a_total = np.where(rate == 0, periods, a_total)
+        s_dep = np.where(small, -dep_years * (dep_years + 1) / 2, s_dep)
+        s_total = np.where(small, -periods * (periods + 1) / 2, s_total)
+    npv = -net_inv + ocf_dep * a_dep + ocf_after * (a_total - a_dep)
+    return npv, ocf_dep * s_dep + ocf_after * (s_total - s_dep)
+
+
+# [함수] 구간 보장 Newton (rtsafe: 구간을 벗어나거나 수렴이 느리면 이분법으로 대체)
+def _bracketed_newton(func, lo, hi, f_lo=None, x0=None):
+    f_lo = func(lo)[0] if f_lo is None else f_lo
+    x = 0.5 * (lo + hi) if x0 is None else x0
+    step_old = np.abs(hi - lo)
+    iterations = np.zeros(len(x), dtype=np.int64)
+    active = np.ones(len(x), dtype=bool)
+    for _ in range(_MAX_ITER):
+        fx, dfx = func(x)
+        same = np.sign(fx) == np.sign(f_lo)
+        lo, f_lo, hi = np.where(same, x, lo), np.where(same, fx, f_lo), np.where(same, hi, x)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = fx / dfx
+        converged = (fx == 0) | (np.abs(step) <= _XTOL * (1 + np.abs(x)))
+        x_new = x - step
+        left, right = np.minimum(lo, hi), np.maximum(lo, hi)
+        slow = np.abs(step) > 0.5 * step_old
+        bisect = ~np.isfinite(x_new) | (x_new <= left) | (x_new >= right) | slow
+        x_new = np.where(converged, x, np.where(bisect, 0.5 * (lo + hi), x_new))
+
+        done = converged | (np.abs(x_new - x) <= _XTOL * (1 + np.abs(x)))
+        iterations += active
+        step_old = np.where(active, np.abs(x_new - x), step_old)
+        x = np.where(active, x_new, x)
+        active &= ~done
+        if not active.any():
+            break
+    return x, iterations
+
+
+# [함수] 2구간 현금흐름 IRR (배열 단위). 근이 두 개면 npf.irr 과 같이 0에 가까운 근을 택함
+def two_phase_irr(net_inv, ocf_dep, ocf_after, dep_years, periods):
+    args = (net_inv, ocf_dep, ocf_after, dep_years, periods)
+    if all(np.ndim(a) == 0 for a in args):
+        # 단건(화면 재실행마다 호출): 81점 격자 대신 파이썬 float 로 구간 탐색 + Newton
+        return _two_phase_irr_scalar(*(float(a) for a in args))
+    net_inv, ocf_dep, ocf_after, dep_years, periods = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(a, dtype=float)) for a in (net_inv, ocf_dep, ocf_after, dep_years, periods)))
+    n = len(net_inv)
+    irr = np.full(n, np.nan)
+    code = np.full(n, IRR_OK, dtype=object)
+    iterations = np.zeros(n, dtype=np.int64)
+
+    has_dep = dep_years > 0
+    has_after = periods > dep_years
+    no_investment = net_inv <= 0
+    no_cashflow = ~no_investment & (~has_dep | (ocf_dep <= 0)) & (~has_after | (ocf_after <= 0))
+    code[no_investment] = IRR_NO_INVESTMENT
+    code[no_cashflow] = IRR_NO_CASHFLOW
+    solve = ~no_investment & ~no_cashflow
+    if not solve.any():
+        return irr, code, iterations
+
+    two_signs = has_dep & has_after & (ocf_dep > 0) & (ocf_after < 0)
+    rows = np.flatnonzero(solve)
+    for begin in range(0, len(rows), _BLOCK):
+        block = rows[begin:begin + _BLOCK]
+        args = tuple(a[block] for a in (net_inv, ocf_dep, ocf_after, dep_years, periods))
+        root, steps, found = _solve_block(args, two_signs[block])
+        irr[block] = np.where(found, root, np.nan)
+        code[block] = np.where(found, IRR_OK, np.where(two_signs[block], IRR_NO_ROOT, IRR_OUT_OF_RANGE))
+        iterations[block] = np.where(found, steps, 0)
+    count("irr_solves", len(rows))
+    count("irr_iterations", int(iterations.sum()))
+    return irr, code, iterations
+
+
+# [함수] 블록 단위 IRR 탐색 (격자 평가 행렬의 메모리 상한 유지)
+def _solve_block(args, two_signs):
+    n = len(args[0])
+    rows = np.arange(n)
+
+    # 1. 격자 탐색: 부호가 바뀌는 구간 중 0 의 양(+)/음(-) 쪽에서 0에 가장 가까운 구간을 하나씩 (행 0, 1)
+    #    (칸 중앙값만으로 하나를 고르면 0 양쪽에 근이 있을 때 더 먼 근을 고를 수 있어 둘 다 정밀화 후 비교)
+    grid = _IRR_GRID[None, :]
+    values = two_phase_npv(grid, *(a[:, None] for a in args))
+    change = np.sign(values[:, 1:]) != np.sign(values[:, :-1])
+    r_mid = 0.5 * (_IRR_GRID[1:] + _IRR_GRID[:-1])
+    distance = np.stack([np.where(change & side, np.abs(r_mid), np.inf) for side in (r_mid >= 0, r_mid < 0)])
+    pick = np.argmin(distance, axis=2)
+    found = np.isfinite(np.take_along_axis(distance, pick[:, :, None], axis=2)[:, :, 0])
+    lo, hi = _IRR_GRID[pick], _IRR_GRID[pick + 1]
+    f_lo, f_hi = values[rows, pick], values[rows, pick + 1]
+
+    # 부호 변동이 두 번(+ → -)이면 NPV(r)는 단봉형: 두 근이 한 격자 칸에 있으면 꼭짓점으로 나눠 양쪽 모두 정밀화
+    narrow = two_signs & ~found.any(axis=0)
+    if narrow.any():
+        k_max = np.argmax(values, axis=1)
+        left = _IRR_GRID[np.maximum(k_max - 1, 0)]
+        right = _IRR_GRID[np.minimum(k_max + 1, len(_IRR_GRID) - 1)]
+        a, b = left, right
+        for _ in range(_MAX_ITER):
+            mid = 0.5 * (a + b)
+            rising = _npv_and_slope(mid, *args)[1] > 0
+            a, b = np.where(rising, mid, a), np.where(rising, b, mid)
+        peak = 0.5 * (a + b)
+        split = narrow & (two_phase_npv(peak, *args) > 0)
+        lo = np.where(split, np.stack([peak, left]), lo)
+        hi = np.where(split, np.stack([right, peak]), hi)
+        f_lo = np.where(split, two_phase_npv(lo, *args), f_lo)
+        f_hi = np.where(split, two_phase_npv(hi, *args), f_hi)
+        found |= split
+
+    # 2. 선택 구간 안에서 Newton 정밀화 (할선 보간점에서 시작, 양쪽 후보를 한 번에)
+    side, row = np.nonzero(found)
+    sub = tuple(a[row] for a in args)
+    lo, hi, f_lo, f_hi = lo[side, row], hi[side, row], f_lo[side, row], f_hi[side, row]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x0 = lo - f_lo * (hi - lo) / (f_hi - f_lo)
+    x0 = np.where(np.isfinite(x0) & (x0 > lo) & (x0 < hi), x0, 0.5 * (lo + hi))
+    candidates, candidate_steps = _bracketed_newton(lambda r: _npv_and_slope(r, *sub), lo, hi, f_lo, x0)
+
+    # 3. 후보 중 0에 가장 가까운 근 (npf.irr 과 같은 기준)
+    root = np.full((2, n), np.nan)
+    steps = np.zeros((2, n), dtype=np.int64)
+    root[side, row], steps[side, row] = candidates, candidate_steps
+    use_negative = ~found[0] | (found[1] & (np.abs(root[1]) < np.abs(root[0])))
+    return np.where(use_negative, root[1], root[0]), np.where(use_negative, steps[1], steps[0]), found.any(axis=0)
+
+
+# [함수] 단건 NPV 와 할인율 미분 (_npv_and_slope 와 같은 식, 파이썬 float)
+def _scalar_npv_and_slope(rate, net_inv, ocf_dep, ocf_after, dep_years, periods):
+    log_growth = math.log1p(rate)
+    em_dep = math.expm1(min(-dep_years * log_growth, _EXP_MAX))
+    em_total = math.expm1(min(-periods * log_growth, _EXP_MAX))
+    if rate == 0:
+        a_dep, a_total = dep_years, periods
+    else:
+        a_dep, a_total = -em_dep / rate, -em_total / rate
+    if abs(rate) < 1e-6:
+        s_dep, s_total = -dep_years * (dep_years + 1) / 2, -periods * (periods + 1) / 2
+    else:
+        s_dep = (dep_years * (em_dep + 1) * rate / (1 + rate) + em_dep) / rate ** 2
+        s_total = (periods * (em_total + 1) * rate / (1 + rate) + em_total) / rate ** 2
+    npv = -net_inv + ocf_dep * a_dep + ocf_after * (a_total - a_dep)
+    return npv, ocf_dep * s_dep + ocf_after * (s_total - s_dep)
+
+
+# [함수] 단건 구간 보장 Newton (_bracketed_newton 과 같은 규칙, 허용 오차에 닿으면 바로 종료) → (근, 반복 수)
+def _scalar_newton(func, lo, hi, f_lo, f_hi):
+    if f_lo == 0:
+        return lo, 0
+    if f_hi == 0:
+        return hi, 0
+    x = lo - f_lo * (hi - lo) / (f_hi - f_lo)
+    if not min(lo, hi) < x < max(lo, hi):
+        x = 0.5 * (lo + hi)
+    step_old = abs(hi - lo)
+    for i in range(1, _MAX_ITER + 1):
+        fx, dfx = func(x)
+        if fx == 0:
+            return x, i
+        if (fx > 0) == (f_lo > 0):
+            lo, f_lo = x, fx
+        else:
+            hi = x
+        step = fx / dfx if dfx != 0 else math.inf
+        if abs(step) <= _XTOL * (1 + abs(x)):
+            return x, i
+        x_new = x - step
+        if not min(lo, hi) < x_new < max(lo, hi) or abs(step) > 0.5 * step_old:
+            x_new = 0.5 * (lo + hi)
+        if abs(x_new - x) <= _XTOL * (1 + abs(x)):
+            return x_new, i
+        step_old, x = abs(x_new - x), x_new
+    return x, _MAX_ITER
+
+
+# [함수] r = 0 에서 rates 순으로 넓혀 가며 NPV 부호가 바뀌는 첫 구간의 근 → (근, 반복 수), 없으면 (nan, 0)
+def _scalar_outward(func, f_zero, rates):
+    prev, f_prev = 0.0, f_zero
+    for rate in rates:
+        f_rate = func(rate)[0]
+        if (f_rate > 0) != (f_prev > 0) or f_rate == 0:
+            return _scalar_newton(func, prev, rate, f_prev, f_rate)
+        prev, f_prev = rate, f_rate
+    return math.nan, 0
+
+
+# [함수] 단건 two_phase_irr (결과 코드 판정은 배열 경로와 같음, 반환도 길이 1 배열)
+def _two_phase_irr_scalar(net_inv, ocf_dep, ocf_after, dep_years, periods):
+    has_dep, has_after = dep_years > 0, periods > dep_years
+    irr, steps = math.nan, 0
+    if net_inv <= 0:
+        code = IRR_NO_INVESTMENT
+    elif (not has_dep or ocf_dep <= 0) and (not has_after or ocf_after <= 0):
+        code = IRR_NO_CASHFLOW
+    else:
+        two_signs = has_dep and has_after and ocf_dep > 0 and ocf_after < 0
+        irr, steps = _solve_scalar(net_inv, ocf_dep, ocf_after, dep_years, periods, two_signs)
+        code = IRR_OK if not math.isnan(irr) else IRR_NO_ROOT if two_signs else IRR_OUT_OF_RANGE
+        count("irr_solves")
+        count("irr_iterations", steps)
+    return np.array([irr]), np.array([code], dtype=object), np.array([steps], dtype=np.int64)
+
+
+# [함수] 단건 IRR (배열 경로와 같은 근 선택: 탐색 범위 안의 근 중 0에 가장 가까운 근)
+def _solve_scalar(net_inv, ocf_dep, ocf_after, dep_years, periods, two_signs):
+    def func(rate):
+        return _scalar_npv_and_slope(rate, net_inv, ocf_dep, ocf_after, dep_years, periods)
+
+    f_zero, d_zero = func(0.0)
+    if f_zero == 0:
+        return 0.0, 0
+    if not two_signs:
+        # 부호 변동 한 번 → 근은 하나이고 NPV(0) 의 부호 쪽에 있음
+        return _scalar_outward(func, f_zero, _SCALAR_UP if f_zero > 0 else _SCALAR_DOWN)
+    if f_zero > 0:
+        # 두 근이 0 양쪽에 하나씩: 각각 구한 뒤 |r| 이 작은 근 (같으면 양(+)의 근)
+        pos, pos_steps = _scalar_outward(func, f_zero, _SCALAR_UP)
+        neg, neg_steps = _scalar_outward(func, f_zero, _SCALAR_DOWN)
+        if math.isnan(pos) or abs(neg) < abs(pos):
+            return neg, neg_steps
+        return pos, pos_steps
+
+    # NPV(0) < 0: NPV(r) 는 단봉형이라 근은 꼭짓점 쪽에만 있음 → 꼭짓점 방향으로 나아가다 NPV > 0 인 점을 찾으면
+    # 직전 점과의 구간에 0에 가까운 근이 있음. 꼭짓점을 지나도록 양수가 없으면 꼭짓점 주변을 이분해 확인
+    direction, rates = (1.0, _SCALAR_UP) if d_zero > 0 else (-1.0, _SCALAR_DOWN)
+    prev, f_prev = 0.0, f_zero
+    for rate in rates:
+        f_rate, d_rate = func(rate)
+        if f_rate >= 0:
+            return _scalar_newton(func, prev, rate, f_prev, f_rate)
+        if d_rate * direction <= 0:
+            a, b = prev, rate
+            while abs(b - a) > _XTOL * (1 + abs(a)):
+                mid = 0.5 * (a + b)
+                f_mid, d_mid = func(mid)
+                if f_mid >= 0:
+                    return _scalar_newton(func, a, mid, func(a)[0], f_mid)
+                if d_mid * direction > 0:
+                    a = mid
+                else:
+                    b = mid
+            return math.nan, 0
+        prev, f_prev = rate, f_rate
+    return math.nan, 0
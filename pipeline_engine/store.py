@@ -0,0 +1,281 @@
+"""시나리오 결과 영구 저장소 (SQLite, 입력 내용 해시 키).
+
+calculate_simulation 입력을 정규화한 JSON 의 SHA-256 을 키로 쓰므로 같은 입력은
+프로세스·재실행과 관계없이 한 번만 계산된다. 용도·NPV·IRR·좀비 여부 컬럼에
+색인을 두어 수십만 건에서도 조건 조회가 수 ms 안에 끝난다.
+
+KPI(스칼라 결과)는 저장값을 그대로 쓰고, 연도별 원장은 저장된 입력으로
+build_ledger 를 다시 호출해 만든다 (배열 연산 한 번, NPV/IRR 계산 없음).
+"""
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .core import calculate_simulation
+from .diagnostics import count, traced
+from .ledger import build_ledger
+from .portfolio import INPUT_COLUMNS
+
+# [설정] 계산식이 바뀌면 올림 (해시에 포함되어 이전 결과를 재사용하지 않음)
+ENGINE_VERSION = 2
+
+# [설정] 기본 저장 위치 (환경변수 PIPELINE_SCENARIO_DB 로 변경)
+DEFAULT_PATH = Path(os.environ.get("PIPELINE_SCENARIO_DB", Path.home() / ".pipeline_engine" / "scenarios.sqlite"))
+
+# [설정] 저장하는 스칼라 결과 (색인 컬럼은 별도 컬럼으로도 저장)
+RESULT_FIELDS = [
+    "npv", "npv_30", "irr", "irr_code", "irr_reason", "dpp", "net_inv", "first_ocf", "first_ebit", "sga",
+    "dep", "margin", "required_vol_30", "required_vol_50", "avg_ocf", "is_zombie", "zombie_threshold_pct",
+]
+_LEDGER_ARGS = [
+    "sim_len", "sim_inv", "sim_contrib", "sim_other", "sim_rev", "sim_cost", "sim_jeon", "sim_basic_rev",
+    "rate", "tax", "dep_period", "analysis_period", "c_maint", "c_adm_jeon", "c_adm_m",
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenarios (
+    hash TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL,
+    hit_count INTEGER NOT NULL DEFAULT 0,
+    label TEXT,
+    gas_type TEXT,
+    npv REAL,
+    irr REAL,
+    dpp REAL,
+    is_zombie INTEGER NOT NULL,
+    inputs TEXT NOT NULL,
+    results TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_scenarios_type_npv ON scenarios (gas_type, npv);
+CREATE INDEX IF NOT EXISTS idx_scenarios_zombie_npv ON scenarios (is_zombie, npv);
+CREATE INDEX IF NOT EXISTS idx_scenarios_npv ON scenarios (npv);
+CREATE INDEX IF NOT EXISTS idx_scenarios_irr ON scenarios (irr);
+CREATE INDEX IF NOT EXISTS idx_scenarios_created ON scenarios (created_at);
+CREATE INDEX IF NOT EXISTS idx_scenarios_label ON scenarios (label) WHERE label IS NOT NULL;
+"""
+
+# [설정] 이 건수 이상 한 번에 넣으면 조회 계획 통계 갱신
+_ANALYZE_BATCH = 1000
+
+# [설정] 조회 정렬 허용 컬럼 (SQL 에 직접 넣으므로 화이트리스트)
+ORDER_COLUMNS = ("npv", "irr", "dpp", "created_at", "last_used_at", "hit_count")
+
+
+def _plain(value):
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return float(value)
+    return value
+
+
+# [함수] 입력 정규화 (calculate_simulation 인자명 → float, 30 과 30.0 은 같은 값)
+def canonical_inputs(inputs):
+    missing = [name for name in INPUT_COLUMNS if name not in inputs]
+    if missing:
+        raise KeyError(f"필수 입력 누락: {', '.join(missing)}")
+    return {name: float(inputs[name]) for name in INPUT_COLUMNS}
+
+
+# [함수] 입력 내용 해시 (SHA-256, 엔진 버전 포함)
+def scenario_hash(inputs):
+    payload = json.dumps({"engine": ENGINE_VERSION, "inputs": canonical_inputs(inputs)}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _none_if_nan(value):
+    return None if value is None or (isinstance(value, float) and math.isnan(value)) else value
+
+
+class ScenarioStore:
+    """SQLite 시나리오 저장소. 여러 스레드(Streamlit 세션)에서 같은 객체를 공유해도 된다."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = Path(path)
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            # 통계가 없으면 라벨 조회에도 npv 색인 전체 스캔을 고르므로 처음 한 번 수집
+            analyzed = self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone() and self._conn.execute(
+                "SELECT 1 FROM sqlite_stat1 WHERE tbl = 'scenarios'").fetchone()
+            if not analyzed:
+                self._conn.execute("ANALYZE scenarios")
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        self._conn.close()
+
+    # ------------------------------------------------------------------
+    # 저장 / 조회
+    # ------------------------------------------------------------------
+    def _row(self, inputs, result, gas_type, label, now):
+        inputs = canonical_inputs(inputs)
+        results = {name: _plain(result[name]) for name in RESULT_FIELDS}
+        return (
+            scenario_hash(inputs), now, now, label, gas_type,
+            _none_if_nan(results["npv"]), _none_if_nan(results["irr"]), _none_if_nan(results["dpp"]),
+            int(bool(results["is_zombie"])), json.dumps(inputs), json.dumps(results),
+        )
+
+    def put(self, inputs, result, gas_type=None, label=None):
+        self.put_many([(inputs, result, gas_type, label)])
+        return scenario_hash(inputs)
+
+    def put_many(self, records):
+        """records: (입력 dict, 결과 dict, 용도, 라벨) 목록. 이미 있는 해시는 건너뛴다."""
+        now = time.time()
+        rows = [self._row(inputs, result, gas_type, label, now) for inputs, result, gas_type, label in records]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO scenarios (hash, created_at, last_used_at, label, gas_type, npv, irr, dpp, "
+                "is_zombie, inputs, results) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            if len(rows) >= _ANALYZE_BATCH:
+                self._conn.execute("PRAGMA optimize")
+        return len(rows)
+
+    def get(self, inputs):
+        """저장된 결과 (calculate_simulation 과 같은 dict) 또는 None."""
+        key = scenario_hash(inputs)
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT inputs, results FROM scenarios WHERE hash = ?", (key,)).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE scenarios SET hit_count = hit_count + 1, last_used_at = ? WHERE hash = ?",
+                                   (time.time(), key))
+        if row is None:
+            return None
+        return self._restore(json.loads(row["inputs"]), json.loads(row["results"]))
+
+    @staticmethod
+    def _restore(inputs, results):
+        ledger = build_ledger(*(inputs[name] for name in _LEDGER_ARGS))
+        return {**results, "flows": ledger.flows.tolist(), "ledger": ledger}
+
+    @traced()
+    def simulate(self, gas_type, *args):
+        """calculate_simulation 과 같은 인자 (앞에 용도). 저장된 입력이면 계산 없이 반환."""
+        inputs = dict(zip(INPUT_COLUMNS, args))
+        result = self.get(inputs)
+        if result is not None:
+            self.hits += 1
+            count("store_hits")
+            return result
+        self.misses += 1
+        count("store_misses")
+        result = calculate_simulation(*args)
+        self.put(inputs, result, gas_type=gas_type)
+        return result
+
+    def set_label(self, key, label):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE scenarios SET label = ? WHERE hash = ?", (label or None, key))
+
+    def delete(self, keys):
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM scenarios WHERE hash = ?", [(k,) for k in keys])
+
+    def load(self, key):
+        """해시 한 건의 (입력 dict, 결과 dict, 메타 dict)."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM scenarios WHERE hash = ?", (key,)).fetchone()
+        if row is None:
+            raise KeyError(f"저장된 시나리오 없음: {key}")
+        meta = {k: row[k] for k in ("hash", "created_at", "last_used_at", "hit_count", "label", "gas_type")}
+        return json.loads(row["inputs"]), json.loads(row["results"]), meta
+
+    # ------------------------------------------------------------------
+    # 조건 조회 / 비교
+    # ------------------------------------------------------------------
+    def query(self, gas_types=None, npv_min=None, npv_max=None, irr_min=None, irr_max=None, is_zombie=None,
+              label=None, since=None, order_by="npv", descending=True, limit=500, with_inputs=False):
+        """색인 컬럼 조건 조회. 반환 DataFrame 의 attrs["elapsed_ms"] 에 조회 시간."""
+        if order_by not in ORDER_COLUMNS:
+            raise ValueError(f"정렬할 수 없는 컬럼: {order_by}")
+        where, params = [], []
+        if gas_types:
+            where.append(f"gas_type IN ({', '.join('?' * len(gas_types))})")
+            params.extend(gas_types)
+        for column, op, value in (("npv", ">=", npv_min), ("npv", "<=", npv_max), ("irr", ">=", irr_min),
+                                  ("irr", "<=", irr_max), ("created_at", ">=", since)):
+            if value is not None:
+                where.append(f"{column} {op} ?")
+                params.append(float(value))
+        if is_zombie is not None:
+            where.append("is_zombie = ?")
+            params.append(int(bool(is_zombie)))
+        if label:
+            # 라벨이 있는 행만 담은 부분 색인을 타도록 IS NOT NULL 조건을 함께 둔다
+            where.append("label IS NOT NULL AND label LIKE ?")
+            params.append(f"%{label}%")
+
+        columns = "hash, created_at, last_used_at, hit_count, label, gas_type, npv, irr, dpp, is_zombie"
+        if with_inputs:
+            columns += ", inputs"
+        sql = (f"SELECT {columns} FROM scenarios" + (f" WHERE {' AND '.join(where)}" if where else "")
+               + f" ORDER BY {order_by} {'DESC' if descending else 'ASC'} LIMIT ?")
+        start = time.perf_counter()
+        with self._lock:
+            rows = self._conn.execute(sql, (*params, int(limit))).fetchall()
+        elapsed = (time.perf_counter() - start) * 1000
+
+        frame = pd.DataFrame([dict(r) for r in rows], columns=columns.split(", "))
+        frame["is_zombie"] = frame["is_zombie"].astype(bool)
+        for column in ("created_at", "last_used_at"):
+            frame[column] = pd.to_datetime(frame[column], unit="s")
+        if with_inputs:
+            inputs = pd.DataFrame([json.loads(v) for v in frame.pop("inputs")], columns=INPUT_COLUMNS)
+            frame = pd.concat([frame, inputs], axis=1)
+        frame.attrs["elapsed_ms"] = elapsed
+        return frame
+
+    def diff(self, key_a, key_b, changed_only=False):
+        """두 시나리오의 입력·결과 비교표 (항목, A, B, 차이)."""
+        inputs_a, results_a, _ = self.load(key_a)
+        inputs_b, results_b, _ = self.load(key_b)
+        rows = []
+        for kind, a, b in (("입력", inputs_a, inputs_b), ("결과", results_a, results_b)):
+            for name in a:
+                va, vb = a[name], b.get(name)
+                numeric = isinstance(va, (int, float)) and isinstance(vb, (int, float)) and not isinstance(va, bool)
+                delta = vb - va if numeric and math.isfinite(va) and math.isfinite(vb) else None
+                same = va == vb or (numeric and math.isnan(va) and math.isnan(vb))
+                if changed_only and same:
+                    continue
+                rows.append({"구분": kind, "항목": name, "A": va, "B": vb, "차이 (B-A)": delta, "변경": not same})
+        return pd.DataFrame(rows)
+
+    def stats(self):
+        with self._lock:
+            count, hits = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(hit_count), 0) FROM scenarios").fetchone()
+            types = self._conn.execute("SELECT DISTINCT gas_type FROM scenarios WHERE gas_type IS NOT NULL").fetchall()
+        size = self.path.stat().st_size if self.path.exists() else 0
+        return {"count": count, "stored_hits": hits, "session_hits": self.hits, "session_misses": self.misses,
+                "gas_types": sorted(t[0] for t in types), "size_bytes": size}
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+# [함수] 프로세스 공유 기본 저장소 (Streamlit 재실행 간 연결 재사용)
+def default_store():
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = ScenarioStore(DEFAULT_PATH)
+        return _default_store
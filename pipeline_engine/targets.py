@@ -0,0 +1,113 @@
+"""목표 IRR·NPV·할인회수기간을 만족하는 입력값 역산 (단일 프로젝트/포트폴리오 배열 공통).
+
+할인율 ρ, 기간 H 에서 2구간 현금흐름의 NPV 는
+    NPV = -순투자 + (마진 - 판관비)(1 - 세율) PVIFA(ρ, H) + 감가상각비 x 세율 x PVIFA(ρ, min(감가상각 연수, H))
+로, 판매량·MJ당 마진·보조금(기타 이익)·총 공사비 각각에 대해 1차식이다.
+따라서 목표 IRR 은 ρ = 목표 IRR 에서 NPV = 0, 목표 NPV 는 ρ = 할인율에서 NPV = 목표값,
+목표 회수기간 T 는 T 이내 어느 시점의 누적 할인현금흐름이 0 이 되는 조건으로 바꾸어 닫힌 식으로 푼다.
+"""
+import numpy as np
+
+from .diagnostics import traced
+from .portfolio import cash_flow_components, resolve_inputs
+from .solver import annuity_factor
+
+# [설정] 역산 대상 입력
+LEVERS = {
+    "sim_vol": "연간 판매량 (MJ)",
+    "unit_margin": "MJ당 요금 마진 (원)",
+    "sim_other": "필요 보조금 (기타 이익, 원)",
+    "sim_inv": "최대 허용 공사비 (원)",
+}
+
+# [설정] 목표 지표
+TARGETS = {
+    "irr": "목표 IRR",
+    "npv": "목표 NPV (원)",
+    "payback": "목표 할인회수기간 (년)",
+}
+
+
+# [함수] 기간 H(소수 허용, 연도 사이 선형 보간)의 연금현가계수와 감가상각 구간 계수
+def _horizon_factors(rate, horizon, dep_years):
+    low = np.floor(horizon)
+    frac = horizon - low
+
+    def factors(n):
+        return annuity_factor(rate, n), annuity_factor(rate, np.minimum(dep_years, n))
+
+    a_low, d_low = factors(low)
+    a_high, d_high = factors(low + 1)
+    return a_low + frac * (a_high - a_low), d_low + frac * (d_high - d_low)
+
+
+# [함수] 기간 H 까지의 누적 할인현금흐름 = value 를 만드는 입력값 (레버 1차식의 해)
+def _solve_at(lever, value, p, cf, rate, horizon):
+    a_total, a_dep = _horizon_factors(rate, horizon, cf["dep_years"])
+    tax, sga, basic = cf["tax"], cf["sga"], p["sim_basic_rev"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if lever == "sim_inv":
+            # 감가상각비(= 공사비 / 연수)의 절세효과까지 공사비에 비례
+            shield = np.where(cf["dep_period"] > 0, tax * a_dep / np.where(cf["dep_period"] > 0, cf["dep_period"], 1.0), 0.0)
+            operating = (cf["margin"] - sga) * (1 - tax) * a_total
+            return (operating + p["sim_contrib"] + p["sim_other"] - value) / (1 - shield)
+
+        operating = (cf["margin"] - sga) * (1 - tax) * a_total + cf["dep"] * tax * a_dep
+        if lever == "sim_other":
+            return value - operating + p["sim_inv"] - p["sim_contrib"]
+
+        # 필요한 가스판매수익 (마진 - 기본요금 수익)
+        required_gas_margin = (value + cf["net_inv"] - cf["dep"] * tax * a_dep) / ((1 - tax) * a_total) + sga - basic
+        solvable = ((1 - tax) * a_total) > 0
+        if lever == "sim_vol":
+            unit_margin = p["sales_price_mj"] - p["purchase_price_mj"]
+            volume = np.where(unit_margin > 0, required_gas_margin / np.where(unit_margin > 0, unit_margin, 1.0), np.nan)
+            return np.where(solvable, volume, np.nan)
+        if lever == "unit_margin":
+            margin = np.where(p["sim_vol"] > 0, required_gas_margin / np.where(p["sim_vol"] > 0, p["sim_vol"], 1.0), np.nan)
+            return np.where(solvable, margin, np.nan)
+    raise KeyError(f"지원하지 않는 역산 대상: {lever}")
+
+
+# [함수] 목표 지표를 만족하는 입력값 역산
+@traced()
+def solve_target(lever, target, value, projects=None, rates=None, **overrides):
+    """lever: LEVERS 키, target: "irr" / "npv" / "payback", value: 목표값(스칼라 또는 프로젝트별 배열).
+
+    반환값은 프로젝트별 배열이다. 판매량은 get_req_vol 과 같이 0 이상 정수로 올림하고,
+    sim_inv 는 허용 가능한 최대 공사비, 나머지는 필요한 최소값이다.
+    조건을 만족할 수 없으면 NaN.
+    """
+    if lever not in LEVERS:
+        raise KeyError(f"지원하지 않는 역산 대상: {lever}")
+    p = resolve_inputs(projects, rates=rates, **overrides)
+    cf = cash_flow_components(p)
+    n = len(cf["net_inv"])
+    value = np.broadcast_to(np.asarray(value, dtype=float), (n,))
+
+    if target == "irr":
+        result = _solve_at(lever, 0.0, p, cf, value, cf["periods"])
+    elif target == "npv":
+        result = _solve_at(lever, value, p, cf, cf["rate"], cf["periods"])
+    elif target == "payback":
+        # T 이내 어느 시점이든 누적 할인현금흐름이 0 이상이면 회수 → 시점별 해 중 가장 느슨한 값
+        # (감가상각 종료 후 OCF 가 음수면 누적값이 다시 줄어들므로 T 시점 하나만으로는 부족)
+        horizon = np.minimum(value, cf["periods"])
+        last = int(np.ceil(np.nanmax(horizon))) if n else 0
+        points = np.minimum(np.arange(0, last + 1)[None, :], horizon[:, None])
+        points = np.column_stack([points, horizon])
+        columns = [_solve_at(lever, 0.0, p, cf, cf["rate"], points[:, j]) for j in range(points.shape[1])]
+        stacked = np.column_stack(columns)
+        if lever == "sim_inv":
+            result = np.where(np.isnan(stacked), -np.inf, stacked).max(axis=1)
+        else:
+            result = np.where(np.isnan(stacked), np.inf, stacked).min(axis=1)
+        result = np.where(np.isfinite(result) & (value > 0), result, np.nan)
+    else:
+        raise KeyError(f"지원하지 않는 목표 지표: {target}")
+
+    if lever == "sim_vol":
+        result = np.where(np.isnan(result), np.nan, np.ceil(np.maximum(result, 0)))
+    elif lever == "unit_margin":
+        result = np.where(np.isnan(result), np.nan, np.maximum(result, 0))
+    return result
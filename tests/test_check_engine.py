@@ -0,0 +1,28 @@
+"""빠른 계산 경로를 기준 계산과 비교 (benchmarks.check_engine 를 작은 표본으로 실행).
+
+실행: python -m pytest tests
+"""
+import pytest
+
+from benchmarks.check_engine import check_monthly_irr, make_inputs, run_checks
+
+# [설정] 표본 크기 (전체 검증은 python -m benchmarks.check_engine, 기본 3000건)
+N = 200
+MONTHLY_N = 8
+
+
+def _failures(summary):
+    return [f"{row['path']}.{row['field']}: {row['mismatches']}건 {row.get('bad_edges', {})}"
+            for row in summary if row["mismatches"]]
+
+
+def test_fast_paths_match_reference():
+    summary = run_checks(n=N, seed=0, monthly_limit=MONTHLY_N)
+    assert not _failures(summary)
+
+
+# 시드 3 의 0번 행: 월 IRR 근이 +13.8%/월 과 -34.2%/월 두 개 (연 환산 후 고르면 -99.3% 를 택하던 사례)
+@pytest.mark.parametrize("seed", [3, 11])
+def test_monthly_irr_matches_npf(seed):
+    row = check_monthly_irr(make_inputs(40, seed), limit=MONTHLY_N)
+    assert row["mismatches"] == 0, row
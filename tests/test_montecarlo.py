@@ -0,0 +1,34 @@
+"""run_monte_carlo 의 margin_per_mj (공통 요금 충격 + 마진 분포) 처리 확인.
+
+실행: python -m pytest tests
+"""
+import pytest
+
+from benchmarks.bench_engine import BASE_SCENARIO
+from pipeline_engine.montecarlo import Distribution, run_monte_carlo
+
+SALES, PURCHASE = BASE_SCENARIO["sales_price_mj"], BASE_SCENARIO["purchase_price_mj"]
+
+
+def test_shared_tariff_shock_keeps_margin():
+    # 사입 단가만 흔들고 마진을 고정하면 판매 단가가 같이 움직여 NPV 는 (절사 오차 외) 불변
+    spec = (
+        ("purchase_price_mj", Distribution.normal(PURCHASE, PURCHASE * 0.03)),
+        ("margin_per_mj", Distribution.fixed(SALES - PURCHASE)),
+    )
+    mc = run_monte_carlo(BASE_SCENARIO, spec, n_draws=5_000, seed=1)
+    assert mc.std < 1e-6 * abs(mc.mean) + 1e3
+    fixed = run_monte_carlo(BASE_SCENARIO, spec[1:], n_draws=1_000)
+    assert mc.mean == pytest.approx(fixed.mean, rel=1e-6)
+
+
+def test_margin_spread_drives_npv_spread():
+    narrow = run_monte_carlo(BASE_SCENARIO, (("margin_per_mj", Distribution.normal(SALES - PURCHASE, 0.05)),), 5_000, seed=2)
+    wide = run_monte_carlo(BASE_SCENARIO, (("margin_per_mj", Distribution.normal(SALES - PURCHASE, 0.5)),), 5_000, seed=2)
+    assert wide.std == pytest.approx(narrow.std * 10, rel=1e-3)
+
+
+def test_margin_and_sales_price_are_exclusive():
+    spec = (("sales_price_mj", Distribution.fixed(SALES)), ("margin_per_mj", Distribution.fixed(SALES - PURCHASE)))
+    with pytest.raises(ValueError):
+        run_monte_carlo(BASE_SCENARIO, spec, n_draws=1_000)
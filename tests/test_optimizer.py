@@ -0,0 +1,53 @@
+"""select_portfolio 를 작은 무작위 사례의 완전 탐색 결과와 비교.
+
+실행: python -m pytest tests
+"""
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipeline_engine.optimizer import select_portfolio
+
+CASES = 600
+
+
+# [함수] 무작위 후보 (정수 비용 → 예산을 정확히 채우는 조합이 자주 나옴)
+def make_case(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(3, 11))
+    cost = rng.integers(1, 10, n) / 10 if seed % 2 else rng.uniform(0.1, 1, n)
+    candidates = pd.DataFrame({
+        "npv": rng.uniform(0.01, 1, n), "cost": cost, "group": rng.choice(["a", "b", "c"], n),
+        "irr": 0.1, "irr_code": "ok", "is_zombie": False,
+    })
+    caps = {"a": float(rng.integers(1, 20)) / 10, "b": float(rng.uniform(0.2, 2))} if seed % 3 == 0 else None
+    budget = float(rng.integers(1, int(cost.sum() * 10))) / 10
+    return candidates, budget, caps
+
+
+# [함수] 모든 조합 중 예산·그룹 상한을 지키는 최대 NPV 합계
+def brute_force(candidates, budget, caps):
+    cost, value, group = candidates["cost"].to_numpy(), candidates["npv"].to_numpy(), candidates["group"].to_numpy()
+    best = 0.0
+    for picks in itertools.product([False, True], repeat=len(candidates)):
+        mask = np.array(picks)
+        if cost[mask].sum() > budget + 1e-9:
+            continue
+        if caps and any(cost[mask & (group == g)].sum() > cap + 1e-9 for g, cap in caps.items()):
+            continue
+        best = max(best, value[mask].sum())
+    return best
+
+
+@pytest.mark.parametrize("seed", range(CASES))
+def test_exact_matches_brute_force(seed):
+    candidates, budget, caps = make_case(seed)
+    best = brute_force(candidates, budget, caps)
+    exact = select_portfolio(candidates, budget, group_caps=caps, method="exact")
+    assert exact.optimal
+    assert exact.total_npv == pytest.approx(best, rel=1e-9, abs=1e-12)
+    assert exact.capex <= budget + 1e-9
+    greedy = select_portfolio(candidates, budget, group_caps=caps, method="greedy")
+    assert greedy.upper_bound >= best - 1e-9
@@ -0,0 +1,32 @@
+"""요금 이력(TariffSchedule) 사용 시 공급 개시일 처리 확인.
+
+실행: python -m pytest tests
+"""
+import pandas as pd
+import pytest
+
+from benchmarks.bench_engine import BASE_SCENARIO
+from pipeline_engine.profiles import DEFAULT_TARIFFS, Profile, simulate_profiles
+
+GAS_TYPE = "취사용"
+REVISED = DEFAULT_TARIFFS.with_revision("2028-01-01", {GAS_TYPE: {"sales": 25.0, "purchase": 21.0, "is_residential": True}})
+
+
+def make_project():
+    project = {k: v for k, v in BASE_SCENARIO.items() if k not in ("sales_price_mj", "purchase_price_mj", "sim_rev", "sim_cost")}
+    return dict(project, gas_type=GAS_TYPE)
+
+
+def test_tariffs_require_start_date():
+    with pytest.raises(ValueError):
+        simulate_profiles(make_project(), Profile(tariffs=REVISED))
+
+
+def test_start_date_column_overrides_profile():
+    frame = pd.DataFrame([make_project()] * 2)
+    frame["start_date"] = pd.to_datetime(["2025-01-01", "2030-01-01"])
+    by_column = simulate_profiles(frame, Profile(tariffs=REVISED, start_date="2040-01-01"))["npv"]
+    early = simulate_profiles(make_project(), Profile(tariffs=REVISED, start_date="2025-01-01"))["npv"].iloc[0]
+    late = simulate_profiles(make_project(), Profile(tariffs=REVISED, start_date="2030-01-01"))["npv"].iloc[0]
+    assert by_column.tolist() == pytest.approx([early, late], rel=1e-12)
+    assert late > early
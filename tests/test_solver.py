@@ -0,0 +1,50 @@
+"""two_phase_irr 단건 경로(파이썬 float)를 배열 경로·npf.irr 과 비교.
+
+실행: python -m pytest tests
+"""
+import numpy as np
+import numpy_financial as npf
+import pytest
+
+from pipeline_engine.solver import two_phase_irr
+
+CASES = 3000
+
+
+# [함수] 무작위 2구간 현금흐름 (결과 코드가 골고루 나오도록 부호·크기·기간을 넓게)
+def make_cases(seed, n=CASES):
+    rng = np.random.default_rng(seed)
+    net_inv = rng.uniform(-1e7, 5e8, n)
+    ocf_dep = net_inv * rng.uniform(-0.2, 0.6, n) * rng.choice([1, 1, 1, 0.01, 10], n)
+    ocf_after = ocf_dep * rng.uniform(-1.5, 1.2, n)
+    periods = rng.integers(1, 51, n).astype(float)
+    dep_years = np.minimum(rng.integers(0, 52, n), periods)
+    return net_inv, ocf_dep, ocf_after, dep_years, periods
+
+
+# [함수] 감가상각 종료 후 적자 (근이 0 또는 2개) 사례
+def make_two_sign_cases(seed, n=CASES):
+    rng = np.random.default_rng(seed)
+    net_inv = rng.uniform(1e7, 5e8, n)
+    dep_years = rng.integers(1, 40, n).astype(float)
+    periods = dep_years + rng.integers(1, 20, n)
+    ocf_dep = net_inv / dep_years * rng.uniform(0.9, 1.6, n)
+    return net_inv, ocf_dep, -ocf_dep * rng.uniform(0.01, 3, n), dep_years, periods
+
+
+@pytest.mark.parametrize("make", [make_cases, make_two_sign_cases])
+def test_scalar_matches_array(make):
+    cases = make(0)
+    irr, code, _ = two_phase_irr(*cases)
+    for i in range(CASES):
+        irr_one, code_one, _ = two_phase_irr(*(a[i] for a in cases))
+        assert code_one[0] == code[i], i
+        assert irr_one[0] == pytest.approx(irr[i], rel=1e-9, abs=1e-12, nan_ok=True), i
+
+
+def test_scalar_matches_npf():
+    cases = make_two_sign_cases(1, n=300)
+    for net_inv, ocf_dep, ocf_after, dep_years, periods in zip(*cases):
+        flows = [-net_inv] + [ocf_dep] * int(dep_years) + [ocf_after] * int(periods - dep_years)
+        assert two_phase_irr(net_inv, ocf_dep, ocf_after, dep_years, periods)[0][0] == pytest.approx(
+            npf.irr(flows), rel=1e-8, abs=1e-10, nan_ok=True)